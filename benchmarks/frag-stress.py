@@ -0,0 +1,61 @@
+#
+# fragmentation-ipv6.py's stress mode over growing sender counts.
+#
+# Every run pings n1 from --senders hosts at once with payload sizes around
+# 1..--fragments fragments at the path MTU (--Sizes=mtu:K), optionally
+# with frame loss, and reads the --FragStats report: reassembly memory
+# high-water mark, reassembly latency percentiles, timeouts and events per
+# second.
+#
+#   python benchmarks/frag-stress.py --senders 1,10,100 --mtus 1500,1280 --loss 0.01
+#
+
+import argparse
+import json
+import os
+import sys
+
+from harness import EXAMPLES, RunExample
+
+RESULT = "frag-stress.json"
+
+
+def ReadResult (workDir):
+    with open (os.path.join (workDir, RESULT)) as f:
+        return json.load (f)
+
+
+def main (argv):
+    parser = argparse.ArgumentParser ()
+    parser.add_argument ("--senders", default="1,10,100")
+    parser.add_argument ("--fragments", type=int, default=4, help="sizes around 1..this many fragments")
+    parser.add_argument ("--mtus", default="1500,1500")
+    parser.add_argument ("--loss", type=float, default=0.0)
+    parser.add_argument ("--max-packets", type=int, default=100)
+    parser.add_argument ("--interval", type=float, default=0.01)
+    parser.add_argument ("--json", help="write the results to this file")
+    options = parser.parse_args (argv[1:])
+
+    results = []
+    print ("%8s %10s %12s %10s %10s %10s %12s" % ("senders", "run [s]", "maxBytes", "maxDgrams", "p99 [ms]",
+                                                   "timeouts", "events/s"))
+    for senders in [int (n) for n in options.senders.split (",")]:
+        args = ["--Senders=%d" % senders, "--Sizes=mtu:%d" % options.fragments, "--Mtus=%s" % options.mtus,
+                "--FragmentLoss=%g" % options.loss, "--MaxPackets=%d" % options.max_packets,
+                "--Interval=%g" % options.interval, "--TraceMode=off", "--FragStats=%s" % RESULT]
+        run = RunExample (EXAMPLES["fragmentation-ipv6"], args, inspect=ReadResult)
+        run["senders"] = senders
+        results.append (run)
+        print ("%8d %10.3f %12d %10d %10s %10d %12s" % (senders, run["wall"], run["maxBytes"], run["maxDatagrams"],
+                                                        "%.3f" % run["p99Ms"] if "p99Ms" in run else "-",
+                                                        run["timeouts"],
+                                                        "%.0f" % run["eventsPerSecond"] if run.get ("eventsPerSecond")
+                                                        else "-"))
+
+    if options.json:
+        with open (options.json, "w") as f:
+            json.dump (results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main (sys.argv)
@@ -0,0 +1,61 @@
+#
+# How global routing scales with the topology size.
+#
+# Runs routing/global-routing-scaling.py on growing grids, fat-trees and
+# random graphs (one process per size) and tabulates the time spent
+# building the topology, in PopulateRoutingTables and in Simulator.Run,
+# with the peak RSS after each phase.
+#
+#   python benchmarks/global-routing-scaling.py --topologies grid,random --max-nodes 2000
+#
+
+import argparse
+import json
+import os
+import sys
+
+from harness import EXAMPLES, RunExample
+
+# Topology arguments per size step.
+SIZES = {
+    "grid": [["--Rows=%d" % n, "--Cols=%d" % n] for n in (5, 10, 20, 30, 45, 64)],
+    "fattree": [["--K=%d" % k] for k in (4, 8, 12, 16, 20)],
+    "random": [["--Nodes=%d" % n, "--Degree=4"] for n in (25, 100, 400, 1000, 2000, 4000)],
+}
+
+
+def ReadReport (workDir):
+    with open (os.path.join (workDir, "report.json")) as f:
+        return json.load (f)
+
+
+def main (argv):
+    parser = argparse.ArgumentParser ()
+    parser.add_argument ("--topologies", default="grid,fattree,random")
+    parser.add_argument ("--max-nodes", type=int, default=5000, help="stop a topology once it gets larger")
+    parser.add_argument ("--flows", type=int, default=10)
+    parser.add_argument ("--stop-time", type=float, default=5.0)
+    parser.add_argument ("--json", help="write the results to this file")
+    options = parser.parse_args (argv[1:])
+
+    results = []
+    print ("%-8s %6s %6s %9s %9s %9s %10s" % ("topology", "nodes", "links", "build", "populate", "run", "rss [MiB]"))
+    for kind in options.topologies.split (","):
+        for sizeArgs in SIZES[kind]:
+            args = ["--Topology=%s" % kind, "--Flows=%d" % options.flows, "--StopTime=%g" % options.stop_time,
+                    "--Verbose=0", "--Report=report.json"] + sizeArgs
+            report = RunExample (EXAMPLES["global-routing-scaling"], args, inspect=ReadReport)
+            results.append (report)
+            print ("%-8s %6d %6d %9.3f %9.3f %9.3f %10.1f" % (kind, report["nodes"], report["links"], report["build"],
+                                                             report["populate"], report["run"],
+                                                             report["maxRssKiB"] / 1024.0))
+            if report["nodes"] >= options.max_nodes:
+                break
+
+    if options.json:
+        with open (options.json, "w") as f:
+            json.dump (results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main (sys.argv)
@@ -0,0 +1,65 @@
+#
+# Shared helpers for the benchmark scripts.
+#
+# Examples are run as separate processes inside a scratch directory, since
+# they write their traces to the working directory and ns-3's Simulator is
+# global to a process.
+#
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath (os.path.join (os.path.dirname (os.path.abspath (__file__)), os.pardir))
+
+EXAMPLES = {
+    "socket-options-ipv4": os.path.join (ROOT, "socket", "socket-options-ipv4.py"),
+    "socket-options-ipv6": os.path.join (ROOT, "socket", "socket-options-ipv6.py"),
+    "simple-global-routing": os.path.join (ROOT, "routing", "simple-global-routing.py"),
+    "global-routing-scaling": os.path.join (ROOT, "routing", "global-routing-scaling.py"),
+    "fragmentation-ipv6": os.path.join (ROOT, "ipv6", "fragmentation-ipv6.py"),
+    "icmpv6-redirect": os.path.join (ROOT, "ipv6", "icmpv6-redirect.py"),
+    "ping6": os.path.join (ROOT, "ipv6", "ping6.py"),
+    "radvd": os.path.join (ROOT, "ipv6", "radvd.py"),
+    "wsn-ping6": os.path.join (ROOT, "ipv6", "wsn-ping6.py"),
+    "test-ipv6": os.path.join (ROOT, "ipv6", "test-ipv6.py"),
+}
+
+
+def DirectorySize (path):
+    total = 0
+    for directory, subdirs, files in os.walk (path):
+        for name in files:
+            total += os.path.getsize (os.path.join (directory, name))
+    return total
+
+
+# Run one example and return its wall-clock time, peak RSS of the child (in
+# KiB) and the number of bytes it left in its working directory.  The
+# optional inspect (workDir) callback runs before the directory is removed.
+# env entries are added to the child's environment, interpreterArgs go
+# before the script (e.g. "-X", "importtime"), and keepStderr returns the
+# child's standard error as "stderr".
+def RunExample (script, args=(), inspect=None, env=None, interpreterArgs=(), keepStderr=False):
+    childEnv = dict (os.environ, **env) if env else None
+    # stderr goes to a file: a pipe only read after wait4 would block a
+    # child that writes more than the pipe buffer
+    with tempfile.TemporaryDirectory () as workDir, tempfile.TemporaryFile () as stderrFile:
+        start = time.perf_counter ()
+        process = subprocess.Popen ([sys.executable] + list (interpreterArgs) + [script] + list (args), cwd=workDir,
+                                    stdout=subprocess.DEVNULL, stderr=stderrFile, env=childEnv)
+        pid, status, usage = os.wait4 (process.pid, 0)
+        wall = time.perf_counter () - start
+        stderrFile.seek (0)
+        stderr = stderrFile.read ().decode (errors="replace")
+        returncode = os.waitstatus_to_exitcode (status)
+        if returncode != 0:
+            raise RuntimeError ("%s %s failed (%d):\n%s" % (script, " ".join (args), returncode, stderr))
+        result = {"wall": wall, "maxRssKiB": usage.ru_maxrss, "bytesWritten": DirectorySize (workDir)}
+        if keepStderr:
+            result["stderr"] = stderr
+        if inspect is not None:
+            result.update (inspect (workDir))
+        return result
@@ -0,0 +1,77 @@
+#
+# Startup cost of the examples with lazy and eager ns-3 module loading.
+#
+# Every example runs under "python -X importtime" with NS_LAZY_IMPORT=0 (the
+# modules each script declares are imported up front, like the plain import
+# statements) and NS_LAZY_IMPORT=1 (common.lazyns loads them on first use).
+# The importtime log gives the time spent importing the ns binding modules
+# and which of them were loaded; the wall-clock time is the best of
+# --repeat runs.
+#
+#   python benchmarks/import-time.py --examples ping6,radvd --repeat 5
+#
+
+import argparse
+import json
+import sys
+
+from harness import EXAMPLES, RunExample
+
+MODES = (("eager", "0"), ("lazy", "1"))
+
+
+# -X importtime log -> {module: (self us, cumulative us)} for ns modules
+def ParseImportTime (log):
+    modules = {}
+    for line in log.splitlines ():
+        if not line.startswith ("import time:") or "|" not in line:
+            continue
+        fields = line[len ("import time:"):].split ("|")
+        name = fields[2].strip ()
+        if name == "ns" or name == "ns3" or name.startswith ("ns.") or name.startswith ("ns3."):
+            try:
+                modules[name] = (int (fields[0]), int (fields[1]))
+            except ValueError:
+                continue
+    return modules
+
+
+def RunOnce (script, flag):
+    run = RunExample (script, env={"NS_LAZY_IMPORT": flag}, interpreterArgs=["-X", "importtime"], keepStderr=True)
+    modules = ParseImportTime (run["stderr"])
+    return {"wall": run["wall"], "maxRssKiB": run["maxRssKiB"],
+            "nsImport": sum (own for own, cumulative in modules.values ()) / 1e6,
+            "modules": sorted (name for name in modules if name.count (".") == 1)}
+
+
+def main (argv):
+    parser = argparse.ArgumentParser ()
+    parser.add_argument ("--examples", default=",".join (name for name in EXAMPLES if name != "global-routing-scaling"))
+    parser.add_argument ("--repeat", type=int, default=3)
+    parser.add_argument ("--json", help="write the results to this file")
+    options = parser.parse_args (argv[1:])
+
+    results = []
+    print ("%-22s %10s %10s %12s %12s %8s" % ("example", "eager [s]", "lazy [s]", "eager ns [s]", "lazy ns [s]",
+                                            "modules"))
+    for name in options.examples.split (","):
+        row = {"example": name}
+        for mode, flag in MODES:
+            runs = [RunOnce (EXAMPLES[name], flag) for _ in range (options.repeat)]
+            best = min (runs, key=lambda run: run["wall"])
+            row[mode] = best
+        results.append (row)
+        print ("%-22s %10.3f %10.3f %12.3f %12.3f %4d/%-3d" % (name, row["eager"]["wall"], row["lazy"]["wall"],
+                                                             row["eager"]["nsImport"], row["lazy"]["nsImport"],
+                                                             len (row["lazy"]["modules"]), len (row["eager"]["modules"])))
+        skipped = sorted (set (row["eager"]["modules"]) - set (row["lazy"]["modules"]))
+        if skipped:
+            print ("%-22s not loaded: %s" % ("", ", ".join (skipped)))
+
+    if options.json:
+        with open (options.json, "w") as f:
+            json.dump (results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main (sys.argv)
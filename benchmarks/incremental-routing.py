@@ -0,0 +1,62 @@
+#
+# Incremental vs. full route recomputation on link failures.
+#
+# Runs routing/global-routing-scaling.py with random link down/up events on
+# growing topologies, once with --Routing=global (RecomputeRoutingTables on
+# every event) and once with --Routing=incremental (common.incroute), and
+# reports the initial population time and the mean time per link event.
+#
+#   python benchmarks/incremental-routing.py --topology random --sizes 100,400,1000 --events 20
+#
+
+import argparse
+import json
+import os
+import sys
+
+from harness import EXAMPLES, RunExample
+
+
+def SizeArgs (topology, size):
+    if topology == "grid":
+        side = max (2, int (round (size ** 0.5)))
+        return ["--Rows=%d" % side, "--Cols=%d" % side]
+    if topology == "fattree":
+        return ["--K=%d" % size]
+    return ["--Nodes=%d" % size, "--Degree=4"]
+
+
+def ReadReport (workDir):
+    with open (os.path.join (workDir, "report.json")) as f:
+        return json.load (f)
+
+
+def main (argv):
+    parser = argparse.ArgumentParser ()
+    parser.add_argument ("--topology", default="random", choices=("grid", "fattree", "random"))
+    parser.add_argument ("--sizes", default="100,400,1000", help="nodes (grid, random) or arity (fattree)")
+    parser.add_argument ("--events", type=int, default=20, help="links taken down and back up")
+    parser.add_argument ("--json", help="write the results to this file")
+    options = parser.parse_args (argv[1:])
+
+    results = []
+    print ("%6s %6s %-12s %10s %14s" % ("nodes", "links", "routing", "populate", "per event [ms]"))
+    for size in [int (s) for s in options.sizes.split (",")]:
+        for routing in ("global", "incremental"):
+            args = ["--Topology=%s" % options.topology, "--Routing=%s" % routing,
+                    "--RandomLinkEvents=%d" % options.events, "--Flows=2", "--StopTime=5",
+                    "--Verbose=0", "--Report=report.json"] + SizeArgs (options.topology, size)
+            report = RunExample (EXAMPLES["global-routing-scaling"], args, inspect=ReadReport)
+            perEvent = report["linkEventSeconds"] / max (1, report["linkEvents"])
+            report["perEvent"] = perEvent
+            results.append (report)
+            print ("%6d %6d %-12s %10.3f %14.3f" % (report["nodes"], report["links"], routing,
+                                                  report["populate"], perEvent * 1e3))
+
+    if options.json:
+        with open (options.json, "w") as f:
+            json.dump (results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main (sys.argv)
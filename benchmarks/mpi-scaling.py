@@ -0,0 +1,84 @@
+#
+# Speedup of routing/simple-global-routing-mpi.py with the number of ranks.
+#
+# The scenario first runs sequentially (--Distributed=0), then under
+# "mpirun -np N" for every N of --ranks.  The per-rank result files are
+# merged; every run must deliver the same bytes to every flow as the
+# sequential one, and the table gives the wall-clock time (slowest rank),
+# the time in Simulator.Run and the speedup over the sequential run.
+#
+#   python benchmarks/mpi-scaling.py --ranks 1,2,4,8 --rows 64 --cols 64 --flows 1000
+#   python benchmarks/mpi-scaling.py --mpirun "mpirun --allow-run-as-root --oversubscribe"
+#
+
+import argparse
+import glob
+import json
+import os
+import shlex
+import subprocess
+import sys
+import tempfile
+import time
+
+from harness import ROOT
+
+SCRIPT = os.path.join (ROOT, "routing", "simple-global-routing-mpi.py")
+
+
+def Run (command, scenario):
+    with tempfile.TemporaryDirectory () as workDir:
+        start = time.perf_counter ()
+        process = subprocess.run (command + [sys.executable, SCRIPT, "--Verbose=0"] + scenario, cwd=workDir,
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        wall = time.perf_counter () - start
+        if process.returncode != 0:
+            raise RuntimeError ("%s failed (%d):\n%s" % (" ".join (command + scenario), process.returncode,
+                                                        process.stderr.decode (errors="replace")))
+        ranks = []
+        for fileName in glob.glob (os.path.join (workDir, "simple-global-routing-mpi.*.json")):
+            with open (fileName) as f:
+                ranks.append (json.load (f))
+    rxBytes = {}
+    for rank in ranks:
+        rxBytes.update (rank["rxBytes"])
+    return {"wall": wall, "ranks": len (ranks), "run": max (rank["run"] for rank in ranks),
+            "setup": max (rank["setup"] for rank in ranks), "rxBytes": rxBytes}
+
+
+def main (argv):
+    parser = argparse.ArgumentParser ()
+    parser.add_argument ("--ranks", default="1,2,4")
+    parser.add_argument ("--rows", type=int, default=32)
+    parser.add_argument ("--cols", type=int, default=32)
+    parser.add_argument ("--flows", type=int, default=200)
+    parser.add_argument ("--stop-time", type=float, default=10.0)
+    parser.add_argument ("--null-message", action="store_true")
+    parser.add_argument ("--mpirun", default="mpirun", help="MPI launcher command (with its options)")
+    parser.add_argument ("--json", help="write the results to this file")
+    options = parser.parse_args (argv[1:])
+
+    scenario = ["--Rows=%d" % options.rows, "--Cols=%d" % options.cols, "--Flows=%d" % options.flows,
+                "--StopTime=%g" % options.stop_time, "--NullMessage=%d" % options.null_message]
+
+    sequential = Run ([], scenario + ["--Distributed=0"])
+    results = [dict (sequential, mode="sequential", matches=True, speedup=1.0)]
+    print ("%-10s %5s %10s %10s %8s %8s" % ("mode", "ranks", "wall [s]", "run [s]", "speedup", "matches"))
+    print ("%-10s %5d %10.3f %10.3f %8.2f %8s" % ("sequential", 1, sequential["wall"], sequential["run"], 1.0, "-"))
+    for ranks in [int (n) for n in options.ranks.split (",")]:
+        result = Run (shlex.split (options.mpirun) + ["-np", str (ranks)], scenario)
+        result["mode"] = "mpi"
+        result["matches"] = result["rxBytes"] == sequential["rxBytes"]
+        result["speedup"] = sequential["wall"] / result["wall"]
+        results.append (result)
+        print ("%-10s %5d %10.3f %10.3f %8.2f %8s" % ("mpi", result["ranks"], result["wall"], result["run"],
+                                                       result["speedup"], "yes" if result["matches"] else "NO"))
+
+    if options.json:
+        with open (options.json, "w") as f:
+            json.dump ([dict (result, rxBytes=sum (result["rxBytes"].values ())) for result in results], f, indent=2)
+    return 0 if all (result["matches"] for result in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit (main (sys.argv))
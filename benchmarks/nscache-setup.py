@@ -0,0 +1,123 @@
+#
+# Setup time with and without common.nscache.
+#
+# Builds a random tree of point-to-point links whose subnets are all given
+# explicitly (one "network" per link, the way the hand-written examples
+# number them: IPv4 /24s or IPv6 /64s), then installs one OnOff/PacketSink
+# pair per link with DataRate and start/stop Time values.  Each run happens
+# in a fresh process, with the cache enabled or disabled (SetMaxSize (0));
+# the setup time and the cache counters are reported.
+#
+#   python benchmarks/nscache-setup.py --links 1000,10000,30000
+#
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+from harness import ROOT, RunExample
+
+sys.path.insert (0, ROOT)
+
+RESULT = "nscache-setup.json"
+
+
+def Spec (links, family, seed=1):
+    rng = random.Random (seed)
+    if family == "ipv6":
+        networks = ["2001:%x:%x::/64" % (1 + i // 65536, i % 65536) for i in range (links)]
+    else:
+        networks = ["10.%d.%d.0/24" % (i // 256, i % 256) for i in range (links)]
+    return {
+        "nodes": links + 1,
+        "stack": family,
+        "linkTypes": {"p2p": {"helper": "p2p", "device": {"DataRate": "5Mbps"}, "channel": {"Delay": "2ms"}}},
+        "links": [{"type": "p2p", "nodes": (i, rng.randrange (i)), "network": networks[i - 1]}
+                  for i in range (1, links + 1)],
+    }
+
+
+def Worker (links, family, mode):
+    import ns.core
+    import ns.network
+    import ns.applications
+    from common import nscache
+    from common import topology
+
+    if mode == "nocache":
+        nscache.SetMaxSize (0)
+    spec = Spec (links, family)
+
+    start = time.perf_counter ()
+    topo = topology.Build (spec)
+    build = time.perf_counter () - start
+
+    start = time.perf_counter ()
+    port = 9
+    any = ns.network.Ipv6Address.GetAny () if family == "ipv6" else ns.network.Ipv4Address.GetAny ()
+    factory = "ns3::UdpSocketFactory"
+    sink = ns.applications.PacketSinkHelper (factory, ns.network.Inet6SocketAddress (any, port)
+                                             if family == "ipv6" else ns.network.InetSocketAddress (any, port))
+    for link in topo.links:
+        if family == "ipv6":
+            remote = ns.network.Inet6SocketAddress (link.interfaces.GetAddress (1, 1), port)
+        else:
+            remote = ns.network.InetSocketAddress (link.interfaces.GetAddress (1), port)
+        onoff = ns.applications.OnOffHelper (factory, ns.network.Address (remote))
+        onoff.SetConstantRate (nscache.DataRate ("448kb/s"), 210)
+        apps = onoff.Install (topo.Node (link.nodes[0]))
+        apps.Start (nscache.Time (1.0))
+        apps.Stop (nscache.Time (10.0))
+        apps = sink.Install (topo.Node (link.nodes[1]))
+        apps.Start (nscache.Time (0.5))
+        apps.Stop (nscache.Time (10.0))
+    applications = time.perf_counter () - start
+
+    ns.core.Simulator.Destroy ()
+    with open (RESULT, "w") as f:
+        json.dump ({"build": build, "applications": applications, "nscache": nscache.Stats ()}, f)
+
+
+def ReadResult (workDir):
+    with open (os.path.join (workDir, RESULT)) as f:
+        return json.load (f)
+
+
+def main (argv):
+    parser = argparse.ArgumentParser ()
+    parser.add_argument ("--links", default="1000,10000,30000")
+    parser.add_argument ("--families", default="ipv4,ipv6")
+    parser.add_argument ("--modes", default="nocache,cache")
+    parser.add_argument ("--worker", nargs=3, metavar=("LINKS", "FAMILY", "MODE"), help=argparse.SUPPRESS)
+    parser.add_argument ("--json", help="write the results to this file")
+    options = parser.parse_args (argv[1:])
+
+    if options.worker:
+        links, family, mode = options.worker
+        Worker (int (links), family, mode)
+        return
+
+    results = []
+    print ("%-6s %8s %-8s %10s %10s %10s %10s" % ("family", "links", "mode", "build [s]", "apps [s]", "hits", "misses"))
+    for family in options.families.split (","):
+        for links in [int (n) for n in options.links.split (",")]:
+            for mode in options.modes.split (","):
+                run = RunExample (os.path.abspath (__file__), ["--worker", str (links), family, mode],
+                                  inspect=ReadResult)
+                row = {"family": family, "links": links, "mode": mode, "build": run["build"],
+                       "applications": run["applications"], "hits": run["nscache"]["hits"],
+                       "misses": run["nscache"]["misses"], "maxRssKiB": run["maxRssKiB"]}
+                results.append (row)
+                print ("%-6s %8d %-8s %10.3f %10.3f %10d %10d" % (family, links, mode, row["build"],
+                                                                 row["applications"], row["hits"], row["misses"]))
+
+    if options.json:
+        with open (options.json, "w") as f:
+            json.dump (results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main (sys.argv)
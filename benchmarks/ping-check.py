@@ -0,0 +1,46 @@
+#
+# Delivery check of the ping examples' --PingStats reports.
+#
+# Each example runs with its default command line (5 echoes; in
+# fragmentation-ipv6.py, 4096-byte payloads fragmented at MTU 1500) and
+# must report every echo answered.  Exits with status 1 otherwise.
+#
+#   python benchmarks/ping-check.py --examples fragmentation-ipv6,ping6,radvd
+#
+
+import argparse
+import json
+import os
+import sys
+
+from harness import EXAMPLES, RunExample
+
+RESULT = "ping-check.json"
+
+
+def ReadResult (workDir):
+    with open (os.path.join (workDir, RESULT)) as f:
+        return json.load (f)
+
+
+def main (argv):
+    parser = argparse.ArgumentParser ()
+    parser.add_argument ("--examples", default="fragmentation-ipv6,ping6,radvd")
+    parser.add_argument ("--max-packets", type=int, default=5)
+    options = parser.parse_args (argv[1:])
+
+    failed = []
+    for name in options.examples.split (","):
+        args = ["--MaxPackets=%d" % options.max_packets, "--TraceMode=off", "--PingStats=%s" % RESULT]
+        run = RunExample (EXAMPLES[name], args, inspect=ReadResult)
+        ok = run["sent"] == options.max_packets and run["received"] == run["sent"]
+        print ("%-20s %d/%d received %s" % (name, run["received"], run["sent"], "ok" if ok else "FAILED"))
+        if not ok:
+            failed.append (name)
+
+    if failed:
+        sys.exit (1)
+
+
+if __name__ == '__main__':
+    main (sys.argv)
@@ -0,0 +1,59 @@
+#
+# Path MTU handling compared on fragmentation-ipv6.py's PMTU modes.
+#
+# The same constant-rate UDP flow runs with datagrams filling the first
+# link (source fragmentation after an ICMPv6 Packet Too Big, "ptb"), with
+# large datagrams always fragmented ("blind") and with datagrams sized to
+# the path MTU ("appsized"), across a router whose second segment has the
+# smaller MTU.  The table gives goodput, packets and fragments sent, bytes
+# sent per byte delivered and the time until the sender converged on the
+# path MTU.
+#
+#   python benchmarks/pmtu-compare.py --mtus 1500,1280 --rate 2Mbps --blind-size 8192
+#
+
+import argparse
+import json
+import os
+import sys
+
+from harness import EXAMPLES, RunExample
+
+MODES = ("ptb", "blind", "appsized")
+RESULT = "pmtu-compare.json"
+
+
+def ReadResult (workDir):
+    with open (os.path.join (workDir, RESULT)) as f:
+        return json.load (f)
+
+
+def main (argv):
+    parser = argparse.ArgumentParser ()
+    parser.add_argument ("--modes", default=",".join (MODES))
+    parser.add_argument ("--mtus", default="1500,1280")
+    parser.add_argument ("--rate", default="2Mbps")
+    parser.add_argument ("--blind-size", type=int, default=8192)
+    parser.add_argument ("--json", help="write the results to this file")
+    options = parser.parse_args (argv[1:])
+
+    results = []
+    print ("%-9s %8s %12s %9s %10s %10s %9s %12s" % ("mode", "payload", "goodput", "packets", "fragments",
+                                                     "oversized", "overhead", "converge [s]"))
+    for mode in options.modes.split (","):
+        args = ["--Pmtu=%s" % mode, "--Mtus=%s" % options.mtus, "--PmtuRate=%s" % options.rate,
+                "--BlindSize=%d" % options.blind_size, "--TraceMode=off", "--PmtuStats=%s" % RESULT]
+        run = RunExample (EXAMPLES["fragmentation-ipv6"], args, inspect=ReadResult)
+        results.append (run)
+        print ("%-9s %8d %12.0f %9d %10d %10d %9s %12.3f" % (mode, run["payloadSize"], run["goodput"], run["packets"],
+                                                             run["fragments"], run["oversized"],
+                                                             "%.3f" % run["overhead"] if run["overhead"] is not None
+                                                             else "-", run["convergeTime"]))
+
+    if options.json:
+        with open (options.json, "w") as f:
+            json.dump (results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main (sys.argv)
@@ -0,0 +1,57 @@
+#
+# radvd.py's scaled mode over growing host and prefix counts.
+#
+# Every run puts --hosts hosts on each of the router's subnets, announces
+# --prefixes prefixes per interface and reads the --NdStats report: time
+# until every host is fully configured, router advertisements and
+# solicitations sent and the neighbor cache sizes.
+#
+#   python benchmarks/radvd-scaling.py --hosts 1,10,100 --prefixes 1,4
+#
+
+import argparse
+import json
+import os
+import sys
+
+from harness import EXAMPLES, RunExample
+
+RESULT = "radvd-scaling.json"
+
+
+def ReadResult (workDir):
+    with open (os.path.join (workDir, RESULT)) as f:
+        return json.load (f)
+
+
+def main (argv):
+    parser = argparse.ArgumentParser ()
+    parser.add_argument ("--hosts", default="1,10,100")
+    parser.add_argument ("--prefixes", default="1,4")
+    parser.add_argument ("--json", help="write the results to this file")
+    options = parser.parse_args (argv[1:])
+
+    results = []
+    print ("%6s %8s %10s %12s %8s %8s %8s %8s %10s" % ("hosts", "prefixes", "run [s]", "config [s]", "RA", "RS",
+                                                        "NS", "NA", "cache max"))
+    for hosts in [int (n) for n in options.hosts.split (",")]:
+        for prefixes in [int (n) for n in options.prefixes.split (",")]:
+            args = ["--Hosts=%d" % hosts, "--Prefixes=%d" % prefixes, "--TraceMode=off", "--NdStats=%s" % RESULT]
+            run = RunExample (EXAMPLES["radvd"], args, inspect=ReadResult)
+            run["prefixes"] = prefixes
+            results.append (run)
+            cache = run.get ("neighborCache", {})
+            print ("%6d %8d %10.3f %12s %8d %8d %8d %8d %10s" % (hosts, prefixes, run["wall"],
+                                                                 "%.3f" % run["fullyConfigured"]
+                                                                 if run["fullyConfigured"] is not None else "-",
+                                                                 run["sent"]["ra"], run["sent"]["rs"],
+                                                                 run["sent"]["ns"], run["sent"]["na"],
+                                                                 cache.get ("hostsMax", "-")))
+
+    if options.json:
+        with open (options.json, "w") as f:
+            json.dump (results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main (sys.argv)
@@ -0,0 +1,77 @@
+#
+# Throughput of EUI-64 address autoconfiguration: one
+# Ipv6Address.MakeAutoconfiguredAddress call per address vs. the batched
+# common.slaac.MakeAutoconfiguredAddresses, with a check that both give the
+# same addresses on a sample.
+#
+#   python benchmarks/slaac-throughput.py --macs 1000000 --prefixes 16
+#
+
+import argparse
+import json
+import sys
+import time
+
+import numpy
+
+from harness import ROOT
+
+sys.path.insert (0, ROOT)
+
+from common import slaac
+
+
+def main (argv):
+    parser = argparse.ArgumentParser ()
+    parser.add_argument ("--macs", type=int, default=1000000)
+    parser.add_argument ("--prefixes", type=int, default=16)
+    parser.add_argument ("--ns3-macs", type=int, default=20000, help="MACs run through the per-address bindings")
+    parser.add_argument ("--sample", type=int, default=1000, help="addresses checked against ns-3")
+    parser.add_argument ("--json", help="write the results to this file")
+    options = parser.parse_args (argv[1:])
+
+    import ns.network
+
+    rng = numpy.random.default_rng (1)
+    macs = rng.integers (0, 1 << 48, options.macs, dtype=numpy.uint64)
+    prefixes = ["2001:db8:%x::" % i for i in range (options.prefixes)]
+
+    start = time.perf_counter ()
+    addresses = slaac.MakeAutoconfiguredAddresses (macs, prefixes)
+    batched = time.perf_counter () - start
+
+    macStrings = [":".join ("%02x" % b for b in mac) for mac in slaac.ParseMacs (macs[:options.ns3_macs])]
+    ns3Macs = [ns.network.Mac48Address (mac) for mac in macStrings]
+    ns3Prefixes = [ns.network.Ipv6Address (prefix) for prefix in prefixes]
+    start = time.perf_counter ()
+    for prefix in ns3Prefixes:
+        for mac in ns3Macs:
+            ns.network.Ipv6Address.MakeAutoconfiguredAddress (mac, prefix)
+    perAddress = time.perf_counter () - start
+
+    indices = rng.integers (0, min (options.macs, options.ns3_macs), options.sample)
+    for p, prefix in enumerate (ns3Prefixes):
+        converted = slaac.ToNs3 (addresses[p, indices])
+        for i, address in zip (indices, converted):
+            expected = ns.network.Ipv6Address.MakeAutoconfiguredAddress (ns3Macs[i], prefix)
+            if not address == expected:
+                raise AssertionError ("%s %s: %s != %s" % (macStrings[i], prefixes[p], address, expected))
+
+    results = {
+        "addresses": int (addresses.size),
+        "batchedSeconds": batched,
+        "batchedPerSecond": addresses.size / batched,
+        "ns3PerSecond": len (ns3Macs) * len (ns3Prefixes) / perAddress,
+        "checked": options.sample * options.prefixes,
+    }
+    results["speedup"] = results["batchedPerSecond"] / results["ns3PerSecond"]
+    for key, value in results.items ():
+        print ("%-18s %s" % (key, "%.3f" % value if isinstance (value, float) else value))
+
+    if options.json:
+        with open (options.json, "w") as f:
+            json.dump (results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main (sys.argv)
@@ -0,0 +1,61 @@
+#
+# Compare the per-packet and bulk send paths of the socket-options examples.
+#
+# Every point runs the example in a fresh process inside a scratch
+# directory and records the wall-clock time of the whole run.  Tracing is
+# off, so the per-packet trace I/O does not swamp the send paths compared.
+#
+#   python benchmarks/socket-send-modes.py --counts 1000,100000,1000000 --interval 0.00001
+#
+
+import argparse
+import json
+import sys
+
+from harness import EXAMPLES, RunExample
+
+SCRIPTS = {
+    "ipv4": EXAMPLES["socket-options-ipv4"],
+    "ipv6": EXAMPLES["socket-options-ipv6"],
+}
+MODES = ("packet", "bulk")
+
+
+def RunOnce (script, mode, count, interval, size):
+    args = ["--SendMode=%s" % mode,
+            "--PacketCount=%d" % count,
+            "--Interval=%g" % interval,
+            "--PacketSize=%d" % size,
+            "--TraceMode=off"]
+    return RunExample (script, args)["wall"]
+
+
+def main (argv):
+    parser = argparse.ArgumentParser ()
+    parser.add_argument ("--scripts", default="ipv4,ipv6")
+    parser.add_argument ("--counts", default="1000,10000,100000")
+    parser.add_argument ("--interval", type=float, default=0.0001)
+    parser.add_argument ("--size", type=int, default=64)
+    parser.add_argument ("--repeat", type=int, default=3)
+    parser.add_argument ("--json", help="write the results to this file")
+    options = parser.parse_args (argv[1:])
+
+    results = []
+    print ("%-6s %10s %12s %12s %8s" % ("script", "packets", "packet [s]", "bulk [s]", "speedup"))
+    for name in options.scripts.split (","):
+        for count in [int (c) for c in options.counts.split (",")]:
+            row = {"script": name, "packets": count}
+            for mode in MODES:
+                row[mode] = min (RunOnce (SCRIPTS[name], mode, count, options.interval, options.size)
+                                 for _ in range (options.repeat))
+            row["speedup"] = row["packet"] / row["bulk"]
+            results.append (row)
+            print ("%-6s %10d %12.3f %12.3f %8.2f" % (name, count, row["packet"], row["bulk"], row["speedup"]))
+
+    if options.json:
+        with open (options.json, "w") as f:
+            json.dump (results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main (sys.argv)
@@ -0,0 +1,164 @@
+#
+# Benchmark suite over every example, with baselines and regression checks.
+#
+# Each scenario runs one example in a scaled mode (socket floods, ping
+# floods, a faster OnOff rate, larger generated topologies with more flows)
+# in a fresh process, --repeat times, keeping the fastest run.  Recorded per
+# scenario: wall-clock time, peak RSS, bytes written (traces and other
+# outputs) and, from the example's --Profile report, events executed,
+# events per second and simulated per wall-clock time.
+#
+#   python benchmarks/suite.py run --scale 10 --save benchmarks/baselines/ns-3.30.json
+#   python benchmarks/suite.py run --scale 10 --baseline benchmarks/baselines/ns-3.30.json
+#   python benchmarks/suite.py compare old.json new.json --threshold 0.05
+#
+# A scenario regresses when its wall time, peak RSS or bytes written grow,
+# or its events per second drop, by more than --threshold (relative); the
+# comparison prints them and exits with status 1.
+#
+
+import argparse
+import json
+import os
+import platform
+import sys
+
+from harness import EXAMPLES, RunExample
+
+PROFILE = "suite-profile.json"
+
+
+def _PingFlood (scale):
+    return ["--MaxPackets=%d" % (1000 * scale), "--Interval=0.001"]
+
+
+def _SocketFlood (scale):
+    return ["--PacketCount=%d" % (10000 * scale), "--Interval=0.0001", "--SendMode=packet"]
+
+
+# name -> (example, args (scale), profiled)
+SCENARIOS = {
+    "socket-options-ipv4": ("socket-options-ipv4", _SocketFlood, True),
+    "socket-options-ipv6": ("socket-options-ipv6", _SocketFlood, True),
+    "simple-global-routing": ("simple-global-routing",
+                              lambda scale: ["--DataRate=%dkb/s" % (448 * scale), "--EnableMonitor=1"], True),
+    "global-routing-scaling": ("global-routing-scaling",
+                               lambda scale: ["--Topology=grid", "--Rows=%d" % (5 * scale), "--Cols=%d" % (5 * scale),
+                                              "--Flows=%d" % (10 * scale * scale), "--Verbose=0"], True),
+    "ping6": ("ping6", _PingFlood, True),
+    "wsn-ping6": ("wsn-ping6", lambda scale: ["--MaxPackets=%d" % (100 * scale), "--Interval=0.05"], True),
+    "radvd": ("radvd", _PingFlood, True),
+    "icmpv6-redirect": ("icmpv6-redirect", _PingFlood, True),
+    "fragmentation-ipv6": ("fragmentation-ipv6", _PingFlood, True),
+    "test-ipv6": ("test-ipv6", lambda scale: [], False),
+}
+
+# metric -> +1 if larger is worse, -1 if smaller is worse
+METRICS = {"wall": 1, "maxRssKiB": 1, "bytesWritten": 1, "eventsPerSecond": -1}
+
+
+def ReadProfile (workDir):
+    path = os.path.join (workDir, PROFILE)
+    if not os.path.exists (path):
+        return {}
+    with open (path) as f:
+        profile = json.load (f)
+    return {"profileBytes": os.path.getsize (path), "events": profile["events"],
+            "eventsPerSecond": profile["eventsPerSecond"], "simPerWall": profile["simPerWall"]}
+
+
+def RunScenario (name, scale):
+    example, args, profiled = SCENARIOS[name]
+    args = args (scale)
+    if profiled:
+        args = args + ["--Profile=%s" % PROFILE]
+    run = RunExample (EXAMPLES[example], args, inspect=ReadProfile)
+    run["bytesWritten"] -= run.pop ("profileBytes", 0)
+    run["args"] = args
+    return run
+
+
+def RunSuite (names, scale, repeat):
+    results = {}
+    print ("%-24s %10s %12s %14s %12s" % ("scenario", "wall [s]", "maxrss [MiB]", "written [MiB]", "events/s"))
+    for name in names:
+        runs = [RunScenario (name, scale) for _ in range (repeat)]
+        best = min (runs, key=lambda run: run["wall"])
+        results[name] = best
+        eventsPerSecond = best.get ("eventsPerSecond")
+        print ("%-24s %10.3f %12.1f %14.2f %12s" % (name, best["wall"], best["maxRssKiB"] / 1024.0,
+                                                    best["bytesWritten"] / 1048576.0,
+                                                    "%.0f" % eventsPerSecond if eventsPerSecond else "-"))
+    return results
+
+
+# [(scenario, metric, baseline, current, relative change)] beyond threshold
+def Compare (baseline, current, threshold):
+    regressions = []
+    for name, result in sorted (current["results"].items ()):
+        reference = baseline["results"].get (name)
+        if reference is None:
+            continue
+        for metric, direction in METRICS.items ():
+            old, new = reference.get (metric), result.get (metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if change * direction > threshold:
+                regressions.append ((name, metric, old, new, change))
+    return regressions
+
+
+def Report (baseline, current, threshold):
+    if baseline.get ("scale") != current.get ("scale"):
+        print ("warning: baseline scale %s, current scale %s" % (baseline.get ("scale"), current.get ("scale")))
+    regressions = Compare (baseline, current, threshold)
+    for name, metric, old, new, change in regressions:
+        print ("REGRESSION %-24s %-16s %14.4g -> %-14.4g (%+.1f%%)" % (name, metric, old, new, 100.0 * change))
+    if not regressions:
+        print ("no regressions over %.0f%%" % (100.0 * threshold))
+    return 1 if regressions else 0
+
+
+def Load (fileName):
+    with open (fileName) as f:
+        return json.load (f)
+
+
+def main (argv):
+    parser = argparse.ArgumentParser ()
+    commands = parser.add_subparsers (dest="command", required=True)
+    run = commands.add_parser ("run")
+    run.add_argument ("--scenarios", default=",".join (SCENARIOS))
+    run.add_argument ("--scale", type=int, default=1)
+    run.add_argument ("--repeat", type=int, default=3)
+    run.add_argument ("--save", help="write the results as a baseline file")
+    run.add_argument ("--baseline", help="compare the results with this baseline file")
+    run.add_argument ("--threshold", type=float, default=0.1)
+    compare = commands.add_parser ("compare")
+    compare.add_argument ("baseline")
+    compare.add_argument ("current")
+    compare.add_argument ("--threshold", type=float, default=0.1)
+    options = parser.parse_args (argv[1:])
+
+    if options.command == "compare":
+        return Report (Load (options.baseline), Load (options.current), options.threshold)
+
+    current = {
+        "scale": options.scale,
+        "python": platform.python_version (),
+        "machine": platform.machine (),
+        "results": RunSuite (options.scenarios.split (","), options.scale, options.repeat),
+    }
+    if options.save:
+        directory = os.path.dirname (os.path.abspath (options.save))
+        os.makedirs (directory, exist_ok=True)
+        with open (options.save, "w") as f:
+            json.dump (current, f, indent=2)
+    if options.baseline:
+        return Report (Load (options.baseline), current, options.threshold)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit (main (sys.argv))
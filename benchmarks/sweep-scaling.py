@@ -0,0 +1,59 @@
+#
+# Scaling of the simple-global-routing parameter sweep with the pool size.
+#
+# The same grid (on the example's four-node topology) is run with 1, 2, 4,
+# ... worker processes up to the number of cores; the table shows the
+# wall-clock time of the whole sweep, the speedup over one worker and the
+# parallel efficiency.
+#
+#   python benchmarks/sweep-scaling.py --points 32 --stop-jobs 16
+#
+
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.join (os.path.dirname (os.path.abspath (__file__)), os.pardir)
+sys.path.insert (0, ROOT)
+
+from common import sweep
+
+SCRIPT = os.path.join (ROOT, "routing", "simple-global-routing.py")
+
+
+def main (argv):
+    parser = argparse.ArgumentParser ()
+    parser.add_argument ("--points", type=int, default=16, help="grid points (distinct RngRun numbers)")
+    parser.add_argument ("--stop-jobs", type=int, default=os.cpu_count ())
+    parser.add_argument ("--data-rate", default="1Mb/s")
+    parser.add_argument ("--json", help="write the results to this file")
+    options = parser.parse_args (argv[1:])
+
+    # Identical points that only differ in their RngRun number
+    points = [{"DataRate": options.data_rate}] * options.points
+
+    jobList = []
+    jobs = 1
+    while jobs <= options.stop_jobs:
+        jobList.append (jobs)
+        jobs *= 2
+
+    results = []
+    print ("%5s %10s %8s %11s" % ("jobs", "wall [s]", "speedup", "efficiency"))
+    for jobs in jobList:
+        start = time.perf_counter ()
+        sweep.RunSweep (SCRIPT, points, jobs=jobs, extraArgs=["--EnableMonitor=1", "--TraceMode=off"])
+        wall = time.perf_counter () - start
+        speedup = results[0]["wall"] / wall if results else 1.0
+        results.append ({"jobs": jobs, "wall": wall, "speedup": speedup, "efficiency": speedup / jobs})
+        print ("%5d %10.2f %8.2f %10.0f%%" % (jobs, wall, speedup, 100 * speedup / jobs))
+
+    if options.json:
+        with open (options.json, "w") as f:
+            json.dump (results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main (sys.argv)
@@ -0,0 +1,165 @@
+#
+# Construction time of large variants of the examples' topologies.
+#
+# "sites" scales fragmentation-ipv6/radvd/icmpv6-redirect: a core router
+# with one CSMA link to every site router, and one CSMA LAN of hosts per
+# site, all IPv6 with one /64 per link.  "tree" scales
+# simple-global-routing: a random tree of point-to-point links with one
+# IPv4 /24 per link.  Each is built the way the examples used to do it
+# (one Node () and NodeContainer.Add per node, SetBase/Assign per subnet)
+# and with common.topology.Build, in a fresh process per run.
+#
+#   python benchmarks/topology-build.py --nodes 100,1000,10000
+#
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+from harness import ROOT, RunExample
+
+sys.path.insert (0, ROOT)
+
+RESULT = "topology-build.json"
+
+
+# Site routers and hosts per site for about n nodes.
+def SiteShape (n):
+    sites = max (1, int (round ((n - 1) ** 0.5)))
+    return sites, max (1, (n - 1) // sites - 1)
+
+
+def SitesSpec (n):
+    sites, hosts = SiteShape (n)
+    names = ["core"]
+    links = []
+    for s in range (sites):
+        router = "r%d" % s
+        members = ["h%d.%d" % (s, h) for h in range (hosts)]
+        names.append (router)
+        names.extend (members)
+        links.append ({"type": "lan", "nodes": ["core", router], "forwarding": ["core", router]})
+        links.append ({"type": "lan", "nodes": [router] + members, "forwarding": [router], "defaultRoute": router})
+    return {
+        "nodes": names,
+        "linkTypes": {"lan": {"helper": "csma", "channel": {"DataRate": "5Mbps", "Delay": "2ms"}}},
+        "ipv6": "2001:1::/64",
+        "links": links,
+    }
+
+
+def TreeSpec (n, seed=1):
+    rng = random.Random (seed)
+    return {
+        "nodes": n,
+        "linkTypes": {"p2p": {"helper": "p2p", "device": {"DataRate": "5Mbps"}, "channel": {"Delay": "2ms"}}},
+        "ipv4": "10.0.0.0/24",
+        "links": [("p2p", (i, rng.randrange (i))) for i in range (1, n)],
+    }
+
+
+# The examples' style: nodes one by one, containers filled with Add, one
+# SetBase per subnet.
+def BuildManually (spec):
+    import ns.core
+    import ns.network
+    import ns.internet
+    import ns.csma
+    import ns.point_to_point
+
+    names = spec["nodes"] if not isinstance (spec["nodes"], int) else list (range (spec["nodes"]))
+    nodes = {}
+    all = ns.network.NodeContainer ()
+    for name in names:
+        nodes[name] = ns.network.Node ()
+        all.Add (nodes[name])
+    ns.internet.InternetStackHelper ().Install (all)
+
+    ipv6 = "ipv6" in spec
+    for i, link in enumerate (spec["links"]):
+        kind, members = (link["type"], link["nodes"]) if isinstance (link, dict) else link
+        if kind == "lan":
+            helper = ns.csma.CsmaHelper ()
+            helper.SetChannelAttribute ("DataRate", ns.network.DataRateValue (ns.network.DataRate (5000000)))
+            helper.SetChannelAttribute ("Delay", ns.core.TimeValue (ns.core.MilliSeconds (2)))
+        else:
+            helper = ns.point_to_point.PointToPointHelper ()
+            helper.SetDeviceAttribute ("DataRate", ns.core.StringValue ("5Mbps"))
+            helper.SetChannelAttribute ("Delay", ns.core.StringValue ("2ms"))
+        container = ns.network.NodeContainer ()
+        for name in members:
+            container.Add (nodes[name])
+        devices = helper.Install (container)
+        if ipv6:
+            address = ns.internet.Ipv6AddressHelper ()
+            address.SetBase (ns.network.Ipv6Address ("2001:1:0:%x::" % i), ns.network.Ipv6Prefix (64))
+            interfaces = address.Assign (devices)
+            for name in link.get ("forwarding", ()):
+                interfaces.SetForwarding (members.index (name), True)
+            if "defaultRoute" in link:
+                interfaces.SetDefaultRouteInAllNodes (members.index (link["defaultRoute"]))
+        else:
+            address = ns.internet.Ipv4AddressHelper ()
+            address.SetBase (ns.network.Ipv4Address ("10.%d.%d.0" % (i // 256, i % 256)),
+                             ns.network.Ipv4Mask ("255.255.255.0"))
+            address.Assign (devices)
+
+
+def Worker (scenario, nodes, mode):
+    spec = SitesSpec (nodes) if scenario == "sites" else TreeSpec (nodes)
+    start = time.perf_counter ()
+    import ns.core
+    importTime = time.perf_counter () - start
+    start = time.perf_counter ()
+    if mode == "manual":
+        BuildManually (spec)
+    else:
+        from common import topology
+        topology.Build (spec)
+    build = time.perf_counter () - start
+    ns.core.Simulator.Destroy ()
+    with open (RESULT, "w") as f:
+        json.dump ({"build": build, "import": importTime}, f)
+
+
+def ReadResult (workDir):
+    with open (os.path.join (workDir, RESULT)) as f:
+        return json.load (f)
+
+
+def main (argv):
+    parser = argparse.ArgumentParser ()
+    parser.add_argument ("--nodes", default="100,1000,10000")
+    parser.add_argument ("--scenarios", default="sites,tree")
+    parser.add_argument ("--modes", default="manual,topology")
+    parser.add_argument ("--worker", nargs=3, metavar=("SCENARIO", "NODES", "MODE"), help=argparse.SUPPRESS)
+    parser.add_argument ("--json", help="write the results to this file")
+    options = parser.parse_args (argv[1:])
+
+    if options.worker:
+        scenario, nodes, mode = options.worker
+        Worker (scenario, int (nodes), mode)
+        return
+
+    results = []
+    print ("%-6s %8s %-9s %10s %12s" % ("shape", "nodes", "mode", "build [s]", "maxrss [MiB]"))
+    for scenario in options.scenarios.split (","):
+        for nodes in [int (n) for n in options.nodes.split (",")]:
+            for mode in options.modes.split (","):
+                run = RunExample (os.path.abspath (__file__), ["--worker", scenario, str (nodes), mode],
+                                  inspect=ReadResult)
+                row = {"scenario": scenario, "nodes": nodes, "mode": mode, "build": run["build"],
+                       "maxRssKiB": run["maxRssKiB"]}
+                results.append (row)
+                print ("%-6s %8d %-9s %10.3f %12.1f" % (scenario, nodes, mode, row["build"], row["maxRssKiB"] / 1024.0))
+
+    if options.json:
+        with open (options.json, "w") as f:
+            json.dump (results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main (sys.argv)
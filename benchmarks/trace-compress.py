@@ -0,0 +1,85 @@
+#
+# Trace output with and without buffering/compression.
+#
+# The synthetic mode (default) writes ASCII trace lines in small writes, the
+# way ns-3's std::ofstream does, to the path common.tracestream hands out,
+# and reports the writer's wall time and the size of the resulting file for
+# each compression/buffer setting.  --examples runs the given examples with
+# the matching --TraceCompress/--TraceBuffer options instead.
+#
+#   python benchmarks/trace-compress.py --lines 1000000
+#   python benchmarks/trace-compress.py --examples simple-global-routing,radvd
+#
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+from harness import EXAMPLES, ROOT, RunExample
+
+sys.path.insert (0, ROOT)
+
+from common import tracestream
+
+LINE = ("+ {time:.6f} /NodeList/{node}/DeviceList/0/$ns3::PointToPointNetDevice/TxQueue/Enqueue "
+        "ns3::PppHeader (Point-to-Point Protocol: IP (0x0021)) ns3::Ipv4Header (tos 0x0 DSCP Default ECN Not-ECT "
+        "ttl 64 id {seq} protocol 17 offset (bytes) 0 flags [none] length: 238 10.1.1.1 > 10.1.3.2) "
+        "ns3::UdpHeader (length: 218 49153 > 9) Payload (size=210)\n")
+
+# (compression, buffer size)
+SETTINGS = [("none", 0), ("none", 1 << 20), ("gzip", 1 << 20), ("zstd", 1 << 20)]
+
+
+def Synthetic (lines, compress, bufferSize, thread):
+    lineData = [LINE.format (time=i * 1e-4, node=i % 16, seq=i % 65536).encode () for i in range (50000)]
+    with tempfile.TemporaryDirectory () as workDir:
+        streams = tracestream.TraceStreams (compress, bufferSize, thread)
+        fileName = os.path.join (workDir, "synthetic.tr")
+        start = time.perf_counter ()
+        # Unbuffered small writes, one per line, like a flushed ofstream
+        with open (streams.NativePath (fileName), "wb", buffering=0) as f:
+            for i in range (lines):
+                f.write (lineData[i % 50000])
+        writerTime = time.perf_counter () - start
+        streams.Close ()
+        total = time.perf_counter () - start
+        return {"writer": writerTime, "total": total, "bytes": os.path.getsize (streams.Name (fileName))}
+
+
+def main (argv):
+    parser = argparse.ArgumentParser ()
+    parser.add_argument ("--lines", type=int, default=500000)
+    parser.add_argument ("--examples", help="comma-separated examples to run instead of the synthetic writer")
+    parser.add_argument ("--thread", action="store_true", help="pass --TraceWriterThread=1 to the examples")
+    parser.add_argument ("--json", help="write the results to this file")
+    options = parser.parse_args (argv[1:])
+
+    results = []
+    if options.examples:
+        print ("%-22s %-6s %9s %10s %14s" % ("example", "codec", "buffer", "wall [s]", "bytes"))
+        for name in options.examples.split (","):
+            for compress, bufferSize in SETTINGS:
+                args = ["--TraceCompress=%s" % compress, "--TraceBuffer=%d" % bufferSize,
+                        "--TraceWriterThread=%d" % options.thread]
+                run = RunExample (EXAMPLES[name], args)
+                results.append ({"example": name, "compress": compress, "buffer": bufferSize,
+                                 "wall": run["wall"], "bytesWritten": run["bytesWritten"]})
+                print ("%-22s %-6s %9d %10.3f %14d" % (name, compress, bufferSize, run["wall"], run["bytesWritten"]))
+    else:
+        print ("%-6s %9s %10s %10s %14s" % ("codec", "buffer", "writer [s]", "total [s]", "bytes"))
+        for compress, bufferSize in SETTINGS:
+            row = Synthetic (options.lines, compress, bufferSize, False)
+            row.update ({"compress": compress, "buffer": bufferSize})
+            results.append (row)
+            print ("%-6s %9d %10.3f %10.3f %14d" % (compress, bufferSize, row["writer"], row["total"], row["bytes"]))
+
+    if options.json:
+        with open (options.json, "w") as f:
+            json.dump (results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main (sys.argv)
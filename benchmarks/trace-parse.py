@@ -0,0 +1,136 @@
+#
+# Columnar trace reader vs. naive line-by-line parsing of ns-3 ASCII traces.
+#
+# Without --trace a synthetic trace mixing the point-to-point/IPv4 lines of
+# simple-global-routing.tr and the CSMA/IPv6 lines of radvd.tr is generated.
+# The benchmark reports the time to parse the whole file naively and with
+# common.tracefile.ReadTrace, the time to build the sidecar index, and the
+# time of an indexed query for a short time window on one node.
+#
+#   python benchmarks/trace-parse.py --lines 2000000
+#   python benchmarks/trace-parse.py --trace simple-global-routing.tr
+#
+
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join (os.path.dirname (os.path.abspath (__file__)), os.pardir)
+sys.path.insert (0, ROOT)
+
+from common import tracefile
+
+P2P_LINE = ("{kind} {time:.6f} /NodeList/{node}/DeviceList/{device}/$ns3::PointToPointNetDevice/TxQueue/Enqueue "
+            "ns3::PppHeader (Point-to-Point Protocol: IP (0x0021)) ns3::Ipv4Header (tos 0x0 DSCP Default ECN Not-ECT "
+            "ttl 64 id {seq} protocol 17 offset (bytes) 0 flags [none] length: 238 10.1.1.1 > 10.1.3.2) "
+            "ns3::UdpHeader (length: 218 49153 > 9) Payload (size=210)\n")
+CSMA_LINE = ("{kind} {time:.6f} /NodeList/{node}/DeviceList/{device}/$ns3::CsmaNetDevice/TxQueue/Enqueue "
+             "ns3::EthernetHeader ( length/type=0x86dd, source=00:00:00:00:00:01, destination=00:00:00:00:00:02) "
+             "ns3::Ipv6Header (Version 6 Traffic class 0x0 DSCP Default ECN Not-ECT Flow Label 0x0 Payload Length 1032 "
+             "Next Header 58 Hop Limit 64 ) ns3::Icmpv6Echo (type = 128 (code = 0) id = 48879 seq = {seq}) "
+             "Payload (size=1024) ns3::EthernetTrailer (fcs=0)\n")
+
+
+def WriteSyntheticTrace (fileName, lines, nodes):
+    kinds = "+-r"
+    with open (fileName, "w") as f:
+        for i in range (lines):
+            template = P2P_LINE if i % 2 else CSMA_LINE
+            f.write (template.format (kind=kinds[i % 3], time=i * 1e-4, node=i % nodes,
+                                      device=i % 2, seq=i % 65536))
+
+
+# The usual post-processing script: decode, match and build a dict per line.
+NAIVE_LINE = re.compile (r"^([-+rdt]) (\S+) /NodeList/(\d+)/DeviceList/(\d+)/\S* (.*)$")
+NAIVE_IPV4 = re.compile (r"Ipv4Header \(.*?length: (\d+)")
+NAIVE_IPV6 = re.compile (r"Payload Length (\d+)")
+NAIVE_PAYLOAD = re.compile (r"Payload \(size=(\d+)\)")
+NAIVE_HEADER = re.compile (r"ns3::(\w+)")
+
+
+def NaiveParse (fileName):
+    events = []
+    with open (fileName) as f:
+        for line in f:
+            m = NAIVE_LINE.match (line)
+            if not m:
+                continue
+            packet = m.group (5)
+            ipv4 = NAIVE_IPV4.search (packet)
+            ipv6 = NAIVE_IPV6.search (packet)
+            if ipv4:
+                size = int (ipv4.group (1))
+            elif ipv6:
+                size = int (ipv6.group (1)) + 40
+            else:
+                size = sum (int (s) for s in NAIVE_PAYLOAD.findall (packet))
+            headers = [h for h in NAIVE_HEADER.findall (packet) if not h.endswith ("Trailer")]
+            events.append ({"kind": m.group (1), "time": float (m.group (2)), "node": int (m.group (3)),
+                            "device": int (m.group (4)), "size": size,
+                            "protocol": headers[-1] if headers else ""})
+    return events
+
+
+def Timed (function, *args):
+    start = time.perf_counter ()
+    result = function (*args)
+    return time.perf_counter () - start, result
+
+
+def main (argv):
+    parser = argparse.ArgumentParser ()
+    parser.add_argument ("--trace", help="existing trace file (default: generate one)")
+    parser.add_argument ("--lines", type=int, default=500000)
+    parser.add_argument ("--nodes", type=int, default=64)
+    parser.add_argument ("--jobs", type=int, default=1, help="processes parsing chunks in parallel")
+    parser.add_argument ("--json", help="write the results to this file")
+    options = parser.parse_args (argv[1:])
+
+    with tempfile.TemporaryDirectory () as workDir:
+        fileName = options.trace
+        if fileName is None:
+            fileName = os.path.join (workDir, "synthetic.tr")
+            WriteSyntheticTrace (fileName, options.lines, options.nodes)
+
+        naiveTime, events = Timed (NaiveParse, fileName)
+        columnarTime, columns = Timed (tracefile.ReadTrace, fileName, tracefile.DEFAULT_CHUNK_SIZE, options.jobs)
+        assert len (events) == len (columns)
+
+        index = tracefile.TraceIndex (fileName)
+        buildTime, _ = Timed (index.Build)
+        index.Save ()
+        loadTime, loaded = Timed (tracefile.TraceIndex.Open, fileName)
+
+        tmin, tmax = min (columns.time), max (columns.time)
+        start = tmin + 0.5 * (tmax - tmin)
+        stop = start + 0.01 * (tmax - tmin)
+        queryTime, window = Timed (loaded.Query, start, stop, columns.node[0])
+
+        results = {
+            "file": fileName if options.trace else "synthetic",
+            "bytes": os.path.getsize (fileName),
+            "events": len (columns),
+            "naive": naiveTime,
+            "columnar": columnarTime,
+            "speedup": naiveTime / columnarTime,
+            "indexBuild": buildTime,
+            "indexLoad": loadTime,
+            "indexBlocks": len (loaded.blocks),
+            "query": queryTime,
+            "queryEvents": len (window),
+        }
+
+    for key, value in results.items ():
+        print ("%-12s %s" % (key, "%.3f" % value if isinstance (value, float) else value))
+
+    if options.json:
+        with open (options.json, "w") as f:
+            json.dump (results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main (sys.argv)
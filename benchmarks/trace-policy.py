@@ -0,0 +1,68 @@
+#
+# Wall-clock cost of tracing for every example, per tracing policy.
+#
+# Each example is run with full tracing (the old behaviour), with tracing
+# off, with 1-in-N sampling, with node selection and with pcap snaplen
+# truncation; the table shows wall time and bytes written per policy.
+#
+#   python benchmarks/trace-policy.py --examples simple-global-routing,radvd
+#
+
+import argparse
+import json
+import sys
+
+from harness import EXAMPLES, RunExample
+
+# Arguments that make the examples run long enough to measure.
+SCENARIOS = {
+    "socket-options-ipv4": ["--PacketCount=20000", "--Interval=0.0001", "--PacketSize=512"],
+    "socket-options-ipv6": ["--PacketCount=20000", "--Interval=0.0001", "--PacketSize=512"],
+    "simple-global-routing": ["--DataRate=1Mb/s"],
+    "fragmentation-ipv6": [],
+    "icmpv6-redirect": [],
+    "ping6": [],
+    "radvd": [],
+    "wsn-ping6": [],
+}
+
+POLICIES = {
+    "all": ["--TraceMode=all"],
+    "off": ["--TraceMode=off"],
+    "sample10": ["--TraceSample=10"],
+    "node0": ["--TraceNodes=0"],
+    "snaplen64": ["--TraceSnaplen=64"],
+}
+
+
+def main (argv):
+    parser = argparse.ArgumentParser ()
+    parser.add_argument ("--examples", default=",".join (SCENARIOS))
+    parser.add_argument ("--policies", default=",".join (POLICIES))
+    parser.add_argument ("--repeat", type=int, default=3)
+    parser.add_argument ("--json", help="write the results to this file")
+    options = parser.parse_args (argv[1:])
+
+    policies = options.policies.split (",")
+    results = []
+    print ("%-22s %-10s %10s %14s %8s" % ("example", "policy", "wall [s]", "bytes", "vs all"))
+    for name in options.examples.split (","):
+        reference = None
+        for policy in policies:
+            args = SCENARIOS[name] + POLICIES[policy]
+            runs = [RunExample (EXAMPLES[name], args) for _ in range (options.repeat)]
+            wall = min (run["wall"] for run in runs)
+            row = {"example": name, "policy": policy, "wall": wall, "bytesWritten": runs[0]["bytesWritten"]}
+            if reference is None:
+                reference = wall
+            row["relative"] = wall / reference
+            results.append (row)
+            print ("%-22s %-10s %10.3f %14d %8.2f" % (name, policy, wall, row["bytesWritten"], row["relative"]))
+
+    if options.json:
+        with open (options.json, "w") as f:
+            json.dump (results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main (sys.argv)
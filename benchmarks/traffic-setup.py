@@ -0,0 +1,134 @@
+#
+# Application setup time of common.traffic against hand-installed pairs.
+#
+# Builds a grid of point-to-point links and a random traffic matrix of
+# constant-rate UDP flows (and every tenth flow a BulkSend TCP transfer),
+# then installs it either the way simple-global-routing.py used to, one
+# OnOffHelper/PacketSinkHelper pair with its own Start/Stop per flow
+# ("perflow"), or with traffic.Install ("engine").  Each run happens in a
+# fresh process; the table gives the application setup time and the number
+# of applications created as the flow count grows.
+#
+#   python benchmarks/traffic-setup.py --flows 100,1000,10000 --rows 20 --cols 20
+#
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+from harness import ROOT, RunExample
+
+sys.path.insert (0, ROOT)
+
+RESULT = "traffic-setup.json"
+
+
+def Matrix (hosts, flows, ports, seed=1):
+    rng = random.Random (seed)
+    matrix = []
+    for i in range (flows):
+        source, destination = rng.sample (hosts, 2)
+        start = 1.0 + 0.001 * rng.randrange (1000)
+        if i % 10 == 9:
+            matrix.append ((source, destination, "tcp", "", start, 10.0, 512, 9))
+        else:
+            matrix.append ((source, destination, "udp", "448kb/s", start, 10.0, 210, 9 + i % ports))
+    return matrix
+
+
+def PerFlow (topo, matrix):
+    import ns.core
+    import ns.network
+    import ns.applications
+    from common import nscache
+
+    count = 0
+    for source, destination, protocol, rate, start, stop, packetSize, port in matrix:
+        factory = "ns3::TcpSocketFactory" if protocol == "tcp" else "ns3::UdpSocketFactory"
+        link, position = topo.LinksOf (destination)[0]
+        remote = ns.network.InetSocketAddress (link.interfaces.GetAddress (position), port)
+        if rate:
+            helper = ns.applications.OnOffHelper (factory, ns.network.Address (remote))
+            helper.SetConstantRate (nscache.DataRate (rate), packetSize)
+        else:
+            helper = ns.applications.BulkSendHelper (factory, ns.network.Address (remote))
+            helper.SetAttribute ("SendSize", ns.core.UintegerValue (packetSize))
+        apps = helper.Install (topo.Node (source))
+        apps.Start (nscache.Time (start))
+        apps.Stop (nscache.Time (stop))
+        sink = ns.applications.PacketSinkHelper (
+            factory, ns.network.InetSocketAddress (ns.network.Ipv4Address.GetAny (), port))
+        apps = sink.Install (topo.Node (destination))
+        apps.Start (nscache.Time (start))
+        apps.Stop (nscache.Time (stop))
+        count += 2
+    return count
+
+
+def Worker (rows, cols, flows, ports, mode):
+    import ns.core
+    from common import topology
+    from common import traffic
+
+    spec = topology.GridSpec (rows, cols, {"device": {"DataRate": "5Mbps"}, "channel": {"Delay": "2ms"}})
+    topo = topology.Build (spec)
+    matrix = Matrix (spec["hosts"], flows, ports)
+
+    start = time.perf_counter ()
+    if mode == "engine":
+        engine = traffic.Install (topo, matrix)
+        applications = len (engine.sinks) + len (engine.sources)
+    else:
+        applications = PerFlow (topo, matrix)
+    setup = time.perf_counter () - start
+
+    ns.core.Simulator.Destroy ()
+    with open (RESULT, "w") as f:
+        json.dump ({"setup": setup, "applications": applications}, f)
+
+
+def ReadResult (workDir):
+    with open (os.path.join (workDir, RESULT)) as f:
+        return json.load (f)
+
+
+def main (argv):
+    parser = argparse.ArgumentParser ()
+    parser.add_argument ("--flows", default="100,1000,10000")
+    parser.add_argument ("--rows", type=int, default=20)
+    parser.add_argument ("--cols", type=int, default=20)
+    parser.add_argument ("--ports", type=int, default=4, help="distinct UDP sink ports")
+    parser.add_argument ("--modes", default="perflow,engine")
+    parser.add_argument ("--worker", nargs=5, metavar=("ROWS", "COLS", "FLOWS", "PORTS", "MODE"),
+                         help=argparse.SUPPRESS)
+    parser.add_argument ("--json", help="write the results to this file")
+    options = parser.parse_args (argv[1:])
+
+    if options.worker:
+        rows, cols, flows, ports, mode = options.worker
+        Worker (int (rows), int (cols), int (flows), int (ports), mode)
+        return
+
+    results = []
+    print ("%8s %-8s %10s %12s %12s" % ("flows", "mode", "setup [s]", "us/flow", "apps"))
+    for flows in [int (n) for n in options.flows.split (",")]:
+        for mode in options.modes.split (","):
+            run = RunExample (os.path.abspath (__file__),
+                              ["--worker", str (options.rows), str (options.cols), str (flows), str (options.ports),
+                               mode], inspect=ReadResult)
+            row = {"flows": flows, "mode": mode, "setup": run["setup"], "applications": run["applications"],
+                   "maxRssKiB": run["maxRssKiB"]}
+            results.append (row)
+            print ("%8d %-8s %10.3f %12.1f %12d" % (flows, mode, row["setup"], 1e6 * row["setup"] / flows,
+                                                    row["applications"]))
+
+    if options.json:
+        with open (options.json, "w") as f:
+            json.dump (results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main (sys.argv)
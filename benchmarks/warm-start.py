@@ -0,0 +1,78 @@
+#
+# Cold starts vs. runs through the warm common/simserver.py server.
+#
+# Cold runs start a new interpreter per scenario (harness.RunExample);
+# warm runs are requests to a server started once with the bindings
+# preloaded, each forked into a clean child.  Both run in a scratch
+# directory per run.  The server start-up time is reported separately.
+#
+#   python benchmarks/warm-start.py --examples ping6,radvd,simple-global-routing --runs 20
+#
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from harness import EXAMPLES, ROOT, RunExample
+
+sys.path.insert (0, ROOT)
+
+from common import simserver
+
+
+def RunWarm (socketPath, script, args):
+    with tempfile.TemporaryDirectory () as workDir:
+        start = time.perf_counter ()
+        reply = simserver.Run (socketPath, script, args, cwd=workDir)
+        wall = time.perf_counter () - start
+    if reply["returncode"] != 0:
+        raise RuntimeError ("%s %s failed (%d):\n%s" % (script, " ".join (args), reply["returncode"], reply["stderr"]))
+    return wall
+
+
+def main (argv):
+    parser = argparse.ArgumentParser ()
+    parser.add_argument ("--examples", default="ping6,radvd,simple-global-routing")
+    parser.add_argument ("--args", default="", help="extra arguments for every run, comma-separated")
+    parser.add_argument ("--runs", type=int, default=10)
+    parser.add_argument ("--json", help="write the results to this file")
+    options = parser.parse_args (argv[1:])
+    args = [arg for arg in options.args.split (",") if arg]
+
+    with tempfile.TemporaryDirectory () as serverDir:
+        socketPath = os.path.join (serverDir, "simserver.sock")
+        start = time.perf_counter ()
+        server = subprocess.Popen ([sys.executable, os.path.join (ROOT, "common", "simserver.py"), "serve",
+                                    "--socket", socketPath, "--jobs", "1"])
+        try:
+            simserver.WaitReady (socketPath)
+            serverStart = time.perf_counter () - start
+
+            results = {"serverStart": serverStart, "examples": []}
+            print ("server start: %.3f s" % serverStart)
+            print ("%-22s %10s %10s %8s" % ("example", "cold [s]", "warm [s]", "speedup"))
+            for name in options.examples.split (","):
+                script = EXAMPLES[name]
+                cold = [RunExample (script, args)["wall"] for _ in range (options.runs)]
+                warm = [RunWarm (socketPath, script, args) for _ in range (options.runs)]
+                row = {"example": name, "runs": options.runs,
+                       "cold": sum (cold) / len (cold), "warm": sum (warm) / len (warm),
+                       "coldMin": min (cold), "warmMin": min (warm)}
+                row["speedup"] = row["cold"] / row["warm"]
+                results["examples"].append (row)
+                print ("%-22s %10.3f %10.3f %8.2f" % (name, row["cold"], row["warm"], row["speedup"]))
+        finally:
+            server.terminate ()
+            server.wait ()
+
+    if options.json:
+        with open (options.json, "w") as f:
+            json.dump (results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main (sys.argv)
@@ -0,0 +1,62 @@
+#
+# wsn-ping6.py's scaled mode over growing node counts, with and without
+# the channel cut at the interference range (--SpatialIndex).
+#
+# Every run places --nodes sensors on a grid (or at random with --layout
+# random), lets one node in --pair-every ping its nearest neighbour and is
+# profiled (--Profile); the table gives the wall-clock time, the events
+# executed and the events per second of Simulator.Run.
+#
+#   python benchmarks/wsn-scaling.py --nodes 100,400,1600 --range 200
+#
+
+import argparse
+import json
+import os
+import sys
+
+from harness import EXAMPLES, RunExample
+
+PROFILE = "wsn-scaling-profile.json"
+
+
+def ReadProfile (workDir):
+    with open (os.path.join (workDir, PROFILE)) as f:
+        profile = json.load (f)
+    return {"run": profile["wall"], "events": profile["events"], "eventsPerSecond": profile["eventsPerSecond"]}
+
+
+def main (argv):
+    parser = argparse.ArgumentParser ()
+    parser.add_argument ("--nodes", default="100,400,1600")
+    parser.add_argument ("--layout", default="grid")
+    parser.add_argument ("--spacing", type=float, default=50.0)
+    parser.add_argument ("--range", type=float, default=200.0, help="interference range in metres")
+    parser.add_argument ("--pair-every", type=int, default=10, help="one pinging node per this many nodes")
+    parser.add_argument ("--max-packets", type=int, default=5)
+    parser.add_argument ("--json", help="write the results to this file")
+    options = parser.parse_args (argv[1:])
+
+    results = []
+    print ("%8s %-6s %10s %10s %12s %12s" % ("nodes", "index", "wall [s]", "run [s]", "events", "events/s"))
+    for nodes in [int (n) for n in options.nodes.split (",")]:
+        for spatialIndex in (0, 1):
+            args = ["--Nodes=%d" % nodes, "--Layout=%s" % options.layout, "--Spacing=%g" % options.spacing,
+                    "--Pairs=%d" % max (1, nodes // options.pair_every), "--Range=%g" % options.range,
+                    "--SpatialIndex=%d" % spatialIndex, "--MaxPackets=%d" % options.max_packets,
+                    "--Profile=%s" % PROFILE]
+            run = RunExample (EXAMPLES["wsn-ping6"], args, inspect=ReadProfile)
+            row = {"nodes": nodes, "spatialIndex": bool (spatialIndex), "wall": run["wall"], "run": run["run"],
+                   "events": run["events"], "eventsPerSecond": run["eventsPerSecond"],
+                   "maxRssKiB": run["maxRssKiB"]}
+            results.append (row)
+            print ("%8d %-6s %10.3f %10.3f %12d %12.0f" % (nodes, "yes" if spatialIndex else "no", row["wall"],
+                                                          row["run"], row["events"], row["eventsPerSecond"]))
+
+    if options.json:
+        with open (options.json, "w") as f:
+            json.dump (results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main (sys.argv)
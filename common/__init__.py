@@ -0,0 +1,7 @@
+#
+# Helpers shared by the example scripts.
+#
+# The examples live in per-topic directories and are run directly
+# (python socket/socket-options-ipv4.py), so each script puts the
+# repository root on sys.path before importing from this package.
+#
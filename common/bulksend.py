@@ -0,0 +1,91 @@
+#
+# Bulk packet generation for the socket-options examples.
+#
+# The per-packet path of the examples re-enters Python through
+# Simulator.Schedule for every packet.  The functions below hand the whole
+# send schedule to ns-3's native UdpClient application instead, so Python
+# only runs while the schedule is being installed:
+#
+# - a count/size/interval schedule is a single UdpClient;
+# - an explicit list of send times is run-length encoded into segments of
+#   constant spacing, and every segment becomes one UdpClient.
+#
+# UdpClient opens its own UDP socket, so options set on the example's
+# socket do not reach these packets.  Options that the L3 protocols can
+# apply node-wide (DefaultTtl, DefaultTclass) have to be set on the sending
+# node instead.  UdpClient also writes its 12 byte SeqTs header into the
+# payload, which is why PacketSize cannot go below 12 bytes in bulk mode.
+#
+
+from common import lazyns
+ns = lazyns.Import ("core", "network", "applications")
+
+MIN_PACKET_SIZE = 12
+
+# Send times closer than this are considered equally spaced.
+SEGMENT_TOLERANCE = 1e-9
+
+
+def _NanoSeconds (seconds):
+    return ns.core.NanoSeconds (int (round (seconds * 1e9)))
+
+
+def InstallBulkSender (node, remote, port, pktSize, pktCount, pktInterval, start):
+    if pktSize < MIN_PACKET_SIZE:
+        raise ValueError ("bulk mode needs PacketSize >= %d bytes" % MIN_PACKET_SIZE)
+
+    client = ns.applications.UdpClientHelper (ns.network.Address (remote), port)
+    client.SetAttribute ("MaxPackets", ns.core.UintegerValue (pktCount))
+    client.SetAttribute ("Interval", ns.core.TimeValue (pktInterval))
+    client.SetAttribute ("PacketSize", ns.core.UintegerValue (pktSize))
+    apps = client.Install (node)
+    apps.Start (start)
+    return apps
+
+
+# Split sorted send times (in seconds) into (start, interval, count) runs.
+def ScheduleSegments (sendTimes, tolerance=SEGMENT_TOLERANCE):
+    segments = []
+    n = len (sendTimes)
+    i = 0
+    while i < n:
+        if i + 1 == n:
+            segments.append ((sendTimes[i], 0.0, 1))
+            break
+        gap = sendTimes[i + 1] - sendTimes[i]
+        if gap < 0:
+            raise ValueError ("send times must be sorted")
+        j = i + 1
+        while j + 1 < n and abs ((sendTimes[j + 1] - sendTimes[j]) - gap) <= tolerance:
+            j += 1
+        segments.append ((sendTimes[i], gap, j - i + 1))
+        i = j + 1
+    return segments
+
+
+def InstallScheduledSender (node, remote, port, pktSize, sendTimes):
+    if pktSize < MIN_PACKET_SIZE:
+        raise ValueError ("bulk mode needs PacketSize >= %d bytes" % MIN_PACKET_SIZE)
+
+    client = ns.applications.UdpClientHelper (ns.network.Address (remote), port)
+    client.SetAttribute ("PacketSize", ns.core.UintegerValue (pktSize))
+    apps = ns.network.ApplicationContainer ()
+    for start, interval, count in ScheduleSegments (sendTimes):
+        client.SetAttribute ("MaxPackets", ns.core.UintegerValue (count))
+        client.SetAttribute ("Interval", ns.core.TimeValue (_NanoSeconds (interval)))
+        segment = client.Install (node)
+        segment.Start (_NanoSeconds (start))
+        apps.Add (segment)
+    return apps
+
+
+# Read send times (seconds, one per line, '#' starts a comment).
+def LoadSendTimes (fileName):
+    sendTimes = []
+    with open (fileName) as f:
+        for line in f:
+            line = line.split ("#", 1)[0].strip ()
+            if line:
+                sendTimes.append (float (line))
+    sendTimes.sort ()
+    return sendTimes
@@ -0,0 +1,14 @@
+#
+# Small helpers around ns.core.CommandLine.
+#
+# CommandLine.AddValue (name, help) stores the parsed value on the
+# CommandLine object under the same attribute name, as a string once the
+# option has been given on the command line.  Defaults keep whatever
+# Python type the script assigned, so values have to be converted back.
+#
+
+def GetBool (value):
+    if isinstance (value, str):
+        return value.strip ().lower () in ("1", "true", "yes", "on")
+    return bool (value)
+
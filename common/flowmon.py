@@ -0,0 +1,106 @@
+#
+# FlowMonitor helpers shared by the routing examples.
+#
+
+from common import lazyns
+ns = lazyns.Import ("core", "flow_monitor")
+
+from common import profiling
+
+PROTOCOLS = {6: "TCP", 17: "UDP"}
+
+
+# Return one dictionary per flow with the classifier five-tuple and the
+# FlowMonitor counters, in flow id order.
+def CollectFlowStats (flowmonHelper):
+    monitor = flowmonHelper.GetMonitor ()
+    monitor.CheckForLostPackets ()
+    classifier = flowmonHelper.GetClassifier ()
+    flows = []
+    for flowId, stats in monitor.GetFlowStats ():
+        t = classifier.FindFlow (flowId)
+        flows.append ({
+            "flowId": flowId,
+            "protocol": PROTOCOLS.get (t.protocol, t.protocol),
+            "source": "%s:%d" % (t.sourceAddress, t.sourcePort),
+            "destination": "%s:%d" % (t.destinationAddress, t.destinationPort),
+            "txPackets": stats.txPackets,
+            "txBytes": stats.txBytes,
+            "rxPackets": stats.rxPackets,
+            "rxBytes": stats.rxBytes,
+            "lostPackets": stats.lostPackets,
+            "delaySum": stats.delaySum.GetSeconds (),
+            "jitterSum": stats.jitterSum.GetSeconds (),
+        })
+    flows.sort (key=lambda flow: flow["flowId"])
+    return flows
+
+
+# Periodic, incremental FlowMonitor export.
+#
+# Every interval of simulated time the streamer writes one record per flow
+# whose counters changed, holding the deltas since the previous record of
+# that flow.  The first record of a flow also carries its five-tuple.  With
+# histograms=True the changed delay-histogram bins are added as
+# {"bin start": delta count}.  Summing the deltas of a flow gives the
+# totals that SerializeToXmlFile would have written at the end.
+class FlowStatsStreamer (object):
+
+    COUNTERS = ("txBytes", "rxBytes", "txPackets", "rxPackets", "lostPackets")
+
+    def __init__ (self, flowmonHelper, writer, interval, histograms=False):
+        self.flowmonHelper = flowmonHelper
+        self.writer = writer
+        self.interval = interval
+        self.histograms = histograms
+        self._last = {}
+        self._lastBins = {}
+
+    def Start (self):
+        self._sample = profiling.Wrap ("flowmon", self._Sample)
+        ns.core.Simulator.Schedule (self.interval, self._sample)
+
+    def _Sample (self):
+        self.Sample ()
+        # Stop rescheduling once no other events are left, so the streamer
+        # never keeps a simulation without a Stop time running forever.
+        if not ns.core.Simulator.IsFinished ():
+            ns.core.Simulator.Schedule (self.interval, self._sample)
+
+    def Sample (self):
+        monitor = self.flowmonHelper.GetMonitor ()
+        monitor.CheckForLostPackets ()
+        now = ns.core.Simulator.Now ().GetSeconds ()
+        for flowId, stats in monitor.GetFlowStats ():
+            current = (stats.txBytes, stats.rxBytes, stats.txPackets, stats.rxPackets,
+                       stats.lostPackets, stats.delaySum.GetNanoSeconds ())
+            last = self._last.get (flowId)
+            if current == last:
+                continue
+            record = {"t": now, "flow": flowId}
+            if last is None:
+                last = (0,) * len (current)
+                t = self.flowmonHelper.GetClassifier ().FindFlow (flowId)
+                record["protocol"] = PROTOCOLS.get (t.protocol, t.protocol)
+                record["source"] = "%s:%d" % (t.sourceAddress, t.sourcePort)
+                record["destination"] = "%s:%d" % (t.destinationAddress, t.destinationPort)
+            for name, value, previous in zip (self.COUNTERS, current, last):
+                record[name] = value - previous
+            record["delaySumNs"] = current[-1] - last[-1]
+            if self.histograms:
+                record["delayHistogram"] = self._HistogramDelta (flowId, stats.delayHistogram)
+            self._last[flowId] = current
+            self.writer.Write (record)
+        # One write per interval: the records are on disk while the run goes on
+        self.writer.Flush ()
+
+    def _HistogramDelta (self, flowId, histogram):
+        counts = [histogram.GetBinCount (i) for i in range (histogram.GetNBins ())]
+        last = self._lastBins.get (flowId, [])
+        delta = {}
+        for i, count in enumerate (counts):
+            previous = last[i] if i < len (last) else 0
+            if count != previous:
+                delta["%g" % histogram.GetBinStart (i)] = count - previous
+        self._lastBins[flowId] = counts
+        return delta
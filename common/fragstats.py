@@ -0,0 +1,247 @@
+#
+# IPv6 fragment reassembly statistics.
+#
+# FragStats connects to the Rx and Drop trace sources of the
+# Ipv6L3Protocol of every node given (the end hosts; routers forward
+# fragments without reassembling them).  Every received fragment is peeked
+# (IPv6 header, then fragment header) and added to the pending datagram it
+# belongs to, keyed by source, destination and identification; a datagram
+# is complete once the fragment without the more-fragments flag has come
+# and all bytes up to its end have.  That gives:
+#
+# - reassembly memory: bytes and datagrams held in reassembly buffers, and
+#   their high-water marks (the fragment payload bytes ns-3 keeps until a
+#   datagram completes or times out);
+# - reassembly latency: time from the first fragment of a datagram to its
+#   last, with min/avg/max and 50/90/99th percentiles;
+# - fragments, datagrams completed, reassembly timeouts (Drop with
+#   DROP_FRAGMENT_TIMEOUT) and datagrams still incomplete at the end;
+# - wall-clock time and events per second of the run, when Start/Stop are
+#   called around Simulator.Run.
+#
+#   stats = fragstats.FragStats (hosts)
+#   stats.Start ()
+#   profiler.Run ()
+#   stats.Stop ()
+#   stats.Report ("fragmentation-ipv6.fragstats.json")
+#
+# PmtuStats counts the other side, what a sender puts on the wire while it
+# discovers the path MTU.
+#
+
+import array
+import json
+import time
+
+from common import lazyns
+ns = lazyns.Import ("core", "internet")
+
+from common import profiling
+
+FRAGMENT = 44
+FRAGMENT_HEADER = 8
+ICMPV6 = 58
+PACKET_TOO_BIG = 2
+UDP = 17
+PERCENTILES = (50, 90, 99)
+
+
+# Echo payload sizes around the points where a datagram needs one more
+# fragment on a link of this MTU, up to that many fragments.
+def MtuSizes (mtu, multiples):
+    # Fragmentable data per fragment, a multiple of 8 bytes
+    perFragment = (mtu - 40 - FRAGMENT_HEADER) // 8 * 8
+    # 8 bytes of ICMPv6 echo header precede the payload
+    sizes = [mtu - 40 - 8 - 1, mtu - 40 - 8, mtu - 40 - 8 + 1]
+    for k in range (2, multiples + 1):
+        boundary = k * perFragment - 8
+        sizes.extend ((boundary - 1, boundary, boundary + 1))
+    return sizes
+
+
+class FragStats (object):
+
+    def __init__ (self, nodes):
+        self._timeout = int (ns.internet.Ipv6L3Protocol.DROP_FRAGMENT_TIMEOUT)
+        self.fragments = 0
+        self.completed = 0
+        self.timeouts = 0
+        self.bytes = 0
+        self.maxBytes = 0
+        self.maxDatagrams = 0
+        self.latencies = array.array ("d")
+        # (source, destination, identification) -> [first time, bytes, total or None]
+        self.pending = {}
+        self.wall = None
+        self.events = None
+        self._ipv6 = ns.internet.Ipv6Header ()
+        self._fragment = ns.internet.Ipv6ExtensionFragmentHeader ()
+        for i in range (nodes.GetN ()):
+            path = "/NodeList/%d/$ns3::Ipv6L3Protocol/" % nodes.Get (i).GetId ()
+            ns.core.Config.ConnectWithoutContext (path + "Rx", profiling.Wrap ("fragstats", self._Received))
+            ns.core.Config.ConnectWithoutContext (path + "Drop", profiling.Wrap ("fragstats", self._Dropped))
+
+    def _Received (self, packet, ipv6, interface):
+        header = self._ipv6
+        packet = packet.Copy ()
+        packet.RemoveHeader (header)
+        if header.GetNextHeader () != FRAGMENT:
+            return
+        fragment = self._fragment
+        packet.PeekHeader (fragment)
+        self.fragments += 1
+        key = (str (header.GetSourceAddress ()), str (header.GetDestinationAddress ()),
+               fragment.GetIdentification ())
+        size = header.GetPayloadLength () - FRAGMENT_HEADER
+        now = ns.core.Simulator.Now ().GetSeconds ()
+        entry = self.pending.get (key)
+        if entry is None:
+            entry = self.pending[key] = [now, 0, None]
+        entry[1] += size
+        if not fragment.GetMoreFragment ():
+            entry[2] = fragment.GetOffset () + size
+        self.bytes += size
+        if self.bytes > self.maxBytes:
+            self.maxBytes = self.bytes
+        if len (self.pending) > self.maxDatagrams:
+            self.maxDatagrams = len (self.pending)
+        if entry[2] is not None and entry[1] >= entry[2]:
+            del self.pending[key]
+            self.bytes -= entry[1]
+            self.completed += 1
+            self.latencies.append (now - entry[0])
+
+    def _Dropped (self, header, packet, reason, ipv6, interface):
+        if reason != self._timeout:
+            return
+        self.timeouts += 1
+        # The oldest pending datagram between the same addresses timed out
+        source, destination = str (header.GetSourceAddress ()), str (header.GetDestinationAddress ())
+        keys = [key for key in self.pending if key[0] == source and key[1] == destination]
+        if keys:
+            key = min (keys, key=lambda key: self.pending[key][0])
+            self.bytes -= self.pending.pop (key)[1]
+
+    def Start (self):
+        self._start = time.perf_counter ()
+        self._startEvents = profiling.EventCount ()
+
+    def Stop (self):
+        self.wall = time.perf_counter () - self._start
+        events = profiling.EventCount ()
+        if events is not None:
+            self.events = events - self._startEvents
+
+    def Summary (self):
+        import numpy
+        latencies = numpy.frombuffer (self.latencies, dtype=numpy.float64) * 1000.0
+        result = {
+            "fragments": self.fragments,
+            "completed": self.completed,
+            "timeouts": self.timeouts,
+            "incomplete": len (self.pending),
+            "maxBytes": self.maxBytes,
+            "maxDatagrams": self.maxDatagrams,
+        }
+        if len (latencies):
+            result.update ({"minMs": float (latencies.min ()), "avgMs": float (latencies.mean ()),
+                            "maxMs": float (latencies.max ())})
+            for p, value in zip (PERCENTILES, numpy.percentile (latencies, PERCENTILES)):
+                result["p%dMs" % p] = float (value)
+        if self.wall is not None:
+            result["wall"] = self.wall
+            result["events"] = self.events
+            result["eventsPerSecond"] = (self.events / self.wall
+                                         if self.events is not None and self.wall > 0 else None)
+        return result
+
+    def Report (self, fileName=None):
+        summary = self.Summary ()
+        print ("%d fragments, %d datagrams reassembled, %d timeouts, %d incomplete" %
+               (summary["fragments"], summary["completed"], summary["timeouts"], summary["incomplete"]))
+        print ("reassembly high-water mark: %d bytes in %d datagrams" % (summary["maxBytes"], summary["maxDatagrams"]))
+        if "avgMs" in summary:
+            print ("reassembly latency min/avg/max/p99 = %.3f/%.3f/%.3f/%.3f ms" %
+                   (summary["minMs"], summary["avgMs"], summary["maxMs"], summary["p99Ms"]))
+        if fileName:
+            with open (fileName, "w") as f:
+                json.dump (summary, f, indent=2)
+        return summary
+
+
+# Sender side of a path MTU comparison: the UDP packets a node sends
+# (Ipv6L3Protocol Tx, once per fragment), those bigger than the path MTU
+# (dropped by the router with an ICMPv6 Packet Too Big), the fragments, and
+# the Packet Too Big messages it receives.  Neighbor discovery and other
+# ICMPv6 traffic is left out, so times count from the flow's first packet.
+# The node has converged on the path MTU once it stops sending oversized
+# packets.
+class PmtuStats (object):
+
+    def __init__ (self, node, pathMtu):
+        self.pathMtu = pathMtu
+        self.packets = 0
+        self.bytes = 0
+        self.fragments = 0
+        self.oversized = 0
+        self.packetTooBig = 0
+        self.firstSent = None
+        self.lastOversized = None
+        self.firstPacketTooBig = None
+        self._ipv6 = ns.internet.Ipv6Header ()
+        self._icmpv6 = ns.internet.Icmpv6Header ()
+        path = "/NodeList/%d/$ns3::Ipv6L3Protocol/" % node.GetId ()
+        ns.core.Config.ConnectWithoutContext (path + "Tx", profiling.Wrap ("fragstats", self._Sent))
+        ns.core.Config.ConnectWithoutContext (path + "Rx", profiling.Wrap ("fragstats", self._Received))
+
+    def _Sent (self, packet, ipv6, interface):
+        packet.PeekHeader (self._ipv6)
+        nextHeader = self._ipv6.GetNextHeader ()
+        if nextHeader != UDP and nextHeader != FRAGMENT:
+            return
+        now = ns.core.Simulator.Now ().GetSeconds ()
+        if self.firstSent is None:
+            self.firstSent = now
+        size = packet.GetSize ()
+        self.packets += 1
+        self.bytes += size
+        if nextHeader == FRAGMENT:
+            self.fragments += 1
+        if size > self.pathMtu:
+            self.oversized += 1
+            self.lastOversized = now
+
+    def _Received (self, packet, ipv6, interface):
+        header = self._ipv6
+        packet = packet.Copy ()
+        packet.RemoveHeader (header)
+        if header.GetNextHeader () != ICMPV6:
+            return
+        packet.PeekHeader (self._icmpv6)
+        if self._icmpv6.GetType () != PACKET_TOO_BIG:
+            return
+        self.packetTooBig += 1
+        if self.firstPacketTooBig is None:
+            self.firstPacketTooBig = ns.core.Simulator.Now ().GetSeconds ()
+
+    # Goodput of the rxBytes delivered over duration seconds, and the bytes
+    # sent per byte delivered.
+    def Summary (self, rxBytes, duration):
+        result = {
+            "pathMtu": self.pathMtu,
+            "rxBytes": rxBytes,
+            "goodput": rxBytes * 8 / duration if duration > 0 else 0.0,
+            "packets": self.packets,
+            "bytes": self.bytes,
+            "fragments": self.fragments,
+            "oversized": self.oversized,
+            "packetTooBig": self.packetTooBig,
+            "overhead": (self.bytes - rxBytes) / float (rxBytes) if rxBytes else None,
+            "packetTooBigDelay": None,
+            "convergeTime": 0.0,
+        }
+        if self.firstPacketTooBig is not None:
+            result["packetTooBigDelay"] = self.firstPacketTooBig - self.firstSent
+        if self.lastOversized is not None:
+            result["convergeTime"] = self.lastOversized - self.firstSent
+        return result
@@ -0,0 +1,267 @@
+#
+# Incremental IPv4 route computation for link up/down events.
+#
+# Ipv4GlobalRoutingHelper.RecomputeRoutingTables () reruns the SPF of every
+# node after any change.  IncrementalRouting keeps, for every source node,
+# its shortest-path tree (hop count, first hop and tree link of every node)
+# and installs one Ipv4StaticRouting network route per link subnet.  When a
+# link goes down only the sources whose tree used it are recomputed; when
+# it comes up, only those for which it shortens a path (its ends are two or
+# more hops apart, or one is unreachable).  Only the routes that changed
+# are removed from / added to the static routing tables, which take
+# precedence over global routing in the default Ipv4ListRouting.
+#
+# The trees take three N x N integer arrays (N nodes), which bounds the
+# sizes this is meant for to a few thousand nodes.
+#
+#   routing = incroute.IncrementalRouting (topo)
+#   routing.Populate ()                  # instead of PopulateRoutingTables
+#   incroute.ScheduleLinkEvents (incroute.ParseLinkEvents ("2:down:3,4:up:3"), routing)
+#
+
+import array
+import time
+
+from common import lazyns
+ns = lazyns.Import ("core", "internet")
+
+from common import profiling
+
+
+# "2.0:down:3,4.0:up:3" -> [(2.0, False, 3), (4.0, True, 3)]
+def ParseLinkEvents (text):
+    events = []
+    for item in text.split (","):
+        if not item.strip ():
+            continue
+        when, state, link = item.split (":")
+        if state not in ("up", "down"):
+            raise ValueError ("link event state must be 'up' or 'down', not %r" % state)
+        events.append ((float (when), state == "up", int (link)))
+    return sorted (events)
+
+
+def _Ints (value, n):
+    return array.array ("i", [value]) * n
+
+
+class IncrementalRouting (object):
+
+    def __init__ (self, topo):
+        self.topo = topo
+        self.nNodes = len (topo.names)
+        self.ipv4 = [topo.Node (i).GetObject (ns.internet.Ipv4.GetTypeId ()) for i in range (self.nNodes)]
+        helper = ns.internet.Ipv4StaticRoutingHelper ()
+        self.routing = [helper.GetStaticRouting (ipv4) for ipv4 in self.ipv4]
+
+        # Per link subnet: (network, mask), (node, interface, address) of
+        # every attached node, and state
+        self.subnets = []
+        self.ports = []
+        self.subnetIds = {}
+        # Per hop id: (node, interface, gateway)
+        self.hops = []
+        self.hopIds = {}
+        # Per node: (neighbour, link, hop id)
+        self.adjacency = [[] for _ in range (self.nNodes)]
+        # Topology link index -> subnet
+        self._linkSubnets = {}
+        for link in topo.links:
+            if link.interfaces is None:
+                continue
+            ports = []
+            for position, nodeId in enumerate (link.nodes):
+                ipv4 = self.ipv4[nodeId]
+                ifIndex = ipv4.GetInterfaceForDevice (link.devices.Get (position))
+                address = ipv4.GetAddress (ifIndex, 0)
+                ports.append ((nodeId, ifIndex, address.GetLocal ()))
+            subnet = self._linkSubnets[link.index] = len (self.subnets)
+            network = address.GetLocal ().CombineMask (address.GetMask ())
+            self.subnets.append ((network, address.GetMask ()))
+            self.subnetIds[str (network)] = subnet
+            self.ports.append (ports)
+            for nodeId, ifIndex, local in ports:
+                for neighbour, _, gateway in ports:
+                    if neighbour == nodeId:
+                        continue
+                    hopId = len (self.hops)
+                    self.hops.append ((nodeId, ifIndex, gateway))
+                    self.hopIds[(nodeId, ifIndex, str (gateway))] = hopId
+                    self.adjacency[nodeId].append ((neighbour, subnet, hopId))
+        self.linkUp = [True] * len (self.subnets)
+
+        # Per source: hop count, first hop id and tree link of every node
+        self.dist = [None] * self.nNodes
+        self.first = [None] * self.nNodes
+        self.via = [None] * self.nNodes
+        # Per node: hop id of the installed route of every subnet (-1: none),
+        # and the subnet of every entry of the static routing table, in order
+        # (-1 for the routes this class did not install)
+        self.installed = [None] * self.nNodes
+        self.table = [None] * self.nNodes
+
+        self.stats = {"events": 0, "spf": 0, "routesAdded": 0, "routesRemoved": 0, "seconds": 0.0}
+
+    def Populate (self):
+        for source in range (self.nNodes):
+            self._Scan (source)
+            self._Spf (source)
+            self._Apply (source, self._Routes (source))
+
+    def _Spf (self, source):
+        dist = _Ints (-1, self.nNodes)
+        first = _Ints (-1, self.nNodes)
+        via = _Ints (-1, self.nNodes)
+        adjacency = self.adjacency
+        linkUp = self.linkUp
+        dist[source] = 0
+        frontier = [source]
+        while frontier:
+            following = []
+            for u in frontier:
+                d = dist[u] + 1
+                for v, subnet, hopId in adjacency[u]:
+                    if dist[v] < 0 and linkUp[subnet]:
+                        dist[v] = d
+                        first[v] = hopId if u == source else first[u]
+                        via[v] = subnet
+                        following.append (v)
+            frontier = following
+        self.dist[source] = dist
+        self.first[source] = first
+        self.via[source] = via
+        self.stats["spf"] += 1
+
+    # Hop id source should use for subnet (-1: connected or unreachable).
+    def _Route (self, source, subnet):
+        if not self.linkUp[subnet]:
+            return -1
+        dist = self.dist[source]
+        best = -1
+        for nodeId, ifIndex, address in self.ports[subnet]:
+            if nodeId == source:
+                return -1
+            if dist[nodeId] >= 0 and (best < 0 or dist[nodeId] < dist[best]):
+                best = nodeId
+        return self.first[source][best] if best >= 0 else -1
+
+    def _Routes (self, source):
+        return array.array ("i", [self._Route (source, subnet) for subnet in range (len (self.subnets))])
+
+    # Read the static routing table of nodeId back from ns-3 (interface
+    # state changes add and remove routes behind our back).
+    def _Scan (self, nodeId):
+        routing = self.routing[nodeId]
+        table = []
+        installed = _Ints (-1, len (self.subnets))
+        for i in range (routing.GetNRoutes ()):
+            route = routing.GetRoute (i)
+            subnet = self.subnetIds.get (str (route.GetDestNetwork ()), -1)
+            hopId = self.hopIds.get ((nodeId, route.GetInterface (), str (route.GetGateway ())), -1)
+            if subnet < 0 or hopId < 0:
+                table.append (-1)
+            else:
+                table.append (subnet)
+                installed[subnet] = hopId
+        self.table[nodeId] = table
+        self.installed[nodeId] = installed
+
+    def _Apply (self, source, desired, subnets=None):
+        installed = self.installed[source]
+        if subnets is None:
+            subnets = range (len (self.subnets))
+        changed = [subnet for subnet in subnets if installed[subnet] != desired[subnet]]
+        if not changed:
+            return
+        routing = self.routing[source]
+        table = self.table[source]
+
+        removed = set (subnet for subnet in changed if installed[subnet] >= 0)
+        if removed:
+            for i in range (len (table) - 1, -1, -1):
+                if table[i] in removed:
+                    routing.RemoveRoute (i)
+            self.table[source] = table = [subnet for subnet in table if subnet not in removed]
+            self.stats["routesRemoved"] += len (removed)
+
+        for subnet in changed:
+            hopId = desired[subnet]
+            installed[subnet] = hopId
+            if hopId < 0:
+                continue
+            network, mask = self.subnets[subnet]
+            nodeId, ifIndex, gateway = self.hops[hopId]
+            routing.AddNetworkRouteTo (network, mask, gateway, ifIndex)
+            table.append (subnet)
+            self.stats["routesAdded"] += 1
+
+    # Sources whose shortest-path tree changes with the new link state.
+    def _Affected (self, subnet, up):
+        ends = [nodeId for nodeId, ifIndex, address in self.ports[subnet]]
+        affected = set (ends)
+        for source in range (self.nNodes):
+            if up:
+                dists = [self.dist[source][nodeId] for nodeId in ends]
+                if min (dists) < 0 <= max (dists) or max (dists) - min (dists) >= 2:
+                    affected.add (source)
+            else:
+                via = self.via[source]
+                if any (via[nodeId] == subnet for nodeId in ends):
+                    affected.add (source)
+        return affected
+
+    def SetLinkState (self, linkIndex, up):
+        start = time.perf_counter ()
+        subnet = self._linkSubnets[linkIndex]
+        for nodeId, ifIndex, address in self.ports[subnet]:
+            if up:
+                self.ipv4[nodeId].SetUp (ifIndex)
+            else:
+                self.ipv4[nodeId].SetDown (ifIndex)
+        self.linkUp[subnet] = up
+        for nodeId, ifIndex, address in self.ports[subnet]:
+            self._Scan (nodeId)
+
+        affected = self._Affected (subnet, up)
+        for source in range (self.nNodes):
+            if source in affected:
+                self._Spf (source)
+                self._Apply (source, self._Routes (source))
+            else:
+                # Same tree; only the route to the link itself changes
+                desired = {subnet: self._Route (source, subnet)}
+                self._Apply (source, desired, [subnet])
+        self.stats["events"] += 1
+        self.stats["seconds"] += time.perf_counter () - start
+        return len (affected)
+
+
+# Full recomputation, for comparison with IncrementalRouting.
+class GlobalRouting (object):
+
+    def __init__ (self, topo):
+        self.topo = topo
+        self.stats = {"events": 0, "seconds": 0.0}
+
+    def Populate (self):
+        ns.internet.Ipv4GlobalRoutingHelper.PopulateRoutingTables ()
+
+    def SetLinkState (self, linkIndex, up):
+        start = time.perf_counter ()
+        link = self.topo.Link (linkIndex)
+        for position, nodeId in enumerate (link.nodes):
+            ipv4 = self.topo.Node (nodeId).GetObject (ns.internet.Ipv4.GetTypeId ())
+            ifIndex = ipv4.GetInterfaceForDevice (link.devices.Get (position))
+            if up:
+                ipv4.SetUp (ifIndex)
+            else:
+                ipv4.SetDown (ifIndex)
+        ns.internet.Ipv4GlobalRoutingHelper.RecomputeRoutingTables ()
+        self.stats["events"] += 1
+        self.stats["seconds"] += time.perf_counter () - start
+
+
+def ScheduleLinkEvents (events, routing):
+    setLinkState = profiling.Wrap ("SetLinkState", routing.SetLinkState)
+    for when, up, linkIndex in events:
+        ns.core.Simulator.Schedule (ns.core.Seconds (when), setLinkState, linkIndex, up)
@@ -0,0 +1,102 @@
+#
+# Lazy loading of the ns-3 binding modules.
+#
+# "import ns.flow_monitor" loads the extension module and the ns-3 library
+# behind it even when the run never touches FlowMonitor, and "import ns3"
+# loads every module there is.  The examples and common modules declare the
+# modules they use instead:
+#
+#   from common import lazyns
+#   ns = lazyns.Import ("core", "network", "flow_monitor")
+#
+# and keep writing ns.core.Simulator.Run (), ns.flow_monitor.FlowMonitorHelper
+# () and so on.  ns is a stand-in for the ns package whose module attributes
+# are only imported on first use: the first attribute lookup on ns.X imports
+# ns.X and replaces the stand-in, so later lookups cost what they did before.
+#
+# TypeIds named by string only are a catch: lazyns.Require ("applications")
+# before Config.SetDefault ("ns3::OnOffApplication::...", ...) makes sure
+# the library registering them is loaded.
+#
+# NS_LAZY_IMPORT=0 imports the declared modules right away, as the plain
+# import statements did (for comparison, see benchmarks/import-time.py).
+# Loaded () lists the modules imported through here, with their import time.
+#
+
+import importlib
+import os
+import time
+
+LAZY = os.environ.get ("NS_LAZY_IMPORT", "1").strip ().lower () not in ("0", "false", "no", "off")
+
+_loaded = {}
+
+
+def _Load (name):
+    start = time.perf_counter ()
+    module = importlib.import_module ("ns." + name)
+    _loaded.setdefault (name, time.perf_counter () - start)
+    return module
+
+
+class _Module (object):
+
+    def __init__ (self, package, name):
+        self._lazyPackage = package
+        self._lazyName = name
+
+    def __getattr__ (self, attribute):
+        if attribute.startswith ("__"):
+            raise AttributeError (attribute)
+        return getattr (self._Resolve (), attribute)
+
+    def _Resolve (self):
+        module = _Load (self._lazyName)
+        setattr (self._lazyPackage, self._lazyName, module)
+        # References kept to this stand-in resolve directly from now on
+        self.__dict__.update (module.__dict__)
+        return module
+
+    def __repr__ (self):
+        return "<lazy module 'ns.%s'>" % self._lazyName
+
+
+class _Package (object):
+
+    def __getattr__ (self, name):
+        if name.startswith ("__"):
+            raise AttributeError (name)
+        module = _Module (self, name) if LAZY else _Load (name)
+        setattr (self, name, module)
+        return module
+
+    def __repr__ (self):
+        return "<lazy package 'ns'>"
+
+
+ns = _Package ()
+
+
+# The ns stand-in, with the given modules imported now unless lazy loading
+# is on.
+def Import (*names):
+    for name in names:
+        getattr (ns, name)
+    return ns
+
+
+# Imports the given modules now, lazy loading or not.  Needed before
+# anything names their TypeIds by string only (Config::SetDefault,
+# Config::Connect, TypeId::LookupByName, ...): a library that has not been
+# loaded has not registered its TypeIds, and ns-3 aborts on the lookup.
+def Require (*names):
+    for name in names:
+        module = getattr (ns, name)
+        if isinstance (module, _Module):
+            module._Resolve ()
+    return ns
+
+
+# Module name -> seconds spent importing it, in load order.
+def Loaded ():
+    return dict (_loaded)
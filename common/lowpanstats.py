@@ -0,0 +1,166 @@
+#
+# 6LoWPAN compression, fragmentation and 802.15.4 airtime counters.
+#
+# LowPanStats connects, for every node given, to:
+#
+# - the Ipv6L3Protocol Tx trace source: IPv6 packets handed to the
+#   interface and their uncompressed size;
+# - the SixLowPanNetDevice Tx, Rx and Drop trace sources: the compressed
+#   (and fragmented) frames sent and received, and the frames dropped,
+#   reassembly timeouts and full reassembly buffers counted apart;
+# - the LrWpanMac MacTx trace source: every MAC frame put on the air
+#   (acknowledgements and retransmissions included) and its size.
+#
+# SixLowPanNetDevice sends all the fragments of a datagram back to back in
+# one event, so consecutive Tx frames of a device at the same time are
+# counted as one datagram; a datagram of more than one frame is fragmented.
+# The 6LoWPAN header bytes of an interval are the frame bytes minus the
+# IPv6 payload bytes, against 40 bytes of IPv6 header per packet
+# uncompressed; the airtime adds the 6-byte PHY header (preamble, SFD,
+# length) to every MAC frame at 250 kb/s (2.4 GHz O-QPSK).
+#
+#   stats = lowpanstats.LowPanStats (nodes, RecordWriter ("wsn.lowpan.ndjson"), 1.0)
+#   stats.Start ()
+#   ...
+#   stats.Sample ()      # the last, partial interval
+#   stats.Summary ()
+#
+# Every interval writes one compact record per node whose counters changed:
+# {"t", "node", <COUNTERS deltas>, "headerBytes", "lowpanHeaderBytes",
+# "airtime"}.
+#
+
+from common import lazyns
+ns = lazyns.Import ("core", "sixlowpan")
+
+from common import profiling
+
+IPV6_HEADER = 40
+PHY_HEADER = 6
+BIT_RATE = 250000.0
+
+COUNTERS = ("ipv6Packets", "ipv6Bytes", "datagrams", "frames", "frameBytes", "fragmentedDatagrams",
+            "fragments", "rxFrames", "rxBytes", "drops", "reassemblyTimeouts", "reassemblyBufferFull",
+            "macFrames", "macBytes")
+(IPV6_PACKETS, IPV6_BYTES, DATAGRAMS, FRAMES, FRAME_BYTES, FRAGMENTED, FRAGMENTS, RX_FRAMES, RX_BYTES,
+ DROPS, TIMEOUTS, BUFFER_FULL, MAC_FRAMES, MAC_BYTES) = range (len (COUNTERS))
+
+
+# Derived values of a counter vector (totals or deltas).
+def Derived (counts):
+    payload = counts[IPV6_BYTES] - IPV6_HEADER * counts[IPV6_PACKETS]
+    return {
+        "headerBytes": IPV6_HEADER * counts[IPV6_PACKETS],
+        "lowpanHeaderBytes": counts[FRAME_BYTES] - payload,
+        "airtime": (counts[MAC_BYTES] + PHY_HEADER * counts[MAC_FRAMES]) * 8 / BIT_RATE,
+    }
+
+
+class _NodeCounters (object):
+
+    # drops: SixLowPanNetDevice::DropReason -> counter
+    def __init__ (self, nodeId, drops):
+        self.nodeId = nodeId
+        self._drops = drops
+        self.counts = [0] * len (COUNTERS)
+        self.last = [0] * len (COUNTERS)
+        self._lastTx = -1
+        self._datagramFrames = 0
+
+    def Ipv6Tx (self, packet, ipv6, interface):
+        counts = self.counts
+        counts[IPV6_PACKETS] += 1
+        counts[IPV6_BYTES] += packet.GetSize ()
+
+    def LowPanTx (self, packet, device, interface):
+        counts = self.counts
+        now = ns.core.Simulator.Now ().GetTimeStep ()
+        if now == self._lastTx:
+            self._datagramFrames += 1
+            if self._datagramFrames == 2:
+                counts[FRAGMENTED] += 1
+                counts[FRAGMENTS] += 2
+            else:
+                counts[FRAGMENTS] += 1
+        else:
+            self._lastTx = now
+            self._datagramFrames = 1
+            counts[DATAGRAMS] += 1
+        counts[FRAMES] += 1
+        counts[FRAME_BYTES] += packet.GetSize ()
+
+    def LowPanRx (self, packet, device, interface):
+        counts = self.counts
+        counts[RX_FRAMES] += 1
+        counts[RX_BYTES] += packet.GetSize ()
+
+    def LowPanDrop (self, reason, packet, device, interface):
+        counts = self.counts
+        counts[DROPS] += 1
+        counter = self._drops.get (reason)
+        if counter is not None:
+            counts[counter] += 1
+
+    def MacTx (self, packet):
+        counts = self.counts
+        counts[MAC_FRAMES] += 1
+        counts[MAC_BYTES] += packet.GetSize ()
+
+
+class LowPanStats (object):
+
+    def __init__ (self, nodes, writer=None, interval=1.0):
+        self.writer = writer
+        self.interval = ns.core.Seconds (interval)
+        self.nodes = []
+        device = ns.sixlowpan.SixLowPanNetDevice
+        drops = {int (device.DROP_FRAGMENT_TIMEOUT): TIMEOUTS, int (device.DROP_FRAGMENT_BUFFER_FULL): BUFFER_FULL}
+        for i in range (nodes.GetN ()):
+            counters = _NodeCounters (nodes.Get (i).GetId (), drops)
+            self.nodes.append (counters)
+            node = "/NodeList/%d/" % counters.nodeId
+            lowpan = node + "DeviceList/*/$ns3::SixLowPanNetDevice/"
+            for path, callback in ((node + "$ns3::Ipv6L3Protocol/Tx", counters.Ipv6Tx),
+                                   (lowpan + "Tx", counters.LowPanTx),
+                                   (lowpan + "Rx", counters.LowPanRx),
+                                   (lowpan + "Drop", counters.LowPanDrop),
+                                   (node + "DeviceList/*/$ns3::LrWpanNetDevice/Mac/MacTx", counters.MacTx)):
+                ns.core.Config.ConnectWithoutContext (path, profiling.Wrap ("lowpanstats", callback))
+
+    def Start (self):
+        if self.writer is None:
+            return
+        self._sample = profiling.Wrap ("lowpanstats", self._Sample)
+        ns.core.Simulator.Schedule (self.interval, self._sample)
+
+    def _Sample (self):
+        self.Sample ()
+        if not ns.core.Simulator.IsFinished ():
+            ns.core.Simulator.Schedule (self.interval, self._sample)
+
+    def Sample (self):
+        if self.writer is None:
+            return
+        now = ns.core.Simulator.Now ().GetSeconds ()
+        for counters in self.nodes:
+            if counters.counts == counters.last:
+                continue
+            delta = [current - last for current, last in zip (counters.counts, counters.last)]
+            record = {"t": now, "node": counters.nodeId}
+            record.update (zip (COUNTERS, delta))
+            record.update (Derived (delta))
+            counters.last = list (counters.counts)
+            self.writer.Write (record)
+        self.writer.Flush ()
+
+    # Totals over all nodes, with the compression ratio of the IPv6 header
+    # and the fraction of datagrams fragmented.
+    def Summary (self):
+        totals = [sum (counters.counts[i] for counters in self.nodes) for i in range (len (COUNTERS))]
+        result = dict (zip (COUNTERS, totals))
+        result.update (Derived (totals))
+        result["nodes"] = len (self.nodes)
+        result["headerRatio"] = (result["lowpanHeaderBytes"] / float (result["headerBytes"])
+                                 if result["headerBytes"] else 0.0)
+        result["fragmentedRatio"] = (totals[FRAGMENTED] / float (totals[DATAGRAMS]) if totals[DATAGRAMS] else 0.0)
+        return result
@@ -0,0 +1,171 @@
+#
+# Router advertisement, autoconfiguration and neighbor cache statistics.
+#
+# NdStats follows stateless address autoconfiguration on a set of hosts:
+#
+# - the ICMPv6 neighbor discovery messages (RS, RA, NS, NA, redirect) every
+#   node given sends, counted by type with their bytes, from the
+#   Ipv6L3Protocol Tx trace source, the router's apart;
+# - when each host holds all its expected addresses (common.slaac, from
+#   its MAC and the announced prefixes) in the preferred state, i.e. past
+#   duplicate address detection: ns-3 has no trace source for address
+#   changes, so the unconfigured hosts' interfaces are polled every
+#   interval until all are done;
+# - the neighbor cache entries of every node at a given time
+#   (Ipv6RoutingHelper.PrintNeighborCacheAllAt, read back after the run).
+#
+#   stats = ndstats.NdStats (router, hosts, expected, start=1.0)
+#   stats.Start ()
+#   stats.PrintNeighborCachesAt (10.0, "radvd.ndisc")
+#   profiler.Run ()
+#   ns.core.Simulator.Destroy ()
+#   stats.Report ("radvd.ndstats.json")
+#
+
+import array
+import json
+import re
+
+from common import lazyns
+ns = lazyns.Import ("core", "network", "internet")
+
+from common import profiling
+
+ICMPV6 = 58
+MESSAGES = {133: "rs", 134: "ra", 135: "ns", 136: "na", 137: "redirect"}
+PERCENTILES = (50, 90, 99)
+
+_NODE = re.compile (r"NDISC Cache of node (\d+)")
+
+
+class NdStats (object):
+
+    # expected: for every host, the set of addresses (strings) it must
+    # configure; start: time the router starts advertising.
+    def __init__ (self, router, hosts, expected, start=0.0, interval=0.01):
+        self.routerId = router.GetId ()
+        self._preferred = int (ns.internet.Ipv6InterfaceAddress.PREFERRED)
+        self.start = start
+        self.interval = ns.core.Seconds (interval)
+        self.sent = dict ((name, 0) for name in MESSAGES.values ())
+        self.sentBytes = dict ((name, 0) for name in MESSAGES.values ())
+        self.routerSent = dict ((name, 0) for name in MESSAGES.values ())
+        self.configured = array.array ("d")
+        self._cacheFile = None
+        self._ipv6Header = ns.internet.Ipv6Header ()
+        self._icmpv6Header = ns.internet.Icmpv6Header ()
+        # host index -> (Ipv6, expected addresses)
+        self._pending = {}
+        self.hosts = hosts.GetN ()
+        for i in range (hosts.GetN ()):
+            node = hosts.Get (i)
+            self._pending[i] = (node.GetObject (ns.internet.Ipv6.GetTypeId ()), set (expected[i]))
+            self._Connect (node, False)
+        self._Connect (router, True)
+
+    def _Connect (self, node, isRouter):
+        path = "/NodeList/%d/$ns3::Ipv6L3Protocol/Tx" % node.GetId ()
+
+        def Sent (packet, ipv6, interface):
+            self._Sent (packet, isRouter)
+        ns.core.Config.ConnectWithoutContext (path, profiling.Wrap ("ndstats", Sent))
+
+    def _Sent (self, packet, isRouter):
+        header = self._ipv6Header
+        packet = packet.Copy ()
+        packet.RemoveHeader (header)
+        if header.GetNextHeader () != ICMPV6:
+            return
+        packet.PeekHeader (self._icmpv6Header)
+        name = MESSAGES.get (self._icmpv6Header.GetType ())
+        if name is None:
+            return
+        self.sent[name] += 1
+        self.sentBytes[name] += packet.GetSize () + 40
+        if isRouter:
+            self.routerSent[name] += 1
+
+    def Start (self):
+        self._poll = profiling.Wrap ("ndstats", self._Poll)
+        ns.core.Simulator.Schedule (self.interval, self._poll)
+
+    def _Poll (self):
+        now = ns.core.Simulator.Now ().GetSeconds ()
+        for i, (ipv6, expected) in list (self._pending.items ()):
+            preferred = set ()
+            for interface in range (1, ipv6.GetNInterfaces ()):
+                for j in range (ipv6.GetNAddresses (interface)):
+                    address = ipv6.GetAddress (interface, j)
+                    if address.GetState () == self._preferred:
+                        preferred.add (str (address.GetAddress ()))
+            if expected <= preferred:
+                del self._pending[i]
+                self.configured.append (now - self.start)
+        if self._pending and not ns.core.Simulator.IsFinished ():
+            ns.core.Simulator.Schedule (self.interval, self._poll)
+
+    def PrintNeighborCachesAt (self, time, fileName):
+        self._cacheFile = fileName
+        stream = ns.network.OutputStreamWrapper (fileName, ns.network.STD_IOS_OUT)
+        ns.internet.Ipv6RoutingHelper.PrintNeighborCacheAllAt (ns.core.Seconds (time), stream)
+
+    # Entries per node id of the printed neighbor caches (one line per
+    # entry, under a header line per node).
+    def _ReadNeighborCaches (self):
+        caches = {}
+        node = None
+        with open (self._cacheFile) as f:
+            for line in f:
+                match = _NODE.search (line)
+                if match:
+                    node = int (match.group (1))
+                    caches.setdefault (node, 0)
+                elif node is not None and " lladdr " in line:
+                    caches[node] += 1
+        return caches
+
+    # Call after the run, once the neighbor caches have been printed.
+    def Summary (self):
+        import numpy
+        times = numpy.frombuffer (self.configured, dtype=numpy.float64)
+        result = {
+            "hosts": self.hosts,
+            "configured": len (times),
+            "fullyConfigured": None,
+            "sent": self.sent,
+            "sentBytes": self.sentBytes,
+            "routerSent": self.routerSent,
+        }
+        if len (times):
+            if not self._pending:
+                result["fullyConfigured"] = float (times.max ())
+            result.update ({"configMinS": float (times.min ()), "configAvgS": float (times.mean ())})
+            for p, value in zip (PERCENTILES, numpy.percentile (times, PERCENTILES)):
+                result["configP%dS" % p] = float (value)
+        if self._cacheFile is not None:
+            caches = self._ReadNeighborCaches ()
+            sizes = [size for node, size in caches.items () if node != self.routerId]
+            result["neighborCache"] = {
+                "router": caches.get (self.routerId, 0),
+                "hostsMax": max (sizes) if sizes else 0,
+                "hostsAvg": sum (sizes) / float (len (sizes)) if sizes else 0.0,
+                "total": sum (caches.values ()),
+            }
+        return result
+
+    def Report (self, fileName=None):
+        summary = self.Summary ()
+        if summary["fullyConfigured"] is not None:
+            print ("%d hosts configured after %.3f s" % (summary["hosts"], summary["fullyConfigured"]))
+        else:
+            print ("%d of %d hosts configured" % (summary["configured"], summary["hosts"]))
+        print ("sent: %s" % ", ".join ("%d %s" % (summary["sent"][name], name.upper ())
+                                       for name in MESSAGES.values ()))
+        if "neighborCache" in summary:
+            cache = summary["neighborCache"]
+            print ("neighbor cache entries: router %d, hosts max %d avg %.1f" %
+                   (cache["router"], cache["hostsMax"], cache["hostsAvg"]))
+        if fileName:
+            with open (fileName, "w") as f:
+                json.dump (summary, f, indent=2)
+        return summary
@@ -0,0 +1,112 @@
+#
+# Interned ns-3 value objects for topology and application setup.
+#
+# Ipv6Address ("2001:1::"), Ipv6Prefix (64), Ipv4Mask ("255.255.255.0"),
+# DataRate ("5Mbps") and Seconds (1.0) parse their argument in C++ behind a
+# binding call every time.  Setup code asks for the same handful of values
+# over and over (one mask or prefix per subnet, one start time per
+# application), so the functions below return a shared object per distinct
+# argument instead, from a bounded least-recently-used cache:
+#
+#   from common import nscache
+#   helper.SetBase (nscache.Ipv4Address ("10.1.1.0"), nscache.Ipv4Mask ("255.255.255.0"))
+#   apps.Start (nscache.Time (1.0))
+#   nscache.Stats ()    # {"hits": ..., "misses": ..., "evictions": ..., "size": ...}
+#
+# The objects are passed by value to ns-3, so sharing them is safe as long
+# as callers do not modify them in place (Ipv4Address.Set and the like).
+#
+# NS_CACHE_SIZE sets the bound (default 4096); SetMaxSize (0) disables
+# caching, every call then constructs a new object.
+#
+
+import collections
+import os
+
+from common import lazyns
+ns = lazyns.Import ("core", "network")
+
+
+class InternCache (object):
+
+    def __init__ (self, maxSize):
+        self.maxSize = maxSize
+        self.entries = collections.OrderedDict ()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # Object for key, calling factory () to construct it on a miss.
+    def Get (self, key, factory):
+        entries = self.entries
+        value = entries.get (key)
+        if value is not None:
+            entries.move_to_end (key)
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = factory ()
+        if self.maxSize > 0:
+            entries[key] = value
+            if len (entries) > self.maxSize:
+                entries.popitem (last=False)
+                self.evictions += 1
+        return value
+
+    def SetMaxSize (self, maxSize):
+        self.maxSize = maxSize
+        while len (self.entries) > max (maxSize, 0):
+            self.entries.popitem (last=False)
+            self.evictions += 1
+
+    def Clear (self):
+        self.entries.clear ()
+        self.hits = self.misses = self.evictions = 0
+
+    def Stats (self):
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "size": len (self.entries), "maxSize": self.maxSize}
+
+
+_cache = InternCache (int (os.environ.get ("NS_CACHE_SIZE", "4096")))
+
+
+def Ipv6Address (text):
+    return _cache.Get (("Ipv6Address", text), lambda: ns.network.Ipv6Address (text))
+
+
+def Ipv6Prefix (length):
+    return _cache.Get (("Ipv6Prefix", length), lambda: ns.network.Ipv6Prefix (length))
+
+
+def Ipv4Address (text):
+    return _cache.Get (("Ipv4Address", text), lambda: ns.network.Ipv4Address (text))
+
+
+# "255.255.255.0" or "/24"
+def Ipv4Mask (text):
+    return _cache.Get (("Ipv4Mask", text), lambda: ns.network.Ipv4Mask (text))
+
+
+# "5Mbps" or bits per second
+def DataRate (value):
+    return _cache.Get (("DataRate", value), lambda: ns.network.DataRate (value))
+
+
+# Seconds as a number, or an ns-3 time string ("2ms")
+def Time (value):
+    if isinstance (value, str):
+        return _cache.Get (("Time", value), lambda: ns.core.Time (value))
+    return _cache.Get (("Time", value), lambda: ns.core.Seconds (value))
+
+
+def SetMaxSize (maxSize):
+    _cache.SetMaxSize (maxSize)
+
+
+def Clear ():
+    _cache.Clear ()
+
+
+def Stats ():
+    return _cache.Stats ()
@@ -0,0 +1,173 @@
+#
+# Ping6 round-trip statistics without logging.
+#
+# Ping6Application has no trace sources of its own; its RTTs used to be
+# read from the LOG_LEVEL_ALL output.  A PingStats collector connects to
+# the SendOutgoing and LocalDeliver trace sources of the pinging node's
+# Ipv6L3Protocol instead, peeks the ICMPv6 echo header of the outgoing
+# requests and incoming replies into one preallocated Icmpv6Echo, and
+# records send times and RTTs in preallocated array('d') buffers indexed
+# by echo number, so a run of millions of echoes costs two short Python
+# calls per echo and no allocation.
+#
+# Echo sequence numbers are 16 bits; a reply is matched to the latest
+# request sent with its sequence number, so runs longer than 65536 echoes
+# work as long as replies come back within 65536 requests.  With a
+# multicast destination every reply is counted; the RTT of an echo is the
+# one of its first reply.
+#
+#   stats = pingstats.PingStats (n0, maxPackets)
+#   ...
+#   stats.ReportAtDestroy ("ping6.pingstats.json")
+#
+# Summary (Summary () / the JSON file): sent, received, replies, loss, and
+# min/avg/max/mdev and 50/90/99th percentile RTTs in milliseconds.
+#
+
+import array
+import json
+import math
+
+from common import lazyns
+ns = lazyns.Import ("core", "internet")
+
+from common import profiling
+
+ICMPV6 = 58
+# LocalDeliver passes a reassembled datagram with its original header,
+# whose next header is the Fragment extension; the packet itself starts at
+# the upper-layer header.
+FRAGMENT = 44
+ECHO_REQUEST = 128
+ECHO_REPLY = 129
+PERCENTILES = (50, 90, 99)
+
+
+# --MaxPackets, --Interval (seconds) and --PingStats (JSON file) with the
+# script's defaults.
+def AddCommandLineOptions (cmd, maxPackets, interval):
+    cmd.MaxPackets = maxPackets
+    cmd.Interval = interval
+    cmd.PingStats = ""
+    cmd.AddValue ("MaxPackets", "Number of echo requests sent by the Ping6 application")
+    cmd.AddValue ("Interval", "Seconds between echo requests")
+    cmd.AddValue ("PingStats", "Write the ping RTT/loss summary to this JSON file")
+
+
+# Application stop time leaving room for maxPackets echoes (and one
+# interval for the last reply), never earlier than the script's own.
+def StopTime (start, stop, maxPackets, interval):
+    return max (stop, start + maxPackets * interval)
+
+
+class PingStats (object):
+
+    def __init__ (self, node, maxPackets):
+        self.nodeId = node.GetId ()
+        self.sendTimes = array.array ("d", [math.nan]) * max (maxPackets, 1)
+        self.firstRtt = array.array ("d", [math.nan]) * max (maxPackets, 1)
+        # Every reply, duplicates included
+        self.rtts = array.array ("d")
+        self.sent = 0
+        self.received = 0
+        self.unmatched = 0
+        self.echoId = None
+        self._echo = ns.internet.Icmpv6Echo ()
+        path = "/NodeList/%d/$ns3::Ipv6L3Protocol/" % self.nodeId
+        ns.core.Config.ConnectWithoutContext (path + "SendOutgoing", profiling.Wrap ("pingstats", self._Sent))
+        ns.core.Config.ConnectWithoutContext (path + "LocalDeliver", profiling.Wrap ("pingstats", self._Delivered))
+
+    # Echo header of packet if it is an ICMPv6 echo of type kind, else None
+    def _Peek (self, header, packet, kind, nextHeaders=(ICMPV6,)):
+        if header.GetNextHeader () not in nextHeaders:
+            return None
+        echo = self._echo
+        packet.PeekHeader (echo)
+        if echo.GetType () != kind:
+            return None
+        return echo
+
+    def _Sent (self, header, packet, interface):
+        echo = self._Peek (header, packet, ECHO_REQUEST)
+        if echo is None:
+            return
+        if self.echoId is None:
+            self.echoId = echo.GetId ()
+        elif echo.GetId () != self.echoId:
+            return
+        index = self.sent
+        if index >= len (self.sendTimes):
+            self.sendTimes.extend (array.array ("d", [math.nan]) * len (self.sendTimes))
+            self.firstRtt.extend (array.array ("d", [math.nan]) * len (self.firstRtt))
+        self.sendTimes[index] = ns.core.Simulator.Now ().GetSeconds ()
+        self.sent += 1
+
+    def _Delivered (self, header, packet, interface):
+        echo = self._Peek (header, packet, ECHO_REPLY, (ICMPV6, FRAGMENT))
+        if echo is None or echo.GetId () != self.echoId or self.sent == 0:
+            return
+        last = self.sent - 1
+        index = last - ((last - echo.GetSeq ()) & 0xffff)
+        if index < 0:
+            self.unmatched += 1
+            return
+        rtt = ns.core.Simulator.Now ().GetSeconds () - self.sendTimes[index]
+        self.rtts.append (rtt)
+        if math.isnan (self.firstRtt[index]):
+            self.firstRtt[index] = rtt
+            self.received += 1
+
+    def Summary (self):
+        import numpy
+        rtts = numpy.frombuffer (self.firstRtt, dtype=numpy.float64)[:self.sent]
+        rtts = rtts[~numpy.isnan (rtts)] * 1000.0
+        result = {
+            "node": self.nodeId,
+            "sent": self.sent,
+            "received": self.received,
+            "replies": len (self.rtts),
+            "unmatched": self.unmatched,
+            "loss": 1.0 - self.received / self.sent if self.sent else 0.0,
+        }
+        if len (rtts):
+            result.update ({"minMs": float (rtts.min ()), "avgMs": float (rtts.mean ()),
+                            "maxMs": float (rtts.max ()), "mdevMs": float (rtts.std ())})
+            for p, value in zip (PERCENTILES, numpy.percentile (rtts, PERCENTILES)):
+                result["p%dMs" % p] = float (value)
+        return result
+
+    def Report (self, fileName=None):
+        summary = self.Summary ()
+        print ("%d packets transmitted, %d received, %.1f%% packet loss" %
+               (summary["sent"], summary["received"], 100.0 * summary["loss"]))
+        if "avgMs" in summary:
+            print ("rtt min/avg/max/mdev = %.3f/%.3f/%.3f/%.3f ms" %
+                   (summary["minMs"], summary["avgMs"], summary["maxMs"], summary["mdevMs"]))
+        if fileName:
+            with open (fileName, "w") as f:
+                json.dump (summary, f, indent=2)
+        return summary
+
+    # Report (and write fileName) when Simulator.Destroy () runs.
+    def ReportAtDestroy (self, fileName=None):
+        ns.core.Simulator.ScheduleDestroy (self.Report, fileName)
+
+
+# Totals and per-node summaries of several collectors (one per pinging
+# node), printed like Report and written to fileName.
+def ReportAll (collectors, fileName=None):
+    summaries = [collector.Summary () for collector in collectors]
+    sent = sum (summary["sent"] for summary in summaries)
+    received = sum (summary["received"] for summary in summaries)
+    result = {"sent": sent, "received": received, "loss": 1.0 - received / sent if sent else 0.0,
+              "nodes": summaries}
+    print ("%d nodes: %d packets transmitted, %d received, %.1f%% packet loss" %
+           (len (summaries), sent, received, 100.0 * result["loss"]))
+    if fileName:
+        with open (fileName, "w") as f:
+            json.dump (result, f, indent=2)
+    return result
+
+
+def ReportAllAtDestroy (collectors, fileName=None):
+    ns.core.Simulator.ScheduleDestroy (ReportAll, collectors, fileName)
@@ -0,0 +1,143 @@
+#
+# Opt-in run-time profile of Simulator.Run.
+#
+#   --Profile=<file.json>   write the profile of the run to this file
+#   --ProfileInterval=S     sample progress every S simulated seconds
+#
+# The scripts call profiler.Run () instead of ns.core.Simulator.Run ();
+# without --Profile it is a plain Run.  With it the report holds:
+#
+# - wall-clock time of Run, simulated time reached and their ratio;
+# - events executed (Simulator.GetEventCount, where the bindings have it)
+#   and events per wall-clock second;
+# - one sample per interval: simulated time, wall-clock time, events,
+#   events per second over the interval and whether the event queue was
+#   empty apart from the sampler (ns-3 does not expose the queue length,
+#   so that is the only queue state available);
+# - per Python callback (wrapped with Wrap): calls and inclusive wall-clock
+#   time, their total, and the remainder of Run spent outside Python
+#   callbacks ("native").
+#
+# Callbacks are wrapped where they are handed to ns-3:
+#
+#   recvSink.SetRecvCallback (profiler.Wrap ("ReceivePacket", receiver.Receive))
+#
+# common modules use the module-level Wrap, which wraps only while a
+# profiler is enabled, so an unprofiled run calls the callbacks directly.
+#
+
+import json
+import os
+import sys
+import time
+
+from common import lazyns
+ns = lazyns.Import ("core")
+
+# The enabled profiler, if any
+_active = None
+
+
+def AddCommandLineOptions (cmd):
+    cmd.Profile = ""
+    cmd.ProfileInterval = 1.0
+    cmd.AddValue ("Profile", "Write a JSON profile of Simulator.Run (events/s, sim/wall time, Python callbacks) to this file")
+    cmd.AddValue ("ProfileInterval", "Seconds of simulated time between profile samples")
+
+
+def Wrap (name, callback):
+    if _active is None:
+        return callback
+    return _active.Wrap (name, callback)
+
+
+def EventCount ():
+    getter = getattr (ns.core.Simulator, "GetEventCount", None)
+    return getter () if getter is not None else None
+
+
+class Profiler (object):
+
+    def __init__ (self, fileName="", interval=1.0):
+        global _active
+        self.fileName = fileName
+        self.interval = interval
+        self.enabled = bool (fileName)
+        self.callbacks = {}
+        self.samples = []
+        self.report = None
+        self._start = None
+        if self.enabled:
+            _active = self
+
+    @classmethod
+    def FromCommandLine (cls, cmd):
+        return cls (str (cmd.Profile), float (cmd.ProfileInterval))
+
+    # callback with its calls and wall-clock time counted under name
+    def Wrap (self, name, callback):
+        if not self.enabled:
+            return callback
+        stats = self.callbacks.setdefault (name, [0, 0.0])
+        clock = time.perf_counter
+
+        def Profiled (*args):
+            start = clock ()
+            try:
+                return callback (*args)
+            finally:
+                stats[0] += 1
+                stats[1] += clock () - start
+        return Profiled
+
+    def _Sample (self):
+        wall = time.perf_counter () - self._start
+        events = EventCount ()
+        empty = ns.core.Simulator.IsFinished ()
+        sample = {"t": ns.core.Simulator.Now ().GetSeconds (), "wall": wall, "events": events, "queueEmpty": empty}
+        if self.samples and events is not None:
+            previous = self.samples[-1]
+            elapsed = wall - previous["wall"]
+            sample["eventsPerSecond"] = (events - previous["events"]) / elapsed if elapsed > 0 else None
+        self.samples.append (sample)
+        # Like FlowStatsStreamer, stop once nothing else is scheduled
+        if not empty:
+            ns.core.Simulator.Schedule (ns.core.Seconds (self.interval), self._Sample)
+
+    def Run (self):
+        if not self.enabled:
+            ns.core.Simulator.Run ()
+            return None
+        startEvents = EventCount ()
+        startTime = ns.core.Simulator.Now ().GetSeconds ()
+        if self.interval > 0:
+            ns.core.Simulator.Schedule (ns.core.Seconds (self.interval), self._Sample)
+        self._start = time.perf_counter ()
+        ns.core.Simulator.Run ()
+        wall = time.perf_counter () - self._start
+        self.report = self._Report (wall, startTime, startEvents)
+        with open (self.fileName, "w") as f:
+            json.dump (self.report, f, indent=2)
+        return self.report
+
+    def _Report (self, wall, startTime, startEvents):
+        simTime = ns.core.Simulator.Now ().GetSeconds () - startTime
+        events = EventCount ()
+        if events is not None:
+            # Not counting the sampler's own events
+            events -= startEvents + len (self.samples)
+        python = dict ((name, {"calls": calls, "seconds": seconds}) for name, (calls, seconds) in self.callbacks.items ())
+        pythonSeconds = sum (seconds for calls, seconds in self.callbacks.values ())
+        return {
+            "script": os.path.basename (sys.argv[0]),
+            "args": sys.argv[1:],
+            "wall": wall,
+            "simTime": simTime,
+            "simPerWall": simTime / wall if wall > 0 else None,
+            "events": events,
+            "eventsPerSecond": events / wall if events is not None and wall > 0 else None,
+            "pythonSeconds": pythonSeconds,
+            "nativeSeconds": wall - pythonSeconds,
+            "python": python,
+            "samples": self.samples,
+        }
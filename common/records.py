@@ -0,0 +1,50 @@
+#
+# Append-only record output.
+#
+# Records are written as newline-delimited JSON (one compact object per
+# line) through a large write buffer, so a partial file is still readable
+# after a crash.  The periodic writers (common.flowmon, common.lowpanstats)
+# Flush after every interval's records, so a run can be followed with
+# "tail -f" at one write per interval.
+#
+
+import json
+
+DEFAULT_BUFFER_SIZE = 1 << 20
+
+
+class RecordWriter (object):
+
+    def __init__ (self, fileName, bufferSize=DEFAULT_BUFFER_SIZE, append=False):
+        self.fileName = fileName
+        self.records = 0
+        self._file = open (fileName, "a" if append else "w", buffering=bufferSize)
+        self._encode = json.JSONEncoder (separators=(",", ":")).encode
+
+    def Write (self, record):
+        self._file.write (self._encode (record))
+        self._file.write ("\n")
+        self.records += 1
+
+    def Flush (self):
+        self._file.flush ()
+
+    def Close (self):
+        if not self._file.closed:
+            self._file.close ()
+
+
+# Records of fileName.  A killed run can leave its last line cut short:
+# an undecodable line without its newline is skipped, any other one raises.
+def ReadRecords (fileName):
+    with open (fileName) as f:
+        for line in f:
+            if not line.strip ():
+                continue
+            try:
+                record = json.loads (line)
+            except ValueError:
+                if line.endswith ("\n"):
+                    raise
+                return
+            yield record
@@ -0,0 +1,72 @@
+#
+# Receive-side statistics for the socket-options examples.
+#
+# Instead of printing a line for every packet and building new tag objects
+# each time, a PacketTagCollector drains the socket in one callback,
+# removes the socket tags into preallocated tag objects and counts the tag
+# values in 256-bin histograms (every tag carried by these sockets is a
+# single byte).  The histograms are array('Q') objects, so
+# numpy.frombuffer (collector.Histogram ("TTL"), dtype=numpy.uint64) gives
+# a NumPy view without copying.
+#
+# A summary is printed when Simulator.Destroy runs.  With sampleEvery = N
+# every N-th packet is also printed in the old per-packet format, which is
+# handy while debugging.
+#
+
+import array
+
+from common import lazyns
+ns = lazyns.Import ("core")
+
+
+class PacketTagCollector (object):
+
+    # tags is a list of (label, tag object, getter name), e.g.
+    # [("TOS", ns.network.SocketIpTosTag (), "GetTos")]
+    def __init__ (self, tags, sampleEvery=0):
+        self.packets = 0
+        self.bytes = 0
+        self.sampleEvery = sampleEvery
+        self._tags = []
+        for label, tag, getter in tags:
+            self._tags.append ((label, tag, getattr (tag, getter), array.array ("Q", bytes (8 * 256))))
+
+    def Receive (self, socket):
+        while socket.GetRxAvailable () > 0:
+            packet = socket.Recv ()
+            if packet is None:
+                break
+            self.packets += 1
+            self.bytes += packet.GetSize ()
+            sample = self.sampleEvery > 0 and self.packets % self.sampleEvery == 0
+            if sample:
+                print ("Received one packet!")
+            for label, tag, getter, counts in self._tags:
+                if packet.RemovePacketTag (tag):
+                    value = getter ()
+                    counts[value] += 1
+                    if sample:
+                        print (" %s = " % label, value)
+
+    def Histogram (self, label):
+        for tagLabel, tag, getter, counts in self._tags:
+            if tagLabel == label:
+                return counts
+        raise KeyError (label)
+
+    def AsDict (self):
+        result = {"packets": self.packets, "bytes": self.bytes}
+        for label, tag, getter, counts in self._tags:
+            result[label] = dict ((value, count) for value, count in enumerate (counts) if count)
+        return result
+
+    def Report (self):
+        print ("Received %d packets, %d bytes" % (self.packets, self.bytes))
+        for label, tag, getter, counts in self._tags:
+            values = ", ".join ("%d x%d" % (value, count) for value, count in enumerate (counts) if count)
+            print (" %s: %s" % (label, values or "none"))
+
+    # Print the summary when Simulator.Destroy () runs.
+    def ReportAtDestroy (self):
+        ns.core.Simulator.ScheduleDestroy (self.Report)
@@ -0,0 +1,110 @@
+#
+# Event scheduler and simulator implementation selection.
+#
+#   --Scheduler=map|heap|list|calendar|priority   ns-3 event scheduler
+#   --SimulatorImpl=default|realtime              simulator implementation
+#   --Scheduler=all                               comparison mode
+#
+# The options set the SchedulerType and SimulatorImplementationType global
+# values, which only take effect before the simulator is first used, so
+# Apply is called right after CommandLine.Parse.  (The raw global values
+# can also be given as --SchedulerType=ns3::HeapScheduler, as for any ns-3
+# program; these are shorter names shared by the examples.)
+#
+# --Scheduler=all reruns the same command line once per scheduler in a
+# fresh process with --Profile, prints the events per second, wall-clock
+# time and peak RSS of each and exits; --SchedulerReport=<file> also
+# writes them as JSON.
+#
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import lazyns
+ns = lazyns.Import ("core")
+
+SCHEDULERS = {
+    "map": "ns3::MapScheduler",
+    "heap": "ns3::HeapScheduler",
+    "list": "ns3::ListScheduler",
+    "calendar": "ns3::CalendarScheduler",
+    "priority": "ns3::PriorityQueueScheduler",
+}
+
+IMPLEMENTATIONS = {
+    "default": "ns3::DefaultSimulatorImpl",
+    "realtime": "ns3::RealtimeSimulatorImpl",
+}
+
+
+def AddCommandLineOptions (cmd):
+    cmd.Scheduler = ""
+    cmd.SimulatorImpl = ""
+    cmd.SchedulerReport = ""
+    cmd.AddValue ("Scheduler", "Event scheduler: %s (default: ns-3's), or all to compare them" % ", ".join (SCHEDULERS))
+    cmd.AddValue ("SimulatorImpl", "Simulator implementation: %s" % ", ".join (IMPLEMENTATIONS))
+    cmd.AddValue ("SchedulerReport", "With --Scheduler=all, write the comparison to this JSON file")
+
+
+def _Lookup (table, kind, name):
+    if name in table:
+        return table[name]
+    if name.startswith ("ns3::"):
+        return name
+    raise ValueError ("%s must be one of %s, not %r" % (kind, ", ".join (table), name))
+
+
+def Apply (cmd, argv=None):
+    scheduler = str (cmd.Scheduler)
+    implementation = str (cmd.SimulatorImpl)
+    if scheduler == "all":
+        Compare (argv or sys.argv, str (cmd.SchedulerReport))
+        sys.exit (0)
+    if implementation:
+        ns.core.GlobalValue.Bind ("SimulatorImplementationType",
+                                  ns.core.StringValue (_Lookup (IMPLEMENTATIONS, "SimulatorImpl", implementation)))
+    if scheduler:
+        ns.core.GlobalValue.Bind ("SchedulerType", ns.core.StringValue (_Lookup (SCHEDULERS, "Scheduler", scheduler)))
+
+
+def _RunWith (argv, scheduler):
+    args = [arg for arg in argv[1:] if not arg.startswith (("--Scheduler=", "--SchedulerReport=", "--Profile="))]
+    with tempfile.TemporaryDirectory () as workDir:
+        profile = os.path.join (workDir, "profile.json")
+        command = [sys.executable, os.path.abspath (argv[0])] + args + ["--Scheduler=" + scheduler,
+                                                                         "--Profile=" + profile]
+        start = time.perf_counter ()
+        process = subprocess.Popen (command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        pid, status, usage = os.wait4 (process.pid, 0)
+        result = {"scheduler": scheduler, "wall": time.perf_counter () - start, "maxRssKiB": usage.ru_maxrss,
+                  "returncode": os.waitstatus_to_exitcode (status)}
+        if result["returncode"] == 0 and os.path.exists (profile):
+            with open (profile) as f:
+                report = json.load (f)
+            result.update ({"runWall": report["wall"], "events": report["events"],
+                            "eventsPerSecond": report["eventsPerSecond"]})
+    return result
+
+
+# Run argv (a script's command line) under every scheduler.
+def Compare (argv, reportFile=""):
+    results = []
+    print ("%-10s %10s %10s %12s %12s" % ("scheduler", "wall [s]", "run [s]", "events/s", "maxrss [MiB]"))
+    for scheduler in SCHEDULERS:
+        result = _RunWith (argv, scheduler)
+        results.append (result)
+        if result["returncode"] != 0:
+            print ("%-10s failed (%d)" % (scheduler, result["returncode"]))
+            continue
+        eventsPerSecond = result.get ("eventsPerSecond")
+        print ("%-10s %10.3f %10.3f %12s %12.1f" % (scheduler, result["wall"], result.get ("runWall", 0.0),
+                                                    "%.0f" % eventsPerSecond if eventsPerSecond else "-",
+                                                    result["maxRssKiB"] / 1024.0))
+    if reportFile:
+        with open (reportFile, "w") as f:
+            json.dump (results, f, indent=2)
+    return results
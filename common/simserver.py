@@ -0,0 +1,244 @@
+#
+# Warm simulation server.
+#
+# Every example run pays for the interpreter start, for loading the ns-3
+# libraries and bindings and for importing common/ before its first event.
+# The server does that once and forks a child per request, forkserver
+# style: the child inherits the loaded modules, runs the script's
+# main (argv) in a clean process (Simulator, Config and the attribute
+# defaults are untouched by earlier runs) and reports back.
+#
+#   python common/simserver.py serve --socket /tmp/ns3.sock --jobs 4 &
+#   python common/simserver.py run --socket /tmp/ns3.sock ipv6/ping6.py --Verbose=0
+#
+# or from Python:
+#
+#   result = simserver.Run ("/tmp/ns3.sock", "ipv6/ping6.py", ["--Verbose=0"], cwd=workDir)
+#   result["returncode"], result["result"], result["stdout"], result["wall"]
+#
+# Requests are one JSON line ({"script", "args", "cwd"}) on a Unix socket;
+# the reply is one JSON line with the exit code, main's return value (if
+# it is JSON serializable, else its repr), the captured stdout/stderr, the
+# wall-clock time and the peak RSS of the child.  The server itself never
+# runs a simulation, so that nothing but imports is shared between runs.
+#
+
+import argparse
+import atexit
+import glob
+import json
+import os
+import resource
+import runpy
+import signal
+import socket
+import sys
+import tempfile
+import time
+import traceback
+
+ROOT = os.path.abspath (os.path.join (os.path.dirname (os.path.abspath (__file__)), os.pardir))
+
+# Binding modules used by the examples
+PRELOAD = ("core", "network", "internet", "internet_apps", "applications", "csma", "point_to_point",
+           "flow_monitor", "mobility", "lr_wpan", "sixlowpan")
+# Every common/ module
+COMMON = tuple (sorted (os.path.splitext (os.path.basename (path))[0]
+                        for path in glob.glob (os.path.join (ROOT, "common", "*.py"))
+                        if not path.endswith ("__init__.py")))
+
+
+def Preload (modules=PRELOAD):
+    import importlib
+    if ROOT not in sys.path:
+        sys.path.insert (0, ROOT)
+    loaded = []
+    for name in ["ns." + module for module in modules] + ["common." + module for module in COMMON]:
+        try:
+            importlib.import_module (name)
+            loaded.append (name)
+        except ImportError as e:
+            sys.stderr.write ("simserver: not preloading %s: %s\n" % (name, e))
+    return loaded
+
+
+def _Serializable (value):
+    try:
+        json.dumps (value)
+        return value
+    except (TypeError, ValueError):
+        return repr (value)
+
+
+# Exit handlers registered while a script runs, in the forked child.  The
+# child leaves with os._exit, so atexit would run none of them, and
+# atexit's own list also holds the server's handlers, which are not the
+# child's to run.
+class _ExitHandlers (object):
+
+    def __init__ (self):
+        self.handlers = []
+        self._saved = atexit.register, atexit.unregister
+        atexit.register = self.Register
+        atexit.unregister = self.Unregister
+
+    def Register (self, func, *args, **kwargs):
+        self.handlers.append ((func, args, kwargs))
+        return func
+
+    def Unregister (self, func):
+        self.handlers = [handler for handler in self.handlers if handler[0] != func]
+
+    # Restore atexit and run the handlers, last registered first.
+    def Run (self):
+        atexit.register, atexit.unregister = self._saved
+        while self.handlers:
+            func, args, kwargs = self.handlers.pop ()
+            try:
+                func (*args, **kwargs)
+            except BaseException:
+                traceback.print_exc ()
+
+
+# In the forked child: run the request with stdout/stderr captured and
+# return the reply.
+def _Execute (request):
+    script = os.path.abspath (os.path.join (request.get ("cwd") or os.getcwd (), request["script"]))
+    argv = [script] + list (request.get ("args", ()))
+    if request.get ("cwd"):
+        os.chdir (request["cwd"])
+    output = tempfile.TemporaryFile (), tempfile.TemporaryFile ()
+    saved = os.dup (1), os.dup (2)
+    sys.stdout.flush ()
+    sys.stderr.flush ()
+    os.dup2 (output[0].fileno (), 1)
+    os.dup2 (output[1].fileno (), 2)
+    sys.argv = argv
+    sys.path[0] = os.path.dirname (script)
+    reply = {"returncode": 0, "result": None}
+    exitHandlers = _ExitHandlers ()
+    start = time.perf_counter ()
+    try:
+        namespace = runpy.run_path (script, run_name="__simserver__")
+        reply["result"] = _Serializable (namespace["main"] (argv))
+    except SystemExit as e:
+        reply["returncode"] = e.code if isinstance (e.code, int) else (0 if e.code is None else 1)
+    except BaseException:
+        traceback.print_exc ()
+        reply["returncode"] = 1
+    # e.g. common.tracestream closing its trace writers
+    exitHandlers.Run ()
+    reply["wall"] = time.perf_counter () - start
+    sys.stdout.flush ()
+    sys.stderr.flush ()
+    os.dup2 (saved[0], 1)
+    os.dup2 (saved[1], 2)
+    for name, f in zip (("stdout", "stderr"), output):
+        f.seek (0)
+        reply[name] = f.read ().decode (errors="replace")
+        f.close ()
+    reply["maxRssKiB"] = resource.getrusage (resource.RUSAGE_SELF).ru_maxrss
+    return reply
+
+
+def _Child (connection):
+    try:
+        with connection.makefile ("rb") as reader:
+            request = json.loads (reader.readline ())
+        reply = _Execute (request)
+    except BaseException:
+        reply = {"returncode": 1, "result": None, "stdout": "", "stderr": traceback.format_exc ()}
+    with connection.makefile ("wb") as writer:
+        writer.write (json.dumps (reply).encode () + b"\n")
+    connection.close ()
+
+
+def Serve (socketPath, jobs=None, modules=PRELOAD):
+    jobs = jobs or os.cpu_count () or 1
+    Preload (modules)
+    if os.path.exists (socketPath):
+        os.unlink (socketPath)
+    listener = socket.socket (socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind (socketPath)
+    listener.listen (64)
+    signal.signal (signal.SIGTERM, lambda signum, frame: sys.exit (0))
+    children = set ()
+    try:
+        while True:
+            # Reap finished runs; wait for one when all jobs are busy
+            while children:
+                pid, status = os.waitpid (-1, 0 if len (children) >= jobs else os.WNOHANG)
+                if pid == 0:
+                    break
+                children.discard (pid)
+            connection, address = listener.accept ()
+            pid = os.fork ()
+            if pid == 0:
+                listener.close ()
+                status = 0
+                try:
+                    _Child (connection)
+                except BaseException:
+                    status = 1
+                finally:
+                    sys.stdout.flush ()
+                    sys.stderr.flush ()
+                    os._exit (status)
+            connection.close ()
+            children.add (pid)
+    finally:
+        listener.close ()
+        if os.path.exists (socketPath):
+            os.unlink (socketPath)
+
+
+# Wait until a server accepts connections on socketPath.
+def WaitReady (socketPath, timeout=60.0):
+    deadline = time.monotonic () + timeout
+    while True:
+        try:
+            with socket.socket (socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                probe.connect (socketPath)
+            return
+        except (FileNotFoundError, ConnectionRefusedError):
+            if time.monotonic () > deadline:
+                raise
+            time.sleep (0.05)
+
+
+def Run (socketPath, script, args=(), cwd=None):
+    request = {"script": os.path.abspath (script), "args": list (args), "cwd": os.path.abspath (cwd or os.getcwd ())}
+    with socket.socket (socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect (socketPath)
+        connection.sendall (json.dumps (request).encode () + b"\n")
+        with connection.makefile ("rb") as reader:
+            line = reader.readline ()
+    if not line:
+        raise RuntimeError ("simserver closed the connection running %s" % script)
+    return json.loads (line)
+
+
+def main (argv):
+    parser = argparse.ArgumentParser ()
+    commands = parser.add_subparsers (dest="command", required=True)
+    serve = commands.add_parser ("serve")
+    serve.add_argument ("--socket", required=True)
+    serve.add_argument ("--jobs", type=int, default=None, help="concurrent runs (default: CPU count)")
+    serve.add_argument ("--preload", default=",".join (PRELOAD), help="ns modules to load up front")
+    run = commands.add_parser ("run")
+    run.add_argument ("--socket", required=True)
+    run.add_argument ("script")
+    run.add_argument ("args", nargs=argparse.REMAINDER)
+    options = parser.parse_args (argv[1:])
+
+    if options.command == "serve":
+        Serve (options.socket, options.jobs, [name for name in options.preload.split (",") if name])
+        return 0
+    reply = Run (options.socket, options.script, options.args)
+    sys.stdout.write (reply["stdout"])
+    sys.stderr.write (reply["stderr"])
+    return reply["returncode"]
+
+
+if __name__ == '__main__':
+    sys.exit (main (sys.argv))
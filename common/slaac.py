@@ -0,0 +1,87 @@
+#
+# Vectorized EUI-64 stateless address autoconfiguration (RFC 4291/4862).
+#
+# Ipv6Address.MakeAutoconfiguredAddress (mac, prefix) builds one address per
+# call through the bindings.  MakeAutoconfiguredAddresses does the same for
+# arrays of MACs and prefixes with NumPy:
+#
+#   address[0:8]   = prefix[0:8]
+#   address[8:11]  = mac[0:3], with the universal/local bit (0x02) flipped
+#   address[11:13] = ff:fe
+#   address[13:16] = mac[3:6]
+#
+# which is exactly what ns-3 does (only the first 64 bits of the prefix are
+# used).  Results are packed 16-byte values (dtype ADDRESS, network byte
+# order); ToStrings/ToNs3 convert them when needed.  The ns-3 bindings are
+# only imported by ToNs3, so address plans can be computed without them.
+#
+#   addresses = slaac.MakeAutoconfiguredAddresses (["00:00:00:00:00:01"], ["2001:1::", "2002:1:1::"])
+#   addresses.shape              # (2 prefixes, 1 MAC)
+#   slaac.ToNs3 (addresses[0])   # [ns.network.Ipv6Address ("2001:1::200:ff:fe00:1")]
+#
+
+import socket
+
+import numpy
+
+ADDRESS = numpy.dtype ((numpy.void, 16))
+
+
+# MACs as an (n, 6) uint8 array, from "aa:bb:cc:dd:ee:ff" strings, 48-bit
+# integers or an existing array.
+def ParseMacs (macs):
+    if isinstance (macs, numpy.ndarray):
+        if macs.dtype == numpy.uint8 and macs.ndim == 2 and macs.shape[1] == 6:
+            return macs
+        # 48-bit integers
+        return macs.astype (">u8").reshape (-1, 1).view (numpy.uint8)[:, 2:]
+    macs = list (macs)
+    if macs and not isinstance (macs[0], str):
+        return ParseMacs (numpy.array (macs, dtype=numpy.uint64))
+    data = bytes.fromhex ("".join (macs).replace (":", "").replace ("-", ""))
+    if len (data) != 6 * len (macs):
+        raise ValueError ("MAC addresses must have 6 bytes")
+    return numpy.frombuffer (data, dtype=numpy.uint8).reshape (-1, 6)
+
+
+# Prefixes as an (m, 16) uint8 array, from IPv6 address strings or an
+# existing array.
+def ParsePrefixes (prefixes):
+    if isinstance (prefixes, numpy.ndarray):
+        if prefixes.dtype == ADDRESS:
+            prefixes = prefixes.view (numpy.uint8)
+        return prefixes.reshape (-1, 16)
+    data = b"".join (socket.inet_pton (socket.AF_INET6, prefix.split ("/")[0]) for prefix in prefixes)
+    return numpy.frombuffer (data, dtype=numpy.uint8).reshape (-1, 16)
+
+
+# (n,) big-endian uint64 interface identifiers of the MACs.
+def InterfaceIdentifiers (macs):
+    macs = ParseMacs (macs)
+    iid = numpy.empty ((len (macs), 8), dtype=numpy.uint8)
+    iid[:, 0:3] = macs[:, 0:3]
+    iid[:, 0] ^= 0x02
+    iid[:, 3] = 0xff
+    iid[:, 4] = 0xfe
+    iid[:, 5:8] = macs[:, 3:6]
+    return iid.view (">u8")[:, 0]
+
+
+# (len (prefixes), len (macs)) array of ADDRESS values.
+def MakeAutoconfiguredAddresses (macs, prefixes):
+    iid = InterfaceIdentifiers (macs)
+    networks = ParsePrefixes (prefixes)[:, 0:8].copy ().view (">u8")[:, 0]
+    words = numpy.empty ((len (networks), len (iid), 2), dtype=">u8")
+    words[:, :, 0] = networks[:, None]
+    words[:, :, 1] = iid[None, :]
+    return words.view (ADDRESS)[:, :, 0]
+
+
+def ToStrings (addresses):
+    data = numpy.ascontiguousarray (addresses, dtype=ADDRESS).reshape (-1).tobytes ()
+    return [socket.inet_ntop (socket.AF_INET6, data[i:i + 16]) for i in range (0, len (data), 16)]
+
+
+def ToNs3 (addresses):
+    import ns.network
+    return [ns.network.Ipv6Address (text) for text in ToStrings (addresses)]
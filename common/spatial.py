@@ -0,0 +1,83 @@
+#
+# Node layouts and a grid spatial index for wireless examples.
+#
+# GridIndex buckets 2D positions into square cells of a given size, so the
+# nodes within a radius of a point are found by looking at the few cells
+# the radius covers instead of at every node:
+#
+#   index = spatial.GridIndex (positions, cellSize=100.0)
+#   index.Near (x, y, 100.0)          # ids within 100 m of (x, y)
+#   index.Neighbours (nodeId, 100.0)  # ids within 100 m of a node, itself excluded
+#
+# LogDistanceLoss/LogDistanceRange convert between distance and the loss of
+# ns-3's LogDistancePropagationLossModel (the model LrWpanHelper puts on
+# its channel), so a range can be turned into a SpectrumChannel MaxLossDb
+# and back.
+#
+
+import math
+import random
+
+# LogDistancePropagationLossModel defaults
+EXPONENT = 3.0
+REFERENCE_DISTANCE = 1.0
+REFERENCE_LOSS = 46.6777
+
+
+def LogDistanceLoss (distance, exponent=EXPONENT, referenceLoss=REFERENCE_LOSS,
+                     referenceDistance=REFERENCE_DISTANCE):
+    if distance <= referenceDistance:
+        return 0.0
+    return referenceLoss + 10.0 * exponent * math.log10 (distance / referenceDistance)
+
+
+def LogDistanceRange (lossDb, exponent=EXPONENT, referenceLoss=REFERENCE_LOSS,
+                      referenceDistance=REFERENCE_DISTANCE):
+    return referenceDistance * 10.0 ** ((lossDb - referenceLoss) / (10.0 * exponent))
+
+
+# n positions on a square grid, row by row.
+def GridLayout (n, spacing):
+    side = int (math.ceil (math.sqrt (n)))
+    return [((i % side) * spacing, (i // side) * spacing) for i in range (n)]
+
+
+# n positions drawn uniformly in a square with the same density as the
+# grid of that spacing.
+def RandomLayout (n, spacing, seed=1):
+    rng = random.Random (seed)
+    side = math.sqrt (n) * spacing
+    return [(rng.uniform (0.0, side), rng.uniform (0.0, side)) for _ in range (n)]
+
+
+class GridIndex (object):
+
+    def __init__ (self, positions, cellSize):
+        if cellSize <= 0:
+            raise ValueError ("cell size must be positive")
+        self.cellSize = float (cellSize)
+        self.positions = list (positions)
+        self.cells = {}
+        for nodeId, (x, y) in enumerate (self.positions):
+            self.cells.setdefault (self._Cell (x, y), []).append (nodeId)
+
+    def _Cell (self, x, y):
+        return (int (math.floor (x / self.cellSize)), int (math.floor (y / self.cellSize)))
+
+    def Near (self, x, y, radius):
+        reach = int (math.ceil (radius / self.cellSize))
+        cx, cy = self._Cell (x, y)
+        radius2 = radius * radius
+        positions = self.positions
+        result = []
+        for i in range (cx - reach, cx + reach + 1):
+            for j in range (cy - reach, cy + reach + 1):
+                for nodeId in self.cells.get ((i, j), ()):
+                    px, py = positions[nodeId]
+                    if (px - x) * (px - x) + (py - y) * (py - y) <= radius2:
+                        result.append (nodeId)
+        return result
+
+    def Neighbours (self, nodeId, radius):
+        x, y = self.positions[nodeId]
+        return [other for other in self.Near (x, y, radius) if other != nodeId]
@@ -0,0 +1,90 @@
+#
+# Run an example script over a parameter grid in a pool of processes.
+#
+# ns-3 keeps one global Simulator (and global Config defaults) per process,
+# so every grid point runs in a worker process of its own: the pool is
+# created with maxtasksperchild=1 and the example is imported inside the
+# worker.  The parent process never imports the ns-3 bindings.
+#
+# The example's main (argv) is called with the grid point as command-line
+# options and must return a list of dictionaries (one per flow); every
+# point gets its own RngRun number so replicates are independent.
+#
+
+import contextlib
+import csv
+import importlib.util
+import io
+import itertools
+import multiprocessing
+import os
+import tempfile
+import time
+
+
+# "Name=v1,v2,v3" -> ("Name", ["v1", "v2", "v3"])
+def ParseAxis (text):
+    name, values = text.split ("=", 1)
+    return name.strip (), [value.strip () for value in values.split (",")]
+
+
+# Cartesian product of the axes, one dictionary per point.
+def ExpandGrid (axes):
+    names = [name for name, values in axes]
+    return [dict (zip (names, point)) for point in itertools.product (*[values for name, values in axes])]
+
+
+def _LoadScript (script):
+    name = os.path.splitext (os.path.basename (script))[0].replace ("-", "_")
+    spec = importlib.util.spec_from_file_location (name, script)
+    module = importlib.util.module_from_spec (spec)
+    spec.loader.exec_module (module)
+    return module
+
+
+def _RunPoint (task):
+    script, index, point, runNumber, extraArgs = task
+    argv = [script] + ["--%s=%s" % item for item in sorted (point.items ())]
+    argv += ["--RunNumber=%d" % runNumber] + list (extraArgs)
+    # Run in a scratch directory: the examples write their output files
+    # (traces, .flowmon) to the working directory under fixed names.
+    with tempfile.TemporaryDirectory () as workDir:
+        os.chdir (workDir)
+        start = time.perf_counter ()
+        with contextlib.redirect_stdout (io.StringIO ()):
+            rows = _LoadScript (script).main (argv) or []
+        wall = time.perf_counter () - start
+    return index, point, runNumber, wall, rows
+
+
+# Run every point of the grid and return the collected rows, each tagged
+# with its point, run number and per-point wall time, in grid order.
+def RunSweep (script, points, jobs=None, runs=1, firstRun=1, extraArgs=()):
+    tasks = []
+    for index, point in enumerate (points):
+        for replicate in range (runs):
+            runNumber = firstRun + index * runs + replicate
+            tasks.append ((os.path.abspath (script), index, point, runNumber, tuple (extraArgs)))
+
+    context = multiprocessing.get_context ("fork")
+    results = []
+    with context.Pool (processes=jobs, maxtasksperchild=1) as pool:
+        for index, point, runNumber, wall, rows in pool.imap_unordered (_RunPoint, tasks):
+            for row in rows:
+                record = dict (point)
+                record.update ({"point": index, "run": runNumber, "wall": wall})
+                record.update (row)
+                results.append (record)
+    results.sort (key=lambda record: (record["point"], record["run"]))
+    return results
+
+
+def WriteTable (results, stream):
+    fields = []
+    for record in results:
+        for field in record:
+            if field not in fields:
+                fields.append (field)
+    writer = csv.DictWriter (stream, fieldnames=fields)
+    writer.writeheader ()
+    writer.writerows (results)
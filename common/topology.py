@@ -0,0 +1,315 @@
+#
+# Declarative topologies.
+#
+# The examples used to create their nodes one by one, fill NodeContainers
+# with repeated Add calls, configure a CsmaHelper/PointToPointHelper by hand
+# and call SetBase/Assign for every subnet.  Build takes a compact spec
+# instead:
+#
+#   SPEC = {
+#       "nodes": ["n0", "r", "n1"],             # names, or a node count
+#       "linkTypes": {
+#           "lan": {"helper": "csma", "channel": {"DataRate": "5Mbps", "Delay": "2ms"}},
+#       },
+#       "links": [
+#           {"type": "lan", "nodes": ["n0", "r"], "network": "2001:1::/64",
+#            "forwarding": ["r"], "defaultRoute": "r"},
+#           {"type": "lan", "nodes": ["r", "n1"], "network": "2001:2::/64",
+#            "forwarding": ["r"], "defaultRoute": "r"},
+#       ],
+#   }
+#   topo = topology.Build (SPEC)
+#   topo.Link (0).interfaces.GetAddress (0, 1)
+#
+# Spec keys:
+#
+# - "nodes": list of node names (or an int; nodes are then named by their
+#   index);
+# - "stack": "both" (default), "ipv4", "ipv6" or None for no internet stack;
+# - "systemIds": the MPI rank (system id) of every node, in node order, for
+#   the distributed simulator (default: all 0); point-to-point links between
+#   nodes of different ranks become remote channels;
+# - "linkTypes": name -> {"helper": "csma" | "p2p", "device": {...},
+#   "channel": {...}}, attribute values given as strings;
+# - "ipv4"/"ipv6": base network ("10.1.1.0/24", "2001:db8::/64") numbering
+#   the links without a "network" of their own, one subnet per link in link
+#   order (Ipv4/Ipv6AddressHelper.NewNetwork);
+# - "links": list of {"type", "nodes"} with optional "network" (a network
+#   or None for no addresses), "forwarding" (nodes whose interface forwards,
+#   IPv6 only) and "defaultRoute" (node used as IPv6 default router by the
+#   others).
+#   A link may also be given as a (type, nodes) tuple.
+#
+# Build creates all the nodes with one NodeContainer.Create call and
+# installs the internet stack on all of them at once; links then cost a
+# single helper Install and address Assign call each, using one helper per
+# link type configured only once.  Nodes are only fetched from the container
+# when a link or Node () needs them.  NodeContainer cannot be sliced, so a
+# CSMA link still adds its members one by one, unless it spans every node.
+# Network addresses, masks and prefixes come from common.nscache.  Devices
+# are installed in link order, so device indices are the same as with
+# hand-written code.
+#
+# GridSpec, FatTreeSpec and RandomSpec generate point-to-point IPv4 specs
+# of any size (one /30 per link); their "hosts" entry lists the nodes
+# meant to run the applications.
+#
+
+import importlib
+import random
+
+from common import lazyns
+ns = lazyns.Import ("core", "network", "internet")
+
+from common import nscache
+
+_HELPERS = {
+    "csma": ("ns.csma", "CsmaHelper"),
+    "p2p": ("ns.point_to_point", "PointToPointHelper"),
+}
+
+
+class Link (object):
+
+    def __init__ (self, index, kind, nodes, network):
+        self.index = index
+        self.kind = kind
+        # Node ids, in the order the devices were installed
+        self.nodes = nodes
+        self.network = network
+        self.devices = None
+        self.interfaces = None
+
+    # Position of a node (id) in this link's device/interface containers.
+    def Position (self, nodeId):
+        return self.nodes.index (nodeId)
+
+
+class Topology (object):
+
+    def __init__ (self, spec):
+        self.spec = spec
+        nodes = spec["nodes"]
+        self.names = [str (i) for i in range (nodes)] if isinstance (nodes, int) else list (nodes)
+        self.ids = dict ((name, i) for i, name in enumerate (self.names))
+        if len (self.ids) != len (self.names):
+            raise ValueError ("duplicate node names in topology spec")
+        self.nodes = ns.network.NodeContainer ()
+        self.helpers = {}
+        self.links = []
+        self._nodeCache = {}
+
+    def NodeId (self, name):
+        if isinstance (name, int):
+            return name
+        return self.ids[name]
+
+    def Node (self, name):
+        nodeId = self.NodeId (name)
+        node = self._nodeCache.get (nodeId)
+        if node is None:
+            node = self._nodeCache[nodeId] = self.nodes.Get (nodeId)
+        return node
+
+    def Link (self, index):
+        return self.links[index]
+
+    # Links attached to a node, as (link, position of the node) pairs.
+    def LinksOf (self, name):
+        nodeId = self.NodeId (name)
+        return [(link, link.Position (nodeId)) for link in self.links if nodeId in link.nodes]
+
+    def Build (self):
+        self._CreateNodes ()
+        self._InstallStack ()
+        self._CreateHelpers ()
+        self._InstallLinks ()
+        self._AssignAddresses ()
+        return self
+
+    def _CreateNodes (self):
+        systemIds = self.spec.get ("systemIds")
+        if systemIds is None:
+            self.nodes.Create (len (self.names))
+        else:
+            if len (systemIds) != len (self.names):
+                raise ValueError ("systemIds must give one rank per node")
+            # One Create call per run of nodes on the same rank
+            start = 0
+            for i in range (1, len (systemIds) + 1):
+                if i == len (systemIds) or systemIds[i] != systemIds[start]:
+                    self.nodes.Create (i - start, systemIds[start])
+                    start = i
+
+    def _InstallStack (self):
+        stack = self.spec.get ("stack", "both")
+        if stack is None:
+            return
+        internet = ns.internet.InternetStackHelper ()
+        if stack == "ipv4":
+            internet.SetIpv6StackInstall (False)
+        elif stack == "ipv6":
+            internet.SetIpv4StackInstall (False)
+        elif stack != "both":
+            raise ValueError ("stack must be 'both', 'ipv4', 'ipv6' or None, not %r" % stack)
+        internet.Install (self.nodes)
+
+    def _CreateHelpers (self):
+        for name, linkType in self.spec.get ("linkTypes", {}).items ():
+            moduleName, className = _HELPERS[linkType["helper"]]
+            helper = getattr (importlib.import_module (moduleName), className) ()
+            for attribute, value in linkType.get ("device", {}).items ():
+                helper.SetDeviceAttribute (attribute, ns.core.StringValue (str (value)))
+            for attribute, value in linkType.get ("channel", {}).items ():
+                helper.SetChannelAttribute (attribute, ns.core.StringValue (str (value)))
+            self.helpers[name] = helper
+
+    def _InstallLinks (self):
+        allNodes = list (range (len (self.names)))
+        for index, entry in enumerate (self.spec.get ("links", [])):
+            if isinstance (entry, dict):
+                kind, names, network = entry["type"], entry["nodes"], entry.get ("network", "auto")
+            else:
+                (kind, names), network = entry, "auto"
+            link = Link (index, kind, [self.NodeId (name) for name in names], network)
+            helper = self.helpers[kind]
+            if len (link.nodes) == 2 and self.spec["linkTypes"][kind]["helper"] == "p2p":
+                link.devices = helper.Install (self.Node (link.nodes[0]), self.Node (link.nodes[1]))
+            elif link.nodes == allNodes:
+                link.devices = helper.Install (self.nodes)
+            else:
+                container = ns.network.NodeContainer ()
+                for nodeId in link.nodes:
+                    container.Add (self.Node (nodeId))
+                link.devices = helper.Install (container)
+            self.links.append (link)
+
+    def _AssignAddresses (self):
+        links = self.spec.get ("links", [])
+        if "ipv4" in self.spec and "ipv6" in self.spec:
+            raise ValueError ("give either an ipv4 or an ipv6 base network, not both")
+        base = self.spec.get ("ipv4", self.spec.get ("ipv6"))
+        auto = None
+        explicit = {}
+        for link, entry in zip (self.links, links):
+            if link.network is None or (link.network == "auto" and base is None):
+                continue
+            if link.network == "auto":
+                family = "ipv6" if ":" in base else "ipv4"
+                if auto is None:
+                    auto = _AddressHelper (base)
+                else:
+                    auto.NewNetwork ()
+                helper = auto
+            else:
+                family = "ipv6" if ":" in link.network else "ipv4"
+                helper = explicit.get (family)
+                if helper is None:
+                    helper = explicit[family] = _AddressHelper (link.network)
+                else:
+                    _SetBase (helper, link.network)
+            link.interfaces = helper.Assign (link.devices)
+
+            if isinstance (entry, dict):
+                if entry.get ("forwarding") and family != "ipv6":
+                    raise ValueError ("forwarding is only supported on IPv6 links")
+                for name in entry.get ("forwarding", ()):
+                    link.interfaces.SetForwarding (link.Position (self.NodeId (name)), True)
+                if entry.get ("defaultRoute") is not None:
+                    if family != "ipv6":
+                        raise ValueError ("defaultRoute is only supported on IPv6 links")
+                    link.interfaces.SetDefaultRouteInAllNodes (link.Position (self.NodeId (entry["defaultRoute"])))
+
+
+# "10.1.1.0/24" or "2001:1::/64" -> (address, mask or prefix), interned by
+# common.nscache
+def _ParseNetwork (network):
+    address, length = network.split ("/")
+    if ":" in address:
+        return nscache.Ipv6Address (address), nscache.Ipv6Prefix (int (length))
+    return nscache.Ipv4Address (address), nscache.Ipv4Mask ("/" + length)
+
+
+def _AddressHelper (network):
+    if ":" in network:
+        helper = ns.internet.Ipv6AddressHelper ()
+    else:
+        helper = ns.internet.Ipv4AddressHelper ()
+    _SetBase (helper, network)
+    return helper
+
+
+def _SetBase (helper, network):
+    helper.SetBase (*_ParseNetwork (network))
+
+
+def Build (spec):
+    return Topology (spec).Build ()
+
+
+P2P_NETWORK = "10.0.0.0/30"
+
+
+def _GeneratedSpec (nodes, links, hosts, linkType):
+    return {
+        "nodes": nodes,
+        "linkTypes": {"link": dict (linkType, helper="p2p")},
+        "ipv4": P2P_NETWORK,
+        "links": [("link", link) for link in links],
+        "hosts": hosts,
+    }
+
+
+# rows x cols routers, each linked to its right and lower neighbours.
+def GridSpec (rows, cols, linkType):
+    links = []
+    for r in range (rows):
+        for c in range (cols):
+            node = r * cols + c
+            if c + 1 < cols:
+                links.append ((node, node + 1))
+            if r + 1 < rows:
+                links.append ((node, node + cols))
+    return _GeneratedSpec (rows * cols, links, list (range (rows * cols)), linkType)
+
+
+# k-ary fat-tree: (k/2)^2 core switches, k pods of k/2 aggregation and k/2
+# edge switches, and hostsPerEdge hosts per edge switch (default k/2).
+def FatTreeSpec (k, linkType, hostsPerEdge=None):
+    if k % 2:
+        raise ValueError ("fat-tree arity must be even")
+    half = k // 2
+    if hostsPerEdge is None:
+        hostsPerEdge = half
+    cores = half * half
+    links = []
+    hosts = []
+    nodes = cores
+    for pod in range (k):
+        aggregation = list (range (nodes, nodes + half))
+        edge = list (range (nodes + half, nodes + k))
+        nodes += k
+        for j, switch in enumerate (aggregation):
+            links.extend ((switch, j * half + m) for m in range (half))
+        for switch in edge:
+            links.extend ((switch, up) for up in aggregation)
+            for h in range (hostsPerEdge):
+                links.append ((nodes, switch))
+                hosts.append (nodes)
+                nodes += 1
+    return _GeneratedSpec (nodes, links, hosts, linkType)
+
+
+# Connected random graph of n routers with an average degree of about
+# degree: a random spanning tree plus random extra links.
+def RandomSpec (n, degree, linkType, seed=1):
+    rng = random.Random (seed)
+    links = [(i, rng.randrange (i)) for i in range (1, n)]
+    edges = set ((min (a, b), max (a, b)) for a, b in links)
+    target = min (int (n * degree / 2), n * (n - 1) // 2)
+    while len (edges) < target:
+        a, b = rng.randrange (n), rng.randrange (n)
+        if a != b and (min (a, b), max (a, b)) not in edges:
+            edges.add ((min (a, b), max (a, b)))
+            links.append ((a, b))
+    return _GeneratedSpec (n, links, list (range (n)), linkType)
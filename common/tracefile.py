@@ -0,0 +1,356 @@
+#
+# Columnar reader and indexer for ns-3 ASCII traces (*.tr).
+#
+# Every line written by EnableAsciiAll looks like
+#
+#   + 1.00375 /NodeList/0/DeviceList/0/$ns3::PointToPointNetDevice/TxQueue/Enqueue \
+#       ns3::PppHeader (...) ns3::Ipv4Header (... length: 238 10.1.1.1 > 10.1.3.2) \
+#       ns3::UdpHeader (...) Payload (size=210)
+#
+# ReadTrace parses the event lines of a trace into typed columns (event
+# kind, time, node, device, size, protocol) held in array.array objects.
+# The file is memory-mapped and cut into line-aligned chunks that are parsed
+# with plain bytes operations (no decoding, no regular expressions); with
+# jobs > 1 the chunks are parsed by a pool of processes.
+#
+# - size is the IP datagram length when an IPv4/IPv6 header is printed,
+#   otherwise the payload size;
+# - protocol is the innermost header class (e.g. "UdpHeader",
+#   "Icmpv6Echo"), stored as an index into TraceColumns.protocols.
+#
+# Traces compressed by common.tracestream (x.tr.gz, x.tr.zst) are read
+# transparently: they are decompressed as a stream and cut into the same
+# line-aligned chunks, offsets referring to the decompressed data.
+#
+# TraceIndex keeps a sidecar file (<trace>.idx) with the byte range, time
+# range and set of nodes of every block of the trace, so queries for a time
+# window and/or a node only parse the blocks that can match.
+#
+
+import array
+import mmap
+import multiprocessing
+import os
+import struct
+
+from common import tracestream
+
+DEFAULT_CHUNK_SIZE = 4 << 20
+DEFAULT_BLOCK_SIZE = 1 << 20
+
+IPV6_HEADER_SIZE = 40
+
+_KINDS = (b"+", b"-", b"r", b"d", b"t")
+
+
+class TraceColumns (object):
+
+    def __init__ (self):
+        self.kind = array.array ("B")
+        self.time = array.array ("d")
+        self.node = array.array ("L")
+        self.device = array.array ("L")
+        self.size = array.array ("L")
+        self.protocol = array.array ("H")
+        self.protocols = []
+        self._protocolIds = {}
+        # Protocol ids by the raw header name, for ParseChunk
+        self._rawIds = {}
+
+    def __len__ (self):
+        return len (self.time)
+
+    def ProtocolId (self, name):
+        protocolId = self._protocolIds.get (name)
+        if protocolId is None:
+            protocolId = self._protocolIds[name] = len (self.protocols)
+            self.protocols.append (name)
+        return protocolId
+
+    def Row (self, i):
+        return (chr (self.kind[i]), self.time[i], self.node[i], self.device[i],
+                self.size[i], self.protocols[self.protocol[i]])
+
+    # Copy the rows selected by keep (a callable on the row number).
+    def Select (self, keep):
+        result = TraceColumns ()
+        result.protocols = list (self.protocols)
+        result._protocolIds = dict (self._protocolIds)
+        result._rawIds = dict (self._rawIds)
+        for i in range (len (self)):
+            if keep (i):
+                result.kind.append (self.kind[i])
+                result.time.append (self.time[i])
+                result.node.append (self.node[i])
+                result.device.append (self.device[i])
+                result.size.append (self.size[i])
+                result.protocol.append (self.protocol[i])
+        return result
+
+    def Extend (self, other):
+        remap = array.array ("H", [self.ProtocolId (name) for name in other.protocols])
+        self.kind.extend (other.kind)
+        self.time.extend (other.time)
+        self.node.extend (other.node)
+        self.device.extend (other.device)
+        self.size.extend (other.size)
+        self.protocol.extend (remap[p] for p in other.protocol)
+
+    # NumPy arrays sharing the column buffers (NumPy is only needed here).
+    def ToNumpy (self):
+        import numpy
+        return {
+            "kind": numpy.frombuffer (self.kind, dtype=numpy.uint8),
+            "time": numpy.frombuffer (self.time, dtype=numpy.float64),
+            "node": numpy.frombuffer (self.node, dtype="u%d" % self.node.itemsize),
+            "device": numpy.frombuffer (self.device, dtype="u%d" % self.device.itemsize),
+            "size": numpy.frombuffer (self.size, dtype="u%d" % self.size.itemsize),
+            "protocol": numpy.frombuffer (self.protocol, dtype=numpy.uint16),
+        }
+
+
+def ParseChunk (chunk, columns):
+    kind = columns.kind.append
+    time = columns.time.append
+    node = columns.node.append
+    device = columns.device.append
+    size = columns.size.append
+    protocol = columns.protocol.append
+    rawIds = columns._rawIds
+    for line in chunk.split (b"\n"):
+        # kind, time, trace context, packet
+        fields = line.split (b" ", 3)
+        if len (fields) < 3 or fields[0] not in _KINDS:
+            continue
+        path = fields[2].split (b"/", 5)
+        if len (path) < 5 or path[1] != b"NodeList":
+            continue
+        packet = fields[3] if len (fields) > 3 else b""
+        kind (fields[0][0])
+        time (float (fields[1]))
+        node (int (path[2]))
+        device (int (path[4]))
+
+        # IPv6 first: an IPv6/UDP line also has a UdpHeader "length: "
+        i = packet.find (b"Payload Length ")
+        if i >= 0:
+            i += 15
+            size (int (packet[i:packet.find (b" ", i)]) + IPV6_HEADER_SIZE)
+        else:
+            i = packet.find (b"Ipv4Header (")
+            if i >= 0:
+                i = packet.find (b"length: ", i) + 8
+                size (int (packet[i:packet.find (b" ", i)]))
+            else:
+                i = packet.find (b"Payload (size=")
+                size (int (packet[i + 14:packet.find (b")", i)]) if i >= 0 else 0)
+
+        # Innermost header: the last one before the payload (trailers follow it)
+        end = packet.rfind (b" Payload")
+        i = packet.rfind (b"ns3::", 0, end if end >= 0 else len (packet))
+        name = packet[i + 5:packet.find (b" ", i)] if i >= 0 else b""
+        if name.endswith (b"Trailer"):
+            i = packet.rfind (b"ns3::", 0, i)
+            name = packet[i + 5:packet.find (b" ", i)] if i >= 0 else b""
+        protocolId = rawIds.get (name)
+        if protocolId is None:
+            protocolId = rawIds[name] = columns.ProtocolId (name.decode ())
+        protocol (protocolId)
+
+
+# Yield (offset, chunk) pairs of about chunkSize bytes, split after a newline.
+def IterChunks (fileName, chunkSize=DEFAULT_CHUNK_SIZE):
+    if tracestream.IsCompressed (fileName):
+        for offset, chunk in _StreamChunks (fileName, chunkSize):
+            yield offset, chunk
+        return
+    with open (fileName, "rb") as f:
+        if os.fstat (f.fileno ()).st_size == 0:
+            return
+        with mmap.mmap (f.fileno (), 0, access=mmap.ACCESS_READ) as data:
+            for offset, length in ChunkRanges (fileName, chunkSize):
+                yield offset, data[offset:offset + length]
+
+
+def _StreamChunks (fileName, chunkSize):
+    offset = 0
+    rest = b""
+    with tracestream.OpenRead (fileName) as f:
+        while True:
+            data = f.read (chunkSize)
+            if not data:
+                break
+            data = rest + data
+            end = data.rfind (b"\n") + 1
+            if end == 0:
+                rest = data
+                continue
+            yield offset, data[:end]
+            offset += end
+            rest = data[end:]
+    if rest:
+        yield offset, rest
+
+
+# Yield (offset, length) of the chunks IterChunks would return (plain files).
+def ChunkRanges (fileName, chunkSize=DEFAULT_CHUNK_SIZE):
+    with open (fileName, "rb") as f:
+        if os.fstat (f.fileno ()).st_size == 0:
+            return
+        with mmap.mmap (f.fileno (), 0, access=mmap.ACCESS_READ) as data:
+            start = 0
+            end = len (data)
+            while start < end:
+                stop = data.find (b"\n", min (start + chunkSize, end) - 1)
+                stop = end if stop < 0 else stop + 1
+                yield start, stop - start
+                start = stop
+
+
+def _ParseRange (task):
+    fileName, offset, length = task
+    columns = TraceColumns ()
+    with open (fileName, "rb") as f:
+        f.seek (offset)
+        ParseChunk (f.read (length), columns)
+    return columns
+
+
+def _ParseBytes (chunk):
+    columns = TraceColumns ()
+    ParseChunk (chunk, columns)
+    return columns
+
+
+def ReadTrace (fileName, chunkSize=DEFAULT_CHUNK_SIZE, jobs=1):
+    columns = TraceColumns ()
+    if jobs == 1:
+        for offset, chunk in IterChunks (fileName, chunkSize):
+            ParseChunk (chunk, columns)
+        return columns
+
+    with multiprocessing.Pool (jobs) as pool:
+        if tracestream.IsCompressed (fileName):
+            # Decompress here, parse the chunks in the workers
+            parts = pool.imap (_ParseBytes, (chunk for offset, chunk in IterChunks (fileName, chunkSize)))
+        else:
+            tasks = [(fileName, offset, length) for offset, length in ChunkRanges (fileName, chunkSize)]
+            parts = pool.imap (_ParseRange, tasks)
+        for part in parts:
+            columns.Extend (part)
+    return columns
+
+
+# Read size bytes (less only at the end of the stream).
+def _Read (f, size):
+    data = f.read (size)
+    while len (data) < size:
+        more = f.read (size - len (data))
+        if not more:
+            break
+        data += more
+    return data
+
+
+class TraceIndex (object):
+
+    MAGIC = b"NS3TRIDX"
+    VERSION = 1
+    _HEADER = struct.Struct ("<8sIQQI")
+    _BLOCK = struct.Struct ("<QQddII")
+
+    def __init__ (self, fileName):
+        self.fileName = fileName
+        self.indexName = fileName + ".idx"
+        # (offset, length, tmin, tmax, events, frozenset of nodes)
+        self.blocks = []
+
+    def _Signature (self):
+        st = os.stat (self.fileName)
+        return st.st_size, st.st_mtime_ns
+
+    # Load the sidecar index, (re)building it when missing or stale.
+    @classmethod
+    def Open (cls, fileName, blockSize=DEFAULT_BLOCK_SIZE):
+        index = cls (fileName)
+        if not index.Load ():
+            index.Build (blockSize)
+            index.Save ()
+        return index
+
+    def Build (self, blockSize=DEFAULT_BLOCK_SIZE):
+        self.blocks = []
+        for offset, chunk in IterChunks (self.fileName, blockSize):
+            columns = TraceColumns ()
+            ParseChunk (chunk, columns)
+            if len (columns) == 0:
+                continue
+            self.blocks.append ((offset, len (chunk), min (columns.time), max (columns.time),
+                                 len (columns), frozenset (columns.node)))
+
+    def Save (self):
+        size, mtime = self._Signature ()
+        with open (self.indexName, "wb") as f:
+            f.write (self._HEADER.pack (self.MAGIC, self.VERSION, size, mtime, len (self.blocks)))
+            for offset, length, tmin, tmax, events, nodes in self.blocks:
+                f.write (self._BLOCK.pack (offset, length, tmin, tmax, events, len (nodes)))
+                array.array ("I", sorted (nodes)).tofile (f)
+
+    def Load (self):
+        try:
+            with open (self.indexName, "rb") as f:
+                magic, version, size, mtime, count = self._HEADER.unpack (f.read (self._HEADER.size))
+                if magic != self.MAGIC or version != self.VERSION or (size, mtime) != self._Signature ():
+                    return False
+                blocks = []
+                for _ in range (count):
+                    offset, length, tmin, tmax, events, nNodes = self._BLOCK.unpack (f.read (self._BLOCK.size))
+                    nodes = array.array ("I")
+                    nodes.fromfile (f, nNodes)
+                    blocks.append ((offset, length, tmin, tmax, events, frozenset (nodes)))
+        except (OSError, struct.error, EOFError):
+            return False
+        self.blocks = blocks
+        return True
+
+    # Yield (offset, length, tmin, tmax, events, nodes, data) for the blocks
+    # that can hold events of the query.
+    def _Blocks (self, start, stop, node):
+        selected = [block for block in self.blocks
+                    if not (block[3] < start or block[2] > stop or (node is not None and node not in block[5]))]
+        if not tracestream.IsCompressed (self.fileName):
+            with open (self.fileName, "rb") as f:
+                with mmap.mmap (f.fileno (), 0, access=mmap.ACCESS_READ) as data:
+                    for block in selected:
+                        yield block + (data[block[0]:block[0] + block[1]],)
+            return
+        # Compressed traces cannot seek: decompress up to the last selected
+        # block, skipping over the others.
+        # A stream ending early (truncated file, or an index from before the
+        # file was rewritten) raises EOFError.
+        position = 0
+        with tracestream.OpenRead (self.fileName) as f:
+            for block in selected:
+                while position < block[0]:
+                    skipped = len (_Read (f, min (block[0] - position, DEFAULT_CHUNK_SIZE)))
+                    if not skipped:
+                        break
+                    position += skipped
+                data = _Read (f, block[1]) if position == block[0] else b""
+                position += len (data)
+                if len (data) < block[1]:
+                    raise EOFError ("%s ends at byte %d, inside the indexed block at %d (truncated, or stale %s)" %
+                                    (self.fileName, position, block[0], self.indexName))
+                yield block + (data,)
+
+    # Events with start <= time <= stop (and on node, if given).
+    def Query (self, start=float ("-inf"), stop=float ("inf"), node=None):
+        result = TraceColumns ()
+        for offset, length, tmin, tmax, events, nodes, data in self._Blocks (start, stop, node):
+            columns = TraceColumns ()
+            ParseChunk (data, columns)
+            times = columns.time
+            nodeIds = columns.node
+            result.Extend (columns.Select (
+                lambda i: start <= times[i] <= stop and (node is None or nodeIds[i] == node)))
+        return result
@@ -0,0 +1,281 @@
+#
+# Buffered and compressed trace files.
+#
+# The compression is chosen from the file name: "x.tr.gz" is written with
+# gzip, "x.tr.zst" with zstd (the zstandard module when installed, otherwise
+# the zstd command-line tool) and anything else as plain bytes.
+#
+# ns-3 writes its ASCII and pcap traces from C++ through std::ofstream, with
+# small writes and no compression.  TraceStreams.NativePath hands ns-3 a
+# named pipe instead of the trace file; a writer process drains the pipe in
+# large reads, compresses and writes the real file in bufferSize blocks.
+# It is a separate process rather than a thread because ns-3 may write while
+# holding the Python GIL (e.g. when flushing in Simulator.Destroy), which
+# would deadlock a Python thread waiting to drain the pipe.  One writer
+# process serves all the pipes of a TraceStreams (selectors), so generated
+# topologies with thousands of pcap files do not fork an interpreter per
+# file; NativePath passes it each new pipe on its standard input.
+#
+# Traces written from Python (the sampling sinks of common.tracing) use
+# TraceStreams.Open, which buffers and compresses in-process, optionally in
+# a background thread (zlib and zstd release the GIL while compressing).
+#
+# OpenRead returns a binary reader decompressing any of these files.
+#
+
+import atexit
+import gzip
+import json
+import os
+import queue
+import selectors
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+DEFAULT_BUFFER_SIZE = 1 << 20
+# Pipe reads of the writer process
+READ_SIZE = 1 << 16
+
+SUFFIXES = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+
+GZIP_LEVEL = 1
+ZSTD_LEVEL = 3
+
+
+def IsCompressed (fileName):
+    return fileName.endswith (".gz") or fileName.endswith (".zst")
+
+
+class _ProcessWriter (object):
+
+    def __init__ (self, command, fileName):
+        self.file = open (fileName, "wb")
+        self.process = subprocess.Popen (command, stdin=subprocess.PIPE, stdout=self.file)
+
+    def write (self, data):
+        self.process.stdin.write (data)
+
+    def close (self):
+        self.process.stdin.close ()
+        self.process.wait ()
+        self.file.close ()
+
+
+def _OpenTarget (fileName):
+    if fileName.endswith (".gz"):
+        return gzip.GzipFile (fileName, "wb", compresslevel=GZIP_LEVEL)
+    if fileName.endswith (".zst"):
+        if zstandard is not None:
+            return zstandard.ZstdCompressor (level=ZSTD_LEVEL).stream_writer (open (fileName, "wb"))
+        return _ProcessWriter (["zstd", "-q", "-c", "-%d" % ZSTD_LEVEL], fileName)
+    return open (fileName, "wb", buffering=0)
+
+
+# Collect small writes and pass them on to target in bufferSize blocks.
+class _BufferedWriter (object):
+
+    def __init__ (self, target, bufferSize):
+        self.target = target
+        self.bufferSize = bufferSize
+        self.buffer = bytearray ()
+
+    def write (self, data):
+        self.buffer += data
+        if len (self.buffer) >= self.bufferSize:
+            self._Flush ()
+
+    def _Flush (self):
+        if self.buffer:
+            self._Write (bytes (self.buffer))
+            self.buffer = bytearray ()
+
+    def _Write (self, block):
+        self.target.write (block)
+
+    def close (self):
+        if self.target is not None:
+            self._Flush ()
+            self.target.close ()
+            self.target = None
+
+
+# Same, but the blocks are compressed and written by a background thread.
+class _ThreadedWriter (_BufferedWriter):
+
+    def __init__ (self, target, bufferSize):
+        _BufferedWriter.__init__ (self, target, bufferSize)
+        self.blocks = queue.Queue (maxsize=8)
+        self.thread = threading.Thread (target=self._Run, daemon=True)
+        self.thread.start ()
+
+    def _Run (self):
+        while True:
+            block = self.blocks.get ()
+            if block is None:
+                break
+            self.target.write (block)
+
+    def _Write (self, block):
+        self.blocks.put (block)
+
+    def close (self):
+        if self.target is not None:
+            self._Flush ()
+            self.blocks.put (None)
+            self.thread.join ()
+            self.target.close ()
+            self.target = None
+
+
+def OpenWrite (fileName, bufferSize=DEFAULT_BUFFER_SIZE, thread=False):
+    writerClass = _ThreadedWriter if thread else _BufferedWriter
+    return writerClass (_OpenTarget (fileName), bufferSize)
+
+
+# Binary reader for a plain, gzip or zstd file.
+def OpenRead (fileName):
+    if fileName.endswith (".gz"):
+        return gzip.open (fileName, "rb")
+    if fileName.endswith (".zst"):
+        if zstandard is not None:
+            return zstandard.ZstdDecompressor ().stream_reader (open (fileName, "rb"), closefd=True)
+        return subprocess.Popen (["zstd", "-q", "-d", "-c", fileName], stdout=subprocess.PIPE).stdout
+    return open (fileName, "rb")
+
+
+# Copy everything written to each pipe into its file, until the control
+# file descriptor is closed and every pipe's writer has closed it.  control
+# carries one JSON [fifo, fileName] line per pipe.  Run by the writer
+# process started by TraceStreams.NativePath.
+def Pump (control, bufferSize):
+    try:
+        import resource
+        soft, hard = resource.getrlimit (resource.RLIMIT_NOFILE)
+        resource.setrlimit (resource.RLIMIT_NOFILE, (hard, hard))
+    except (ImportError, ValueError, OSError):
+        pass
+    selector = selectors.DefaultSelector ()
+    selector.register (control, selectors.EVENT_READ)
+    pending = b""
+    while selector.get_map ():
+        for key, events in selector.select ():
+            if key.fd == control:
+                data = os.read (control, READ_SIZE)
+                if not data:
+                    selector.unregister (control)
+                    continue
+                lines = (pending + data).split (b"\n")
+                pending = lines.pop ()
+                for line in lines:
+                    fifo, fileName = json.loads (line)
+                    # Non-blocking, so pipes ns-3 has not opened yet do not
+                    # hold up the others (and report nothing until it has)
+                    fd = os.open (fifo, os.O_RDONLY | os.O_NONBLOCK)
+                    selector.register (fd, selectors.EVENT_READ, OpenWrite (fileName, bufferSize))
+                continue
+            try:
+                data = os.read (key.fd, READ_SIZE)
+            except BlockingIOError:
+                continue
+            if data:
+                key.data.write (data)
+            else:
+                selector.unregister (key.fd)
+                os.close (key.fd)
+                key.data.close ()
+
+
+class TraceStreams (object):
+
+    # Seconds to wait at exit for the writer process to finish.
+    CLOSE_TIMEOUT = 30
+
+    def __init__ (self, compress="none", bufferSize=0, thread=False):
+        if compress not in SUFFIXES:
+            raise ValueError ("compression must be one of %s, not %r" % (", ".join (SUFFIXES), compress))
+        self.suffix = SUFFIXES[compress]
+        self.bufferSize = bufferSize
+        self.thread = thread
+        self._fifoDir = None
+        self._fifos = []
+        self._pump = None
+        self._writers = []
+
+    # True when trace files are written by ns-3 as before.
+    @property
+    def direct (self):
+        return not self.suffix and self.bufferSize <= 0
+
+    def Name (self, fileName):
+        if IsCompressed (fileName):
+            return fileName
+        return fileName + self.suffix
+
+    # Path ns-3 should write fileName to.
+    def NativePath (self, fileName):
+        fileName = self.Name (fileName)
+        if self.direct and not IsCompressed (fileName):
+            return fileName
+        if self._fifoDir is None:
+            self._fifoDir = tempfile.mkdtemp (prefix="ns3-trace-")
+            self._pump = subprocess.Popen ([sys.executable, os.path.abspath (__file__),
+                                            str (self.bufferSize or DEFAULT_BUFFER_SIZE)], stdin=subprocess.PIPE)
+            atexit.register (self.Close)
+        fifo = os.path.join (self._fifoDir, "%d-%s" % (len (self._fifos), os.path.basename (fileName)))
+        os.mkfifo (fifo)
+        self._pump.stdin.write (json.dumps ([fifo, os.path.abspath (fileName)]).encode () + b"\n")
+        self._pump.stdin.flush ()
+        self._fifos.append (fifo)
+        return fifo
+
+    # Binary writer for a trace written from Python.
+    def Open (self, fileName):
+        writer = OpenWrite (self.Name (fileName), self.bufferSize or DEFAULT_BUFFER_SIZE, self.thread)
+        self._writers.append (writer)
+        return writer
+
+    def CloseWriters (self):
+        for writer in self._writers:
+            writer.close ()
+        self._writers = []
+
+    # Close the Python writers and wait for the writer process, which
+    # finishes once ns-3 has closed its end of the pipes (Simulator.Destroy).
+    # Registered with atexit by NativePath.
+    def Close (self):
+        self.CloseWriters ()
+        pump = self._pump
+        if pump is not None:
+            pump.stdin.close ()
+            deadline = time.monotonic () + self.CLOSE_TIMEOUT
+            while pump.poll () is None and time.monotonic () < deadline:
+                # Opening and closing the write end releases a pipe ns-3
+                # never opened; it is harmless while ns-3 still has the
+                # pipe open, and fails once the writer process is done
+                # with it.
+                for fifo in self._fifos:
+                    try:
+                        os.close (os.open (fifo, os.O_WRONLY | os.O_NONBLOCK))
+                    except OSError:
+                        pass
+                time.sleep (0.05)
+            if pump.poll () is None:
+                sys.stderr.write ("trace writer %d still running, not waiting for it\n" % pump.pid)
+        self._pump = None
+        self._fifos = []
+        if self._fifoDir is not None:
+            shutil.rmtree (self._fifoDir, ignore_errors=True)
+            self._fifoDir = None
+
+
+if __name__ == '__main__':
+    Pump (sys.stdin.fileno (), int (sys.argv[1]))
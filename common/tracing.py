@@ -0,0 +1,267 @@
+#
+# Tracing policy shared by the examples.
+#
+# The examples used to call EnableAsciiAll/EnablePcapAll unconditionally.
+# They now go through a TracePolicy built from common command-line options:
+#
+#   --TraceMode=all|off     trace everything (default) or nothing
+#   --TraceNodes=0,2        only trace the devices of these nodes
+#   --TraceDevices=0:1,2:0  only trace these node:device pairs
+#   --TraceSample=N         keep 1 in N packets (by packet uid, so every
+#                           event of a kept packet is traced)
+#   --TraceWindow=2.0:4.5   only trace between these simulation times
+#   --TraceSnaplen=B        truncate pcap records to B bytes
+#   --TraceCompress=gzip    write x.tr.gz/x.pcap.gz (or zstd: .zst files)
+#   --TraceBuffer=B         write trace files in blocks of B bytes
+#   --TraceWriterThread=1   compress Python-written traces in a thread
+#
+# Node/device selection and snaplen are handled by ns-3 itself (per-device
+# Enable* calls, PcapFileWrapper::CaptureSize).  Sampling and time windows
+# have no native support, so they are implemented by Python sinks connected
+# to the same device trace sources the helpers use, writing the same ASCII
+# line format and the same pcap files; they cost a Python call per traced
+# event, which is much cheaper than the I/O they avoid at high rates.
+#
+# Compression and buffering go through common.tracestream: ns-3 writes into
+# named pipes drained by one writer process (see TraceStreams.NativePath).
+# OpenStream gives the other text outputs of the examples (routing tables)
+# the same treatment.
+#
+
+from common import lazyns
+ns = lazyns.Import ("core", "network")
+
+from common import profiling
+from common import tracestream
+from common.cmdline import GetBool
+
+# Per helper: traced device type, ASCII sources as (event kind, source path),
+# pcap sources (non promiscuous, promiscuous) and pcap data link type.
+_DEVICES = {
+    "CsmaHelper": ("ns3::CsmaNetDevice",
+                   [("+", "TxQueue/Enqueue"), ("-", "TxQueue/Dequeue"), ("d", "TxQueue/Drop"), ("r", "MacRx")],
+                   ("Sniffer", "PromiscSniffer"), "DLT_EN10MB"),
+    "PointToPointHelper": ("ns3::PointToPointNetDevice",
+                           [("+", "TxQueue/Enqueue"), ("-", "TxQueue/Dequeue"), ("d", "TxQueue/Drop"),
+                            ("d", "PhyRxDrop"), ("r", "MacRx")],
+                           ("PromiscSniffer", "PromiscSniffer"), "DLT_PPP"),
+    "LrWpanHelper": ("ns3::LrWpanNetDevice",
+                     [("+", "Mac/MacTxEnqueue"), ("-", "Mac/MacTxDequeue"), ("d", "Mac/MacTxDrop"),
+                      ("t", "Mac/MacTx"), ("r", "Mac/MacRx")],
+                     ("Mac/Sniffer", "Mac/PromiscSniffer"), "DLT_IEEE802_15_4"),
+}
+
+
+def AddCommandLineOptions (cmd):
+    cmd.TraceMode = "all"
+    cmd.TraceNodes = ""
+    cmd.TraceDevices = ""
+    cmd.TraceSample = 1
+    cmd.TraceWindow = ""
+    cmd.TraceSnaplen = 0
+    cmd.TraceCompress = "none"
+    cmd.TraceBuffer = 0
+    cmd.TraceWriterThread = False
+    cmd.AddValue ("TraceMode", "all: trace every device, off: no ascii/pcap traces")
+    cmd.AddValue ("TraceNodes", "Comma-separated node ids to trace (default: all)")
+    cmd.AddValue ("TraceDevices", "Comma-separated node:device pairs to trace (default: all)")
+    cmd.AddValue ("TraceSample", "Trace 1 in N packets")
+    cmd.AddValue ("TraceWindow", "start:stop simulation time window to trace, in seconds")
+    cmd.AddValue ("TraceSnaplen", "Truncate pcap records to this many bytes (0: whole packets)")
+    cmd.AddValue ("TraceCompress", "Compress trace files: none, gzip or zstd")
+    cmd.AddValue ("TraceBuffer", "Write trace files in blocks of this many bytes (0: unbuffered pass-through)")
+    cmd.AddValue ("TraceWriterThread", "Compress traces written from Python in a background thread")
+
+
+def _ParseContext (context):
+    # "/NodeList/<node>/DeviceList/<device>/..."
+    path = context.split ("/")
+    return int (path[2]), int (path[4])
+
+
+class TracePolicy (object):
+
+    def __init__ (self, mode="all", nodes=(), devices=(), sample=1, window=None, snaplen=0,
+                  compress="none", bufferSize=0, writerThread=False):
+        self.mode = mode
+        self.nodes = list (nodes)
+        self.devices = list (devices)
+        self.sample = max (1, sample)
+        self.window = window
+        self.snaplen = snaplen
+        self.streams = tracestream.TraceStreams (compress, bufferSize, writerThread)
+        self._sinks = []
+        if snaplen > 0:
+            lazyns.Require ("network")
+            ns.core.Config.SetDefault ("ns3::PcapFileWrapper::CaptureSize", ns.core.UintegerValue (snaplen))
+
+    @classmethod
+    def FromCommandLine (cls, cmd):
+        nodes = [int (node) for node in str (cmd.TraceNodes).split (",") if node.strip ()]
+        devices = [tuple (int (x) for x in pair.split (":")) for pair in str (cmd.TraceDevices).split (",") if pair.strip ()]
+        window = None
+        if str (cmd.TraceWindow):
+            start, stop = str (cmd.TraceWindow).split (":")
+            window = (float (start or 0), float (stop or "inf"))
+        mode = str (cmd.TraceMode)
+        if mode not in ("all", "off"):
+            raise ValueError ("TraceMode must be 'all' or 'off', not %r" % mode)
+        return cls (mode, nodes, devices, int (cmd.TraceSample), window, int (cmd.TraceSnaplen),
+                    str (cmd.TraceCompress), int (cmd.TraceBuffer), GetBool (cmd.TraceWriterThread))
+
+    @property
+    def enabled (self):
+        return self.mode != "off"
+
+    @property
+    def sampled (self):
+        return self.sample > 1 or self.window is not None
+
+    # Trace context prefixes selected by TraceNodes/TraceDevices.
+    def _Paths (self, deviceType):
+        if self.devices:
+            return ["/NodeList/%d/DeviceList/%d/$%s/" % (node, device, deviceType) for node, device in self.devices]
+        if self.nodes:
+            return ["/NodeList/%d/DeviceList/*/$%s/" % (node, deviceType) for node in self.nodes]
+        return ["/NodeList/*/DeviceList/*/$%s/" % deviceType]
+
+    # Devices of deviceType selected by TraceNodes/TraceDevices.
+    def _Devices (self, deviceType):
+        devices = []
+        for nodeId in range (ns.network.NodeList.GetNNodes ()):
+            node = ns.network.NodeList.GetNode (nodeId)
+            if self.nodes and nodeId not in self.nodes:
+                continue
+            for deviceId in range (node.GetNDevices ()):
+                device = node.GetDevice (deviceId)
+                if self.devices and (nodeId, deviceId) not in self.devices:
+                    continue
+                if device.GetInstanceTypeId ().GetName () == deviceType:
+                    devices.append (device)
+        return devices
+
+    def EnableAscii (self, helper, fileName):
+        if not self.enabled:
+            return
+        if self.sampled:
+            deviceType, sources, sniffers, linkType = _DEVICES[type (helper).__name__]
+            sink = _AsciiSink (self, fileName)
+            for path in self._Paths (deviceType):
+                for kind, source in sources:
+                    self._Connect (path + source, sink.Trace (kind))
+            self._AddSink (sink)
+            return
+
+        stream = ns.network.AsciiTraceHelper ().CreateFileStream (self.streams.NativePath (fileName))
+        if self.devices:
+            for node, device in self.devices:
+                helper.EnableAscii (stream, node, device)
+        elif self.nodes:
+            for node in self.nodes:
+                helper.EnableAscii (stream, ns.network.NodeContainer (ns.network.NodeList.GetNode (node)))
+        else:
+            helper.EnableAsciiAll (stream)
+
+    def EnablePcap (self, helper, prefix, promiscuous=False):
+        if not self.enabled:
+            return
+        if self.sampled:
+            deviceType, sources, sniffers, linkType = _DEVICES[type (helper).__name__]
+            sink = _PcapSink (self, prefix, getattr (ns.network.PcapHelper, linkType))
+            for path in self._Paths (deviceType):
+                self._Connect (path + sniffers[bool (promiscuous)], sink.Trace)
+            self._AddSink (sink)
+            return
+
+        if not self.streams.direct:
+            # One explicitly named (piped) file per device
+            deviceType = _DEVICES[type (helper).__name__][0]
+            pcapHelper = ns.network.PcapHelper ()
+            for device in self._Devices (deviceType):
+                fileName = pcapHelper.GetFilenameFromDevice (prefix, device)
+                helper.EnablePcap (self.streams.NativePath (fileName), device, promiscuous, True)
+        elif self.devices:
+            for node, device in self.devices:
+                helper.EnablePcap (prefix, node, device, promiscuous)
+        elif self.nodes:
+            for node in self.nodes:
+                helper.EnablePcap (prefix, ns.network.NodeContainer (ns.network.NodeList.GetNode (node)), promiscuous)
+        else:
+            helper.EnablePcapAll (prefix, promiscuous)
+
+    # Output stream for the other text files of an example (e.g. the
+    # routing tables), compressed and buffered like the traces.
+    def OpenStream (self, fileName):
+        return ns.network.OutputStreamWrapper (self.streams.NativePath (fileName), ns.network.STD_IOS_OUT)
+
+    def _Connect (self, path, callback):
+        callback = profiling.Wrap ("tracing", callback)
+        # Nothing is traced before the window opens, so only connect then.
+        if self.window is not None and self.window[0] > 0:
+            ns.core.Simulator.Schedule (ns.core.Seconds (self.window[0]), ns.core.Config.Connect, path, callback)
+        else:
+            ns.core.Config.Connect (path, callback)
+
+    def Keep (self, packet):
+        if self.sample > 1 and packet.GetUid () % self.sample:
+            return False
+        if self.window is not None:
+            now = ns.core.Simulator.Now ().GetSeconds ()
+            return self.window[0] <= now <= self.window[1]
+        return True
+
+    def _AddSink (self, sink):
+        if not self._sinks:
+            ns.core.Simulator.ScheduleDestroy (self.Close)
+        self._sinks.append (sink)
+
+    # Flush and close the files written by the sampling sinks (done
+    # automatically by Simulator.Destroy).
+    def Close (self):
+        for sink in self._sinks:
+            sink.Close ()
+        self._sinks = []
+        self.streams.CloseWriters ()
+
+
+class _AsciiSink (object):
+
+    def __init__ (self, policy, fileName):
+        self.policy = policy
+        self.file = policy.streams.Open (fileName)
+
+    def Trace (self, kind):
+        def Sink (context, packet):
+            if self.policy.Keep (packet):
+                # Same line format as the ns-3 ascii trace helpers
+                line = "%s %g %s %s\n" % (kind, ns.core.Simulator.Now ().GetSeconds (), context, packet)
+                self.file.write (line.encode ())
+        return Sink
+
+    def Close (self):
+        self.file.close ()
+
+
+class _PcapSink (object):
+
+    def __init__ (self, policy, prefix, linkType):
+        self.policy = policy
+        self.prefix = prefix
+        self.linkType = linkType
+        self.files = {}
+
+    def Trace (self, context, packet):
+        if not self.policy.Keep (packet):
+            return
+        key = _ParseContext (context)
+        pcap = self.files.get (key)
+        if pcap is None:
+            helper = ns.network.PcapHelper ()
+            device = ns.network.NodeList.GetNode (key[0]).GetDevice (key[1])
+            fileName = helper.GetFilenameFromDevice (self.prefix, device)
+            pcap = self.files[key] = helper.CreateFile (self.policy.streams.NativePath (fileName),
+                                                        ns.network.STD_IOS_OUT, self.linkType)
+        pcap.Write (ns.core.Simulator.Now (), packet)
+
+    def Close (self):
+        self.files = {}
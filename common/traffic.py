@@ -0,0 +1,196 @@
+#
+# Traffic matrices.
+#
+# A traffic matrix lists flows, one per row:
+#
+#   source,destination,protocol,rate,start,stop,packetSize,port
+#   0,3,udp,448kb/s,1.0,10.0,210,9
+#   0,3,tcp,,1.2,1.35,512,21
+#
+# source and destination are node ids or topology node names; protocol is
+# udp or tcp; a flow with a rate is a constant-rate OnOff application, one
+# without a rate (TCP) a BulkSend application (an FTP-like transfer that
+# sends as fast as TCP lets it); packetSize and port are optional (210 and
+# 9 by default).  Matrices come from CSV files (LoadCsv), lists of tuples
+# or dicts, or NumPy structured arrays with these field names.
+#
+# Install (topo, flows) then:
+#
+# - installs one PacketSink per destination node, protocol and port, with
+#   one PacketSinkHelper.Install call per protocol and port for all the
+#   nodes that need it, running from the earliest start to the latest stop
+#   of its flows;
+# - installs the sources node by node with one helper per protocol, rate
+#   and packet size, configured once, and one cached Remote address per
+#   destination and port;
+# - starts and stops the applications with one ApplicationContainer
+#   Start/Stop call per distinct (start, stop) pair.
+#
+# Destinations are reached at their address on their first link.
+#
+
+import csv
+
+from common import lazyns
+ns = lazyns.Import ("core", "network", "applications")
+
+from common import nscache
+
+FIELDS = ("source", "destination", "protocol", "rate", "start", "stop", "packetSize", "port")
+DEFAULTS = {"packetSize": 210, "port": 9, "rate": ""}
+FACTORIES = {"udp": "ns3::UdpSocketFactory", "tcp": "ns3::TcpSocketFactory"}
+
+
+class Flow (object):
+
+    __slots__ = FIELDS
+
+    def __init__ (self, source, destination, protocol, rate, start, stop, packetSize, port):
+        self.source = source
+        self.destination = destination
+        self.protocol = protocol.lower ()
+        self.rate = rate or ""
+        self.start = float (start)
+        self.stop = float (stop)
+        self.packetSize = int (packetSize)
+        self.port = int (port)
+        if self.protocol not in FACTORIES:
+            raise ValueError ("flow protocol must be udp or tcp, not %r" % protocol)
+        if not self.rate and self.protocol != "tcp":
+            raise ValueError ("UDP flows need a rate")
+
+
+def _NodeKey (value):
+    value = value.strip () if isinstance (value, str) else value
+    if isinstance (value, str) and value.isdigit ():
+        return int (value)
+    return value
+
+
+def _FromMapping (row):
+    values = dict (DEFAULTS)
+    for key, value in row.items ():
+        # Bytes fields ("S" dtype) of arrays from genfromtxt/loadtxt
+        if isinstance (value, bytes):
+            value = value.decode ()
+        if value not in (None, ""):
+            values[key] = value
+    return Flow (_NodeKey (values["source"]), _NodeKey (values["destination"]), values["protocol"],
+                 values["rate"], values["start"], values["stop"], values["packetSize"], values["port"])
+
+
+# Flows from a list of tuples (in FIELDS order) or dicts, or a NumPy
+# structured array.
+def Flows (matrix):
+    if isinstance (matrix, list) and matrix and isinstance (matrix[0], Flow):
+        return matrix
+    names = getattr (getattr (matrix, "dtype", None), "names", None)
+    if names is not None:
+        return [_FromMapping (dict (zip (names, row))) for row in matrix.tolist ()]
+    flows = []
+    for row in matrix:
+        if not isinstance (row, dict):
+            row = dict (zip (FIELDS, row))
+        flows.append (_FromMapping (row))
+    return flows
+
+
+def LoadCsv (fileName):
+    with open (fileName, newline="") as f:
+        rows = [row for row in csv.DictReader (f, skipinitialspace=True)]
+    return Flows (rows)
+
+
+def _Address (topo, nodeId, port, cache):
+    key = (nodeId, port)
+    address = cache.get (key)
+    if address is None:
+        link, position = topo.LinksOf (nodeId)[0]
+        address = cache[key] = ns.network.AddressValue (
+            ns.network.InetSocketAddress (link.interfaces.GetAddress (position), port))
+    return address
+
+
+class TrafficEngine (object):
+
+    def __init__ (self, topo):
+        self.topo = topo
+        self.sinks = {}
+        self.sources = []
+        self._helpers = {}
+        self._addresses = {}
+
+    def _SourceHelper (self, flow):
+        key = (flow.protocol, flow.rate, flow.packetSize)
+        helper = self._helpers.get (key)
+        if helper is None:
+            if flow.rate:
+                helper = ns.applications.OnOffHelper (FACTORIES[flow.protocol], ns.network.Address ())
+                helper.SetConstantRate (nscache.DataRate (flow.rate), flow.packetSize)
+            else:
+                helper = ns.applications.BulkSendHelper (FACTORIES[flow.protocol], ns.network.Address ())
+                helper.SetAttribute ("SendSize", ns.core.UintegerValue (flow.packetSize))
+            self._helpers[key] = helper
+        return helper
+
+    def _InstallSinks (self, flows):
+        # (protocol, port) -> destination -> [start, stop]
+        lifetimes = {}
+        for flow in flows:
+            nodes = lifetimes.setdefault ((flow.protocol, flow.port), {})
+            span = nodes.get (flow.destination)
+            if span is None:
+                nodes[flow.destination] = [flow.start, flow.stop]
+            else:
+                span[0] = min (span[0], flow.start)
+                span[1] = max (span[1], flow.stop)
+        for (protocol, port), nodes in lifetimes.items ():
+            helper = ns.applications.PacketSinkHelper (
+                FACTORIES[protocol], ns.network.InetSocketAddress (ns.network.Ipv4Address.GetAny (), port))
+            container = ns.network.NodeContainer ()
+            for nodeId in nodes:
+                container.Add (self.topo.Node (nodeId))
+            apps = helper.Install (container)
+            for i, (nodeId, (start, stop)) in enumerate (nodes.items ()):
+                app = apps.Get (i)
+                app.SetStartTime (nscache.Time (start))
+                app.SetStopTime (nscache.Time (stop))
+                self.sinks[(nodeId, protocol, port)] = app
+
+    def _InstallSources (self, flows):
+        bySource = {}
+        for flow in flows:
+            bySource.setdefault (flow.source, []).append (flow)
+        # (start, stop) -> ApplicationContainer
+        groups = {}
+        for source, nodeFlows in bySource.items ():
+            node = self.topo.Node (source)
+            for flow in nodeFlows:
+                helper = self._SourceHelper (flow)
+                helper.SetAttribute ("Remote", _Address (self.topo, flow.destination, flow.port, self._addresses))
+                apps = helper.Install (node)
+                group = groups.get ((flow.start, flow.stop))
+                if group is None:
+                    group = groups[(flow.start, flow.stop)] = ns.network.ApplicationContainer ()
+                group.Add (apps)
+                self.sources.append ((flow, apps.Get (0)))
+        for (start, stop), apps in groups.items ():
+            apps.Start (nscache.Time (start))
+            apps.Stop (nscache.Time (stop))
+
+    def Install (self, matrix):
+        flows = Flows (matrix)
+        for flow in flows:
+            flow.source = self.topo.NodeId (flow.source)
+            flow.destination = self.topo.NodeId (flow.destination)
+        self._InstallSinks (flows)
+        self._InstallSources (flows)
+        return self
+
+    # Bytes received per (destination, protocol, port) sink.
+    def Received (self):
+        return dict ((key, app.GetTotalRx ()) for key, app in self.sinks.items ())
+
+
+def Install (topo, matrix):
+    return TrafficEngine (topo).Install (matrix)
@@ -6,12 +6,82 @@
 #  #                router
 #  #
 #  # - Tracing of queues and packet receptions to file "fragmentation-ipv6.tr"
+#
+# Stress mode: --Senders=N puts N-1 more hosts (s1, s2, ...) on n0's
+# segment, all pinging n1 at the same time (start times staggered over one
+# interval).  --Sizes=4096,1500,... gives the echo payload sizes, used in
+# turn by the senders; --Sizes=mtu:K picks sizes around the points where a
+# datagram needs 1..K fragments at the path MTU.  --Mtus=1500,1280
+# sets the MTU of each CSMA segment (n0's, n1's), and --FragmentLoss=p
+# drops frames with probability p on the hosts' devices (RateErrorModel),
+# so reassemblies time out.  With --FragStats=<file.json>
+# (common.fragstats) the hosts' fragment reassembly is measured: memory
+# high-water mark, latency distribution, timeouts and events per second.
+#
+# PMTU mode: --Pmtu=ptb|blind|appsized replaces the pings with a
+# constant-rate UDP flow (--PmtuRate) from n0 to n1, and the segment after
+# the router gets a smaller MTU (--Mtus defaults to 1500,1280).  The router
+# drops packets bigger than that with an ICMPv6 Packet Too Big, and n0
+# fragments at the path MTU from then on:
+#   ptb       datagrams filling n0's link MTU, fragmented after the first
+#             Packet Too Big;
+#   blind     large datagrams (--BlindSize) always left to fragmentation;
+#   appsized  datagrams sized by the application to the path MTU.
+# The report (printed, and written to --PmtuStats=<file.json>) gives the
+# goodput, packets, fragments and bytes sent per byte delivered, and the
+# time until n0 stops sending oversized packets.
+# benchmarks/pmtu-compare.py runs the three modes side by side.
+
+import json
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from common import lazyns
+ns = lazyns.Import ("core", "internet", "internet_apps", "csma", "network", "applications")
+
+from common import fragstats
+from common import pingstats
+from common import profiling
+from common import scheduler
+from common import topology
+from common import tracing
+
+# n0, r and n1 with their two CSMA segments, senders - 1 more hosts on
+# n0's segment and one link type (one Mtu) per segment.
+def Topology (senders, mtus):
+        hosts = ["s%d" % k for k in range (1, senders)]
+        return {
+            "nodes": ["n0", "r", "n1"] + hosts,
+            "linkTypes": dict (("lan%d" % k, {"helper": "csma", "device": {"Mtu": str (mtu)},
+                                              "channel": {"DataRate": "5Mbps", "Delay": "2ms"}})
+                               for k, mtu in enumerate (mtus)),
+            "links": [
+                {"type": "lan0", "nodes": ["n0", "r"] + hosts, "network": "2001:1::/64",
+                 "forwarding": ["r"], "defaultRoute": "r"},
+                {"type": "lan1", "nodes": ["r", "n1"], "network": "2001:2::/64",
+                 "forwarding": ["r"], "defaultRoute": "r"},
+            ],
+        }
+
+
+# "4096,1500" or "mtu:K" -> payload sizes
+def ParseSizes (text, mtu):
+        if text.startswith ("mtu:"):
+            return fragstats.MtuSizes (mtu, int (text[4:]))
+        return [int (size) for size in text.split (",")]
+
+
+# UDP payload size of a PMTU mode (40 bytes of IPv6 and 8 of UDP header)
+def PmtuPayload (mode, mtus, blindSize):
+        if mode == "ptb":
+            return mtus[0] - 48
+        if mode == "blind":
+            return blindSize
+        if mode == "appsized":
+            return min (mtus) - 48
+        raise ValueError ("Pmtu must be ptb, blind or appsized, not %r" % mode)
 
-import ns.core
-import ns.internet
-import ns.internet_apps
-import ns.csma
-import ns.network
 
 def main(argv):
         print ("FragmentationIpv6Example")
@@ -19,8 +89,42 @@ def main(argv):
         cmd = ns.core.CommandLine ()
         cmd.AddValue ("verbose", "turn on log components")
         cmd.verbose = False
+        cmd.Senders = 1
+        cmd.Sizes = ""
+        cmd.Mtus = ""
+        cmd.FragmentLoss = 0.0
+        cmd.FragStats = ""
+        cmd.Pmtu = ""
+        cmd.PmtuRate = "2Mbps"
+        cmd.BlindSize = 8192
+        cmd.PmtuStats = ""
+        cmd.AddValue ("Senders", "Number of hosts on n0's segment pinging n1")
+        cmd.AddValue ("Sizes", "Comma-separated echo payload sizes, or mtu:K for sizes around 1..K fragments (default 4096; not with --Pmtu)")
+        cmd.AddValue ("Mtus", "MTU of the n0-r and r-n1 CSMA segments (default 1500,1500; 1500,1280 with --Pmtu)")
+        cmd.AddValue ("FragmentLoss", "Frame loss rate on the hosts' devices")
+        cmd.AddValue ("FragStats", "Write the fragment reassembly statistics to this JSON file")
+        cmd.AddValue ("Pmtu", "Path MTU mode instead of pings: ptb, blind or appsized")
+        cmd.AddValue ("PmtuRate", "Data rate of the UDP flow of the PMTU modes")
+        cmd.AddValue ("BlindSize", "UDP payload size of the blind PMTU mode")
+        cmd.AddValue ("PmtuStats", "Write the PMTU mode report to this JSON file")
+        tracing.AddCommandLineOptions (cmd)
+        profiling.AddCommandLineOptions (cmd)
+        scheduler.AddCommandLineOptions (cmd)
+        pingstats.AddCommandLineOptions (cmd, 5, 1.0)
         cmd.Parse (argv)
         verbose = bool(cmd.verbose)
+        senders = int(cmd.Senders)
+        pmtuMode = str(cmd.Pmtu)
+        mtus = [int (mtu) for mtu in (str(cmd.Mtus) or ("1500,1280" if pmtuMode else "1500,1500")).split (",")]
+        if len (mtus) != 2:
+            raise ValueError ("Mtus takes one MTU per segment, e.g. 1500,1280")
+        if pmtuMode and str(cmd.Sizes):
+            raise ValueError ("Sizes sets echo payload sizes; the PMTU modes size their datagrams themselves")
+        sizes = None if pmtuMode else ParseSizes (str(cmd.Sizes) or "4096", min (mtus))
+        fragmentLoss = float(cmd.FragmentLoss)
+        tracePolicy = tracing.TracePolicy.FromCommandLine (cmd)
+        profiler = profiling.Profiler.FromCommandLine (cmd)
+        scheduler.Apply (cmd, argv)
 
         if verbose:
             ns.core.LogComponentEnable ("Ipv6L3Protocol", ns.core.LOG_LEVEL_ALL)
@@ -29,70 +133,103 @@ def main(argv):
             ns.core.LogComponentEnable ("Ipv6Interface", ns.core.LOG_LEVEL_ALL)
             ns.core.LogComponentEnable ("Ping6Application", ns.core.LOG_LEVEL_ALL)
             
-        print("Create nodes.")
-        n0 = ns.network.Node()
-        r = ns.network.Node()
-        n1 = ns.network.Node()
-
-        net1 = ns.network.NodeContainer()
-        net1.Add(n0)
-        net1.Add(r)
-        net2 = ns.network.NodeContainer()
-        net2.Add(r)
-        net2.Add(n1)
-        all = ns.network.NodeContainer()
-        all.Add(n0)
-        all.Add(r)
-        all.Add(n1)
-
-        print ("Create IPv6 Internet Stack")
-        internetv6 = ns.internet.InternetStackHelper()
-        internetv6.Install (all)
-
-        print ("Create channels.")
-        csma = ns.csma.CsmaHelper() 
-        csma.SetChannelAttribute ("DataRate", ns.network.DataRateValue (ns.network.DataRate(5000000)))
-        csma.SetChannelAttribute ("Delay", ns.core.TimeValue (ns.core.MilliSeconds (2)))
-        d1 = csma.Install (net1)
-        d2 = csma.Install (net2)
-
-        print ("Create networks and assign IPv6 Addresses.")
-        ipv6 = ns.internet.Ipv6AddressHelper()
-        ipv6.SetBase (ns.network.Ipv6Address ("2001:1::"), ns.network.Ipv6Prefix (64))
-        i1 = ipv6.Assign (d1)
-        i1.SetForwarding (1, True)
-        i1.SetDefaultRouteInAllNodes (1)
-        ipv6.SetBase  (ns.network.Ipv6Address ("2001:2::"), ns.network.Ipv6Prefix (64))
-        i2 = ipv6.Assign (d2)
-        i2.SetForwarding (0, True)
-        i2.SetDefaultRouteInAllNodes (0)
+        print ("Create nodes, channels and IPv6 addresses.")
+        topo = topology.Build (Topology (senders, mtus))
+        n0 = topo.Node ("n0")
+        csma = topo.helpers["lan0"]
+        i1 = topo.Link (0).interfaces
+        i2 = topo.Link (1).interfaces
 
         routingHelper = ns.internet.Ipv6StaticRoutingHelper()
-        routingStream = ns.network.OutputStreamWrapper("fragmentation-ipv6.routes", ns.network.STD_IOS_OUT)
+        routingStream = tracePolicy.OpenStream ("fragmentation-ipv6.routes")
         routingHelper.PrintRoutingTableAt (ns.core.Seconds (0), n0, routingStream)
 
-        #  Create a Ping6 application to send ICMPv6 echo request from n0 to n1 via r 
-        packetSize = 4096
-        maxPacketCount = 5
-        interPacketInterval = ns.core.Seconds (1.0)
-        ping6 = ns.internet_apps.Ping6Helper()
-
-        ping6.SetLocal (i1.GetAddress (0, 1))
-        ping6.SetRemote (i2.GetAddress (1, 1))
-
-        ping6.SetAttribute ("MaxPackets", ns.core.UintegerValue (maxPacketCount))
-        ping6.SetAttribute ("Interval", ns.core.TimeValue (interPacketInterval))
-        ping6.SetAttribute ("PacketSize", ns.core.UintegerValue (packetSize))
-        apps = ping6.Install (ns.network.NodeContainer(net1.Get (0)))
-        apps.Start (ns.core.Seconds (2.0))
-        apps.Stop (ns.core.Seconds (20.0))
-
-        ascii = ns.network.AsciiTraceHelper()
-        csma.EnableAsciiAll (ascii.CreateFileStream ("fragmentation-ipv6.tr"))
-        csma.EnablePcapAll ("fragmentation-ipv6", True)
+        # Frame loss on the hosts (n1 and the senders), where fragments of
+        # requests and replies are reassembled
+        hosts = ns.network.NodeContainer ()
+        for nodeId, name in enumerate (topo.names):
+            if name != "r":
+                hosts.Add (topo.Node (nodeId))
+        if fragmentLoss > 0:
+            for link in topo.links:
+                for position, nodeId in enumerate (link.nodes):
+                    if topo.names[nodeId] == "r":
+                        continue
+                    errorModel = ns.network.RateErrorModel ()
+                    errorModel.SetAttribute ("ErrorUnit", ns.core.StringValue ("ERROR_UNIT_PACKET"))
+                    errorModel.SetAttribute ("ErrorRate", ns.core.DoubleValue (fragmentLoss))
+                    link.devices.Get (position).SetAttribute ("ReceiveErrorModel",
+                                                              ns.core.PointerValue (errorModel))
+
+        pmtuStats = None
+        if pmtuMode:
+            #  A constant-rate UDP flow from n0 to n1 via r
+            payloadSize = PmtuPayload (pmtuMode, mtus, int(cmd.BlindSize))
+            port = 9
+            onoff = ns.applications.OnOffHelper ("ns3::UdpSocketFactory",
+                                                 ns.network.Inet6SocketAddress (i2.GetAddress (1, 1), port))
+            onoff.SetConstantRate (ns.network.DataRate (str(cmd.PmtuRate)), payloadSize)
+            pmtuStart, pmtuStop = 2.0, 20.0
+            apps = onoff.Install (n0)
+            apps.Start (ns.core.Seconds (pmtuStart))
+            apps.Stop (ns.core.Seconds (pmtuStop))
+            sink = ns.applications.PacketSinkHelper (
+                "ns3::UdpSocketFactory", ns.network.Inet6SocketAddress (ns.network.Ipv6Address.GetAny (), port))
+            sinkApps = sink.Install (topo.Node ("n1"))
+            pmtuStats = fragstats.PmtuStats (n0, min (mtus))
+        else:
+            #  Create a Ping6 application to send ICMPv6 echo request from n0 to n1 via r 
+            #  (and from every other sender, with the next payload size)
+            maxPacketCount = int(cmd.MaxPackets)
+            interval = float(cmd.Interval)
+            interPacketInterval = ns.core.Seconds (interval)
+            ping6 = ns.internet_apps.Ping6Helper()
+
+            ping6.SetRemote (i2.GetAddress (1, 1))
+
+            ping6.SetAttribute ("MaxPackets", ns.core.UintegerValue (maxPacketCount))
+            ping6.SetAttribute ("Interval", ns.core.TimeValue (interPacketInterval))
+            pingStats = []
+            for k in range (senders):
+                # Senders follow n0 and r on the first segment
+                position = 0 if k == 0 else k + 1
+                sender = topo.Node (topo.Link (0).nodes[position])
+                ping6.SetLocal (i1.GetAddress (position, 1))
+                ping6.SetAttribute ("PacketSize", ns.core.UintegerValue (sizes[k % len (sizes)]))
+                apps = ping6.Install (ns.network.NodeContainer(sender))
+                start = 2.0 + k * interval / senders
+                apps.Start (ns.core.Seconds (start))
+                apps.Stop (ns.core.Seconds (pingstats.StopTime (start, 20.0, maxPacketCount, interval)))
+                if str(cmd.PingStats):
+                    pingStats.append (pingstats.PingStats (sender, maxPacketCount))
+            if len (pingStats) == 1:
+                pingStats[0].ReportAtDestroy (str(cmd.PingStats))
+            elif pingStats:
+                pingstats.ReportAllAtDestroy (pingStats, str(cmd.PingStats))
+
+        fragStats = None
+        if str(cmd.FragStats):
+            fragStats = fragstats.FragStats (hosts)
+
+        tracePolicy.EnableAscii (csma, "fragmentation-ipv6.tr")
+        tracePolicy.EnablePcap (csma, "fragmentation-ipv6", True)
 
         print ("Run Simulation.")
-        ns.core.Simulator.Run ()
+        if fragStats is not None:
+            fragStats.Start ()
+        profiler.Run ()
+        if fragStats is not None:
+            fragStats.Stop ()
+            fragStats.Report (str(cmd.FragStats))
+        if pmtuStats is not None:
+            report = pmtuStats.Summary (sinkApps.Get (0).GetTotalRx (), pmtuStop - pmtuStart)
+            report.update ({"mode": pmtuMode, "payloadSize": payloadSize, "mtus": mtus})
+            print ("%s: goodput %.0f b/s, %d packets, %d fragments, %d oversized, converged after %.3f s" %
+                   (pmtuMode, report["goodput"], report["packets"], report["fragments"], report["oversized"],
+                    report["convergeTime"]))
+            if str(cmd.PmtuStats):
+                with open (str(cmd.PmtuStats), "w") as f:
+                    json.dump (report, f, indent=2)
         ns.core.Simulator.Destroy ()
         print ("Done.")
 
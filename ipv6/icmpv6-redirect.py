@@ -20,19 +20,46 @@
 # - R1 send an ICMPv6 Redirection to STA1 with Target STA2 and Destination R2
 # - Next Echo Request from STA1 to STA2 are directly sent to R2
 
-import ns.network
-import ns.core
-import ns.internet
-import ns.internet_apps
-import ns.csma
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from common import lazyns
+ns = lazyns.Import ("network", "core", "internet", "internet_apps", "csma")
+
+from common import pingstats
+from common import profiling
+from common import scheduler
+from common import topology
+from common import tracing
+
+TOPOLOGY = {
+		"nodes": ["sta1", "r1", "r2", "sta2"],
+		"linkTypes": {
+			"lan": {"helper": "csma", "channel": {"DataRate": "5Mbps", "Delay": "2ms"}},
+		},
+		"links": [
+			{"type": "lan", "nodes": ["sta1", "r1", "r2"], "network": "2001:1::/64",
+			 "forwarding": ["r2", "r1"], "defaultRoute": "r1"},
+			{"type": "lan", "nodes": ["r2", "sta2"], "network": "2001:2::/64",
+			 "forwarding": ["r2"], "defaultRoute": "r2"},
+		],
+}
 
 
 def main(argv):
 		cmd = ns.core.CommandLine()
 		cmd.AddValue ("verbose", "turn on log components")
 		cmd.verbose = False
+		tracing.AddCommandLineOptions (cmd)
+		profiling.AddCommandLineOptions (cmd)
+		scheduler.AddCommandLineOptions (cmd)
+		pingstats.AddCommandLineOptions (cmd, 5, 1.0)
 		cmd.Parse(argv)
 		verbose = bool(cmd.verbose)
+		tracePolicy = tracing.TracePolicy.FromCommandLine (cmd)
+		profiler = profiling.Profiler.FromCommandLine (cmd)
+		scheduler.Apply (cmd, argv)
 
 		if verbose :
 			ns.core.LogComponentEnable("Icmpv6RedirectExample", ns.core.LOG_LEVEL_INFO)
@@ -43,47 +70,13 @@ def main(argv):
 			ns.core.LogComponentEnable("Icmpv6L4Protocol", ns.core.LOG_LEVEL_ALL)
 			ns.core.LogComponentEnable("NdiscCache", ns.core.LOG_LEVEL_ALL)
 
-		print ("Creat nodes.")
-		sta1 = ns.network.Node()
-		r1 = ns.network.Node()
-		r2 = ns.network.Node()
-		sta2 = ns.network.Node()
-
-		net1 = ns.network.NodeContainer()
-		net1.Add(sta1)
-		net1.Add(r1)
-		net1.Add(r2)
-		net2 = ns.network.NodeContainer()
-		net2.Add(r2)
-		net2.Add(sta2)
-		all = ns.network.NodeContainer()  
-		all.Add(sta1)
-		all.Add(r1)
-		all.Add(r2)
-		all.Add(sta2)
-
-		internetv6 = ns.internet.InternetStackHelper()
-		internetv6.Install(all)
-
-		print ("Create channels.")
-		csma = ns.csma.CsmaHelper()
-		csma.SetChannelAttribute("DataRate", ns.network.DataRateValue(ns.network.DataRate(5000000)))
-		csma.SetChannelAttribute("Delay", ns.core.TimeValue(ns.core.MilliSeconds(2)))
-		ndc1 = csma.Install(net1)
-		ndc2 = csma.Install(net2)
-
-		print ("Assign IPv6 Addresses.")
-		ipv6 = ns.internet.Ipv6AddressHelper()
-		ipv6.SetBase (ns.network.Ipv6Address ("2001:1::"), ns.network.Ipv6Prefix (64))
-		iic1 = ipv6.Assign (ndc1)
-		iic1.SetForwarding (2, True)
-		iic1.SetForwarding (1, True)
-		iic1.SetDefaultRouteInAllNodes (1)
-
-		ipv6.SetBase (ns.network.Ipv6Address ("2001:2::"), ns.network.Ipv6Prefix (64))
-		iic2 = ipv6.Assign (ndc2)
-		iic2.SetForwarding (0, True)
-		iic2.SetDefaultRouteInAllNodes (0)
+		print ("Create nodes, channels and IPv6 addresses.")
+		topo = topology.Build (TOPOLOGY)
+		sta1 = topo.Node ("sta1")
+		r1 = topo.Node ("r1")
+		csma = topo.helpers["lan"]
+		iic1 = topo.Link (0).interfaces
+		iic2 = topo.Link (1).interfaces
 
 		routingHelper = ns.internet.Ipv6StaticRoutingHelper()
 
@@ -91,14 +84,14 @@ def main(argv):
 		routing = routingHelper.GetStaticRouting (r1.GetObject(ns.internet.Ipv6.GetTypeId()))
 		routing.AddHostRouteTo (iic2.GetAddress (1, 1), iic1.GetAddress (2, 0), iic1.GetInterfaceIndex (1))
 
-		routingStream = ns.network.OutputStreamWrapper ("icmpv6-redirect.routes", ns.network.STD_IOS_OUT)
+		routingStream = tracePolicy.OpenStream ("icmpv6-redirect.routes")
 		routingHelper.PrintRoutingTableAt (ns.core.Seconds (0.0), r1, routingStream)
 		routingHelper.PrintRoutingTableAt (ns.core.Seconds (3.0), sta1, routingStream)
 
 		print ("Create Applications.")
 		packetSize = 1024
-		maxPacketCount = 5
-		interPacketInterval = ns.core.Seconds (1.)
+		maxPacketCount = int(cmd.MaxPackets)
+		interPacketInterval = ns.core.Seconds (float(cmd.Interval))
 		ping6 = ns.internet_apps.Ping6Helper()
 
 		ping6.SetLocal (iic1.GetAddress (0, 1))
@@ -108,15 +101,17 @@ def main(argv):
 		ping6.SetAttribute ("PacketSize", ns.core.UintegerValue (packetSize))
 		apps = ping6.Install(ns.network.NodeContainer(sta1))
 		apps.Start (ns.core.Seconds (2.0))
-		apps.Stop (ns.core.Seconds (10.0))
+		apps.Stop (ns.core.Seconds (pingstats.StopTime (2.0, 10.0, maxPacketCount, float(cmd.Interval))))
+		if str(cmd.PingStats):
+			pingStats = pingstats.PingStats (sta1, maxPacketCount)
+			pingStats.ReportAtDestroy (str(cmd.PingStats))
 
-		ascii = ns.network.AsciiTraceHelper()
-		csma.EnableAsciiAll (ascii.CreateFileStream ("icmpv6-redirect.tr"))
-		csma.EnablePcapAll ("icmpv6-redirect", True)
+		tracePolicy.EnableAscii (csma, "icmpv6-redirect.tr")
+		tracePolicy.EnablePcap (csma, "icmpv6-redirect", True)
 
 		# Now, do the actual simulation.
 		print ("Run Simulation.")
-		ns.core.Simulator.Run ()
+		profiler.Run ()
 		ns.core.Simulator.Destroy ()
 		print ("Done.")
 
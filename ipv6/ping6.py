@@ -9,11 +9,17 @@
 # - DropTail queues 
 # - Tracing of queues and packet receptions to file "ping6.tr"
 
-import ns.core
-import ns.internet
-import ns.internet_apps
-import ns.network
-import ns.csma
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from common import lazyns
+ns = lazyns.Import ("core", "internet", "internet_apps", "network", "csma")
+
+from common import pingstats
+from common import profiling
+from common import scheduler
+from common import tracing
 
 
 def main(argv):
@@ -23,8 +29,15 @@ def main(argv):
         cmd = ns.core.CommandLine()
         cmd.AddValue ("verbose", "turn on log components")
         cmd.verbose = False
+        tracing.AddCommandLineOptions (cmd)
+        profiling.AddCommandLineOptions (cmd)
+        scheduler.AddCommandLineOptions (cmd)
+        pingstats.AddCommandLineOptions (cmd, 5, 1.0)
         cmd.Parse (argv)
         verbose = bool(cmd.verbose)
+        tracePolicy = tracing.TracePolicy.FromCommandLine (cmd)
+        profiler = profiling.Profiler.FromCommandLine (cmd)
+        scheduler.Apply (cmd, argv)
 
         if  verbose :
             ns.core.LogComponentEnable ("Ping6Example", ns.core.LOG_LEVEL_INFO)
@@ -62,8 +75,8 @@ def main(argv):
         # all-nodes (ff02::1).
         #
         packetSize = 1024
-        maxPacketCount = 5
-        interPacketInterval = ns.core.Seconds(1.)
+        maxPacketCount = int(cmd.MaxPackets)
+        interPacketInterval = ns.core.Seconds (float(cmd.Interval))
         ping6 = ns.internet_apps.Ping6Helper()
 
         # ping6.SetLocal (i.GetAddress (0, 1))
@@ -76,14 +89,16 @@ def main(argv):
         ping6.SetAttribute("PacketSize", ns.core.UintegerValue(packetSize))
         apps = ping6.Install(ns.network.NodeContainer(n.Get(0)))
         apps.Start(ns.core.Seconds(2.0))
-        apps.Stop(ns.core.Seconds(10.0))
+        apps.Stop (ns.core.Seconds (pingstats.StopTime (2.0, 10.0, maxPacketCount, float(cmd.Interval))))
+        if str(cmd.PingStats):
+            pingStats = pingstats.PingStats (n.Get(0), maxPacketCount)
+            pingStats.ReportAtDestroy (str(cmd.PingStats))
 
-        ascii = ns.network.AsciiTraceHelper()
-        csma.EnableAsciiAll(ascii.CreateFileStream("ping6.tr"))
-        csma.EnablePcapAll("ping6", True)
+        tracePolicy.EnableAscii (csma, "ping6.tr")
+        tracePolicy.EnablePcap (csma, "ping6", True)
             
         print ("Run simulation")
-        ns.core.Simulator.Run()
+        profiler.Run ()
         ns.core.Simulator.Destroy()
         print("Done")
 
@@ -9,10 +9,67 @@
 #  # - n0 ping6 n1.
 #  #
 #  # - Tracing of queues and packet receptions to file "radvd.tr"
-
-import ns.core
-import ns.internet
-import ns.csma
+#
+# Scaled mode: --Hosts=N puts N hosts on each subnet (n0, a1, a2, ... and
+# n1, b1, b2, ...) and --Prefixes=K announces K /64 prefixes per router
+# interface (2001:1::/64, 2001:1:1::/64, ... and 2001:2::/64, ...).  The
+# addresses the hosts autoconfigure are computed with common.slaac (NumPy)
+# from their MACs and the prefixes, so the ping targets (every host of the first
+# subnet pings the host at the same position on the second, at its first
+# prefix) are no longer written by hand.  --NdStats=<file.json>
+# (common.ndstats) reports the time until every host holds all its
+# addresses, the RS/RA/NS/NA messages sent and the neighbor cache sizes at
+# the end of the run.
+
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from common import lazyns
+ns = lazyns.Import ("core", "network", "internet", "internet_apps", "csma")
+
+from common import ndstats
+from common import pingstats
+from common import profiling
+from common import scheduler
+from common import topology
+from common import tracing
+
+# Hosts get their addresses from the router advertisements, so the links
+# are addressed by hand below.  hosts - 1 more hosts follow n0 and r on
+# the first link, and r and n1 on the second.
+def Topology (hosts):
+        first = ["a%d" % k for k in range (1, hosts)]
+        second = ["b%d" % k for k in range (1, hosts)]
+        return {
+                "nodes": ["n0", "r", "n1"] + first + second,
+                "linkTypes": {
+                        "lan": {"helper": "csma", "channel": {"DataRate": "5Mbps", "Delay": "2ms"}},
+                },
+                "links": [
+                        {"type": "lan", "nodes": ["n0", "r"] + first, "network": None},
+                        {"type": "lan", "nodes": ["r", "n1"] + second, "network": None},
+                ],
+        }
+
+
+# The k-th /64 announced on subnet (1 or 2)
+def Prefix (subnet, k):
+        return "2001:%d:%x::" % (subnet, k)
+
+
+# Addresses (strings) every host of devices autoconfigures from the
+# prefixes of subnet, one list per host.  The default single host and
+# prefix uses ns-3's own EUI-64 function, so the example runs without NumPy.
+def HostAddresses (devices, subnet, prefixCount):
+        macs = [ns.network.Mac48Address.ConvertFrom (devices.Get (k).GetAddress ()) for k in range (devices.GetN ())]
+        prefixes = [Prefix (subnet, k) for k in range (prefixCount)]
+        if len (macs) * len (prefixes) == 1:
+            address = ns.network.Ipv6Address.MakeAutoconfiguredAddress (macs[0], ns.network.Ipv6Address (prefixes[0]))
+            return [[str (address)]]
+        from common import slaac
+        addresses = slaac.MakeAutoconfiguredAddresses ([str (mac) for mac in macs], prefixes)
+        return [slaac.ToStrings (addresses[:, k]) for k in range (len (macs))]
 
 
 def main(argv):
@@ -21,8 +78,23 @@ def main(argv):
         cmd = ns.core.CommandLine ()
         cmd.AddValue ("verbose", "turn on log components")
         cmd.verbose = False
+        cmd.Hosts = 1
+        cmd.Prefixes = 1
+        cmd.NdStats = ""
+        cmd.AddValue ("Hosts", "Number of hosts on each subnet")
+        cmd.AddValue ("Prefixes", "Number of prefixes announced on each router interface")
+        cmd.AddValue ("NdStats", "Write autoconfiguration, RS/RA/NS/NA and neighbor cache statistics to this JSON file")
+        tracing.AddCommandLineOptions (cmd)
+        profiling.AddCommandLineOptions (cmd)
+        scheduler.AddCommandLineOptions (cmd)
+        pingstats.AddCommandLineOptions (cmd, 5, 1.0)
         cmd.Parse (argv)
         verbose = bool(cmd.verbose)
+        hostCount = int(cmd.Hosts)
+        prefixCount = int(cmd.Prefixes)
+        tracePolicy = tracing.TracePolicy.FromCommandLine (cmd)
+        profiler = profiling.Profiler.FromCommandLine (cmd)
+        scheduler.Apply (cmd, argv)
 
         if verbose:
           ns.core.LogComponentEnable ("Ipv6L3Protocol", ns.core.LOG_LEVEL_ALL)
@@ -33,32 +105,12 @@ def main(argv):
           ns.core.LogComponentEnable ("RadvdApplication", ns.core.LOG_LEVEL_ALL)
           ns.core.LogComponentEnable ("Ping6Application", ns.core.LOG_LEVEL_ALL)
             
-        print ("Create nodes.")
-        n0 = ns.network.Node()
-        r  = ns.network.Node()
-        n1 = ns.network.Node()
-
-        net1 = ns.network.NodeContainer()
-        net1.Add(n0)
-        net1.Add(r)
-        net2 = ns.network.NodeContainer()
-        net2.Add(r)
-        net2.Add(n1)
-        all = ns.network.NodeContainer()
-        all.Add(n0)
-        all.Add(r)
-        all.Add(n1) 
-
-        print ("Create IPv6 Internet Stack")
-        internetv6 = ns.internet.InternetStackHelper()
-        internetv6.Install(all)
-
-        print ("Create channels.")
-        csma = ns.csma.CsmaHelper()
-        csma.SetChannelAttribute ("DataRate", ns.network.DataRateValue(ns.network.DataRate(5000000)))
-        csma.SetChannelAttribute ("Delay", ns.core.TimeValue(ns.core.MilliSeconds(2)))
-        d1 = csma.Install (net1) # n0 - R 
-        d2 = csma.Install (net2) # R - n1 
+        print ("Create nodes and channels.")
+        topo = topology.Build (Topology (hostCount))
+        r = topo.Node ("r")
+        csma = topo.helpers["lan"]
+        d1 = topo.Link (0).devices # n0 (and a1, a2, ...) - R
+        d2 = topo.Link (1).devices # R - n1 (and b1, b2, ...)
 
         print ("Create networks and assign IPv6 Addresses.")
         ipv6 = ns.internet.Ipv6AddressHelper()
@@ -67,13 +119,14 @@ def main(argv):
         ipv6.SetBase (ns.network.Ipv6Address("2001:1::"), ns.network.Ipv6Prefix (64))
         tmp = ns.network.NetDeviceContainer()
         tmp.Add (d1.Get (0)) # n0
-        iic1 = ipv6.AssignWithoutAddress (tmp) # n0 interface
+        for k in range (2, d1.GetN ()):
+          tmp.Add (d1.Get (k))
+        iic1 = ipv6.AssignWithoutAddress (tmp) # host interfaces
 
         tmp2 = ns.network.NetDeviceContainer()
         tmp2.Add (d1.Get (1)) # R 
         iicr1 = ipv6.Assign (tmp2) # R interface to the first subnet is just statically assigned 
         iicr1.SetForwarding (0, True)
-        iic1.Add (iicr1)
 
         # second subnet R - n1
         ipv6.SetBase (ns.network.Ipv6Address ("2001:2::"), ns.network.Ipv6Prefix (64))
@@ -83,49 +136,82 @@ def main(argv):
         iicr2.SetForwarding (0, True)
 
         tmp4 = ns.network.NetDeviceContainer()
-        tmp4.Add (d2.Get (1)) # n1
-        iic2 = ipv6.AssignWithoutAddress (tmp4)
-        iic2.Add (iicr2)
+        for k in range (1, d2.GetN ()):
+          tmp4.Add (d2.Get (k)) # n1, ...
+        ipv6.AssignWithoutAddress (tmp4)
 
         # radvd configuration
         radvdHelper = ns.internet_apps.RadvdHelper ()
 
         # R interface (n0 - R) 
         # n0 will receive unsolicited (periodic) RA 
-        radvdHelper.AddAnnouncedPrefix (iic1.GetInterfaceIndex (1), ns.network.Ipv6Address("2001:1::0"), 64)
+        for k in range (prefixCount):
+          radvdHelper.AddAnnouncedPrefix (iicr1.GetInterfaceIndex (0), ns.network.Ipv6Address (Prefix (1, k)), 64)
 
         # R interface (R - n1) 
         # n1 will have to use RS, as RA are not sent automatically
-        radvdHelper.AddAnnouncedPrefix(iic2.GetInterfaceIndex (1), ns.network.Ipv6Address("2001:2::0"), 64)
-        radvdHelper.GetRadvdInterface (iic2.GetInterfaceIndex (1)).SetSendAdvert (False)
+        for k in range (prefixCount):
+          radvdHelper.AddAnnouncedPrefix (iicr2.GetInterfaceIndex (0), ns.network.Ipv6Address (Prefix (2, k)), 64)
+        radvdHelper.GetRadvdInterface (iicr2.GetInterfaceIndex (0)).SetSendAdvert (False)
 
+        radvdStart = 1.0
         radvdApps = radvdHelper.Install (r)
-        radvdApps.Start (ns.core.Seconds (1.0))
+        radvdApps.Start (ns.core.Seconds (radvdStart))
         radvdApps.Stop (ns.core.Seconds (10.0))
 
+        # The addresses every host autoconfigures, hosts in the order of tmp
+        # and tmp4
+        addresses1 = HostAddresses (tmp, 1, prefixCount)
+        addresses2 = HostAddresses (tmp4, 2, prefixCount)
+
         # Create a Ping6 application to send ICMPv6 echo request from n0 to n1 via R 
+        # (and from every host of the first subnet to its peer on the second)
         packetSize = 1024
-        maxPacketCount = 5
-        interPacketInterval = ns.core.Seconds (1.)
+        maxPacketCount = int(cmd.MaxPackets)
+        interval = float(cmd.Interval)
+        interPacketInterval = ns.core.Seconds (interval)
         ping6 = ns.internet_apps.Ping6Helper() 
 
-        # ping6.SetLocal (iic1.GetAddress (0, 1));
-        ping6.SetRemote (ns.network.Ipv6Address ("2001:2::200:ff:fe00:4")) # should be n1 address after autoconfiguration
-        ping6.SetIfIndex (iic1.GetInterfaceIndex (0))
-
         ping6.SetAttribute ("MaxPackets", ns.core.UintegerValue (maxPacketCount))
         ping6.SetAttribute ("Interval", ns.core.TimeValue (interPacketInterval))
         ping6.SetAttribute ("PacketSize", ns.core.UintegerValue (packetSize))
-        apps = ping6.Install(ns.network.NodeContainer(net1.Get(0)))
-        apps.Start (ns.core.Seconds (2.0))
-        apps.Stop (ns.core.Seconds (7.0))
-
-        ascii = ns.network.AsciiTraceHelper ()
-        csma.EnableAsciiAll (ascii.CreateFileStream ("radvd.tr"))
-        csma.EnablePcapAll ("radvd", True)
+        # n1 address (and its peers') after autoconfiguration
+        pingStats = []
+        for k in range (hostCount):
+            host = tmp.Get (k).GetNode ()
+            # ping6.SetLocal (iic1.GetAddress (k, 1));
+            ping6.SetRemote (ns.network.Ipv6Address (addresses2[k][0]))
+            ping6.SetIfIndex (iic1.GetInterfaceIndex (k))
+            apps = ping6.Install(ns.network.NodeContainer(host))
+            start = 2.0 + k * interval / hostCount
+            apps.Start (ns.core.Seconds (start))
+            apps.Stop (ns.core.Seconds (pingstats.StopTime (start, 7.0, maxPacketCount, interval)))
+            if str(cmd.PingStats):
+                pingStats.append (pingstats.PingStats (host, maxPacketCount))
+        if len (pingStats) == 1:
+            pingStats[0].ReportAtDestroy (str(cmd.PingStats))
+        elif pingStats:
+            pingstats.ReportAllAtDestroy (pingStats, str(cmd.PingStats))
+
+        ndStats = None
+        if str(cmd.NdStats):
+            hosts = ns.network.NodeContainer ()
+            expected = []
+            for devices, addresses in ((tmp, addresses1), (tmp4, addresses2)):
+                for k in range (devices.GetN ()):
+                    hosts.Add (devices.Get (k).GetNode ())
+                    expected.append (addresses[k])
+            ndStats = ndstats.NdStats (r, hosts, expected, radvdStart)
+            ndStats.Start ()
+            ndStats.PrintNeighborCachesAt (10.0, "radvd.ndisc")
+
+        tracePolicy.EnableAscii (csma, "radvd.tr")
+        tracePolicy.EnablePcap (csma, "radvd", True)
 
         print ("Run Simulation.")
-        ns.core.Simulator.Run ()
+        profiler.Run ()
+        if ndStats is not None:
+            ndStats.Report (str(cmd.NdStats))
         ns.core.Simulator.Destroy ()
         print ("Done.")
 
@@ -1,38 +1,49 @@
 
-import ns.network
-import ns.core
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from common import lazyns
+ns = lazyns.Import ("network", "core")
+
+from common import slaac
+
+# The addresses are computed in one batch by common.slaac and checked
+# against Ipv6Address.MakeAutoconfiguredAddress.
+def Check (addresses, macs, prefix):
+         result = slaac.ToNs3 (addresses)
+         for mac, address in zip (macs, result):
+            expected = ns.network.Ipv6Address.MakeAutoconfiguredAddress (mac, prefix)
+            if not address == expected:
+               raise AssertionError ("{0}: {1} != {2}".format (mac, address, expected))
+         return result
 
 def main(argv):
    
          print ("Test Ipv6")
 
-         m_addresses = [None]*10 
+         macs = ["00:00:00:00:00:01", "00:00:00:00:00:02", "00:00:00:00:00:03", "00:00:00:00:00:04",
+                 "00:00:00:00:00:05", "00:00:00:00:00:06", "00:00:00:00:00:07", "00:00:00:00:00:08",
+                 "00:00:00:00:00:09", "00:00:00:00:00:10"]
+         m_addresses = [ns.network.Mac48Address(mac) for mac in macs]
 
-         m_addresses[0] = ns.network.Mac48Address("00:00:00:00:00:01")
-         m_addresses[1] = ns.network.Mac48Address("00:00:00:00:00:02")
-         m_addresses[2] = ns.network.Mac48Address("00:00:00:00:00:03")
-         m_addresses[3] = ns.network.Mac48Address("00:00:00:00:00:04")
-         m_addresses[4] = ns.network.Mac48Address("00:00:00:00:00:05")
-         m_addresses[5] = ns.network.Mac48Address("00:00:00:00:00:06")
-         m_addresses[6] = ns.network.Mac48Address("00:00:00:00:00:07")
-         m_addresses[7] = ns.network.Mac48Address("00:00:00:00:00:08")
-         m_addresses[8] = ns.network.Mac48Address("00:00:00:00:00:09")
-         m_addresses[9] = ns.network.Mac48Address("00:00:00:00:00:10")
+         prefixes = ["2001:1::", "2002:1:1::"]
+         addresses = slaac.MakeAutoconfiguredAddresses (macs, prefixes)
 
-         prefix1 = ns.network.Ipv6Address("2001:1::")
+         prefix1 = ns.network.Ipv6Address(prefixes[0])
          print ("prefix = {0}".format(prefix1))
+         ipv6addresses = Check (addresses[0], m_addresses, prefix1)
 
          for i in range(10):
             print ("address = {0}".format (m_addresses[i]))
-            ipv6address = ns.network.Ipv6Address.MakeAutoconfiguredAddress (m_addresses[i], prefix1)
-            print ("address = {0}".format (ipv6address))
+            print ("address = {0}".format (ipv6addresses[i]))
 
-         prefix2 = ns.network.Ipv6Address("2002:1:1::")
+         prefix2 = ns.network.Ipv6Address(prefixes[1])
+         ipv6addresses = Check (addresses[1], m_addresses, prefix2)
 
          print ("prefix = {0}".format(prefix2))
          for i in range(10):
-            ipv6address = ns.network.Ipv6Address.MakeAutoconfiguredAddress (m_addresses[i], prefix2)
-            print ("address = {0}".format (ipv6address))
+            print ("address = {0}".format (ipv6addresses[i]))
 
 if __name__ == '__main__':
     import sys
@@ -0,0 +1,51 @@
+#
+# 6LoWPAN efficiency sweep over wsn-ping6.py
+#
+# Every grid point runs wsn-ping6.py in its own worker process with
+# --LowPanStats and tracing off; the run totals (IPv6 and 6LoWPAN header
+# bytes, fragmented datagrams and fragments, reassembly failures, MAC
+# frames and airtime) of all points are collected into one CSV table.
+# Echo payloads above about 80 bytes no longer fit in one 127-byte
+# 802.15.4 frame, so the default grid shows where fragmentation starts and
+# what it costs in airtime:
+#
+#   python ipv6/wsn-ping6-sweep.py --output lowpan.csv
+#   python ipv6/wsn-ping6-sweep.py --grid PacketSize=10,100,500,1000 --grid Nodes=2,100 --grid Pairs=1,10
+#
+# Any option of wsn-ping6.py can be used as a grid axis.
+
+import argparse
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from common import sweep
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "wsn-ping6.py")
+PACKET_SIZES = "PacketSize=10,40,70,80,90,100,200,400,800,1200"
+
+
+def main(argv):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--grid", action="append", default=[], metavar="NAME=V1,V2,...",
+                        help="one axis of the parameter grid (repeatable; default: %s)" % PACKET_SIZES)
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--runs", type=int, default=1, help="replicates per grid point")
+    parser.add_argument("--first-run", type=int, default=1, help="RngRun number of the first run")
+    parser.add_argument("--output", default="-", help="CSV file for the results ('-' for stdout)")
+    options = parser.parse_args(argv[1:])
+
+    points = sweep.ExpandGrid([sweep.ParseAxis(axis) for axis in options.grid or [PACKET_SIZES]])
+    results = sweep.RunSweep(SCRIPT, points, jobs=options.jobs, runs=options.runs,
+                             firstRun=options.first_run,
+                             extraArgs=["--LowPanStats=wsn-ping6.lowpan.ndjson", "--TraceMode=off"])
+
+    if options.output == "-":
+        sweep.WriteTable(results, sys.stdout)
+    else:
+        with open(options.output, "w", newline="") as f:
+            sweep.WriteTable(results, f)
+
+
+if __name__ == '__main__':
+    main(sys.argv)
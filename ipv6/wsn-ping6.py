@@ -11,15 +11,48 @@
 #   - Tracing of queues and packet receptions to file "wsn-ping6.tr"
 #  
 #   This example is based on the "ping6.cc" example.
-
-
-import ns3
-import ns.core
-import ns.network
-import ns.internet
-import ns.internet_apps
-import ns.mobility
-import ns.lr_wpan
+#
+#   Scaled mode: --Nodes=N places N nodes on a grid or at random
+#   (--Layout=grid|random, --Spacing=<m> between grid neighbours, --Seed)
+#   and --Pairs=K nodes spread over the node ids ping their nearest
+#   neighbour in radio range.  The 802.15.4 channel delivers every frame to
+#   every other device, so its per-frame work grows with N; with
+#   --SpatialIndex=1 (default) the channel's MaxLossDb is set to the loss at
+#   --Range metres (the interference range, LogDistance model), so
+#   receivers further away get no reception events.  The default two-node
+#   run leaves the channel alone.  common.spatial's grid
+#   index picks the pairs and reports how many receivers a frame reaches.
+#   benchmarks/wsn-scaling.py compares both settings over node counts.
+#
+#   --LowPanStats=<file.ndjson> counts, per node and every --LowPanInterval
+#   seconds, the IPv6 packets and 6LoWPAN frames sent (compressed header
+#   bytes against uncompressed, fragmented datagrams and fragments), the
+#   frames received and dropped (reassembly failures) and the 802.15.4 MAC
+#   frames and airtime, from the SixLowPanNetDevice, Ipv6L3Protocol and
+#   LrWpanMac trace sources (common.lowpanstats); main () then returns the
+#   totals.  --PacketSize sets the echo payload, so sizes that need
+#   fragmentation can be swept with ipv6/wsn-ping6-sweep.py.
+
+
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from common import lazyns
+ns = lazyns.Import ("core", "network", "internet", "internet_apps", "mobility", "lr_wpan", "sixlowpan")
+
+from common import lowpanstats
+from common import pingstats
+from common import profiling
+from common import scheduler
+from common import spatial
+from common import tracing
+from common.cmdline import GetBool
+from common.records import RecordWriter
+
+# LrWpanPhy transmit power and receiver sensitivity (dBm)
+TX_POWER = 0.0
+RX_SENSITIVITY = -106.58
 
 def main(argv):
 		print ("Ping6WsnExample")
@@ -27,8 +60,43 @@ def main(argv):
 		cmd = ns.core.CommandLine()
 		cmd.AddValue ("verbose", "turn on log components")
 		cmd.verbose = False
+		cmd.Nodes = 2
+		cmd.Layout = "line"
+		cmd.Spacing = 50.0
+		cmd.Pairs = 1
+		cmd.Seed = 1
+		cmd.Range = 200.0
+		cmd.SpatialIndex = True
+		cmd.PacketSize = 10
+		cmd.RunNumber = 1
+		cmd.LowPanStats = ""
+		cmd.LowPanInterval = 1.0
+		cmd.AddValue ("Nodes", "Number of sensor nodes")
+		cmd.AddValue ("Layout", "Node placement: line, grid or random")
+		cmd.AddValue ("Spacing", "Distance between neighbouring nodes in metres")
+		cmd.AddValue ("Pairs", "Number of nodes pinging their nearest neighbour")
+		cmd.AddValue ("Seed", "Seed of the random layout")
+		cmd.AddValue ("Range", "Interference range in metres (receivers beyond it are skipped)")
+		cmd.AddValue ("SpatialIndex", "Skip receivers beyond the interference range (with more than 2 nodes)")
+		cmd.AddValue ("PacketSize", "Echo request payload size in bytes")
+		cmd.AddValue ("RunNumber", "RngRun number of this run")
+		cmd.AddValue ("LowPanStats", "Write per-interval 6LoWPAN/802.15.4 counters to this NDJSON file")
+		cmd.AddValue ("LowPanInterval", "Seconds between 6LoWPAN counter records")
+		tracing.AddCommandLineOptions (cmd)
+		profiling.AddCommandLineOptions (cmd)
+		scheduler.AddCommandLineOptions (cmd)
+		pingstats.AddCommandLineOptions (cmd, 5, 1.0)
 		cmd.Parse (argv)
 		verbose = bool(cmd.verbose)
+		nodeCount = int(cmd.Nodes)
+		layout = str(cmd.Layout)
+		spacing = float(cmd.Spacing)
+		pairCount = int(cmd.Pairs)
+		interferenceRange = float(cmd.Range)
+		spatialIndex = GetBool(cmd.SpatialIndex)
+		tracePolicy = tracing.TracePolicy.FromCommandLine (cmd)
+		profiler = profiling.Profiler.FromCommandLine (cmd)
+		scheduler.Apply (cmd, argv)
 
 		if verbose:
 			ns.core.LogComponentEnable ("Ping6WsnExample", ns.core.LOG_LEVEL_INFO)
@@ -44,22 +112,45 @@ def main(argv):
 
 		print ("Create nodes.")
 		nodes = ns.network.NodeContainer()
-		nodes.Create(2)
+		nodes.Create(nodeCount)
 
 		#Set seed for random numbers
 		ns.core.SeedManager.SetSeed (167)
+		ns.core.SeedManager.SetRun (int(cmd.RunNumber))
 
 		# Install mobility
 		mobility=ns.mobility.MobilityHelper ()
 		mobility.SetMobilityModel ("ns3::ConstantPositionMobilityModel")
 
+		if layout == "line":
+			positions = [(n * spacing, 0.0) for n in range (nodeCount)]
+		elif layout == "grid":
+			positions = spatial.GridLayout (nodeCount, spacing)
+		elif layout == "random":
+			positions = spatial.RandomLayout (nodeCount, spacing, int(cmd.Seed))
+		else:
+			raise ValueError ("Layout must be line, grid or random, not %r" % layout)
 		nodesPositionAlloc = ns.mobility.ListPositionAllocator()
-		nodesPositionAlloc.Add( ns.core.Vector3D (0.0, 0.0, 0.0))
-		nodesPositionAlloc.Add( ns.core.Vector3D (50.0, 0.0, 0.0))
+		for x, y in positions:
+			nodesPositionAlloc.Add( ns.core.Vector3D (x, y, 0.0))
 		mobility.SetPositionAllocator (nodesPositionAlloc)
 		mobility.Install (nodes)
 
+		# Radio range (where the loss reaches the receiver sensitivity) and
+		# the interference range the channel is cut at
+		radioRange = spatial.LogDistanceRange (TX_POWER - RX_SENSITIVITY)
+		index = spatial.GridIndex (positions, max (radioRange, interferenceRange))
+
 		print ("Create channels.")
+		# The default two-node run keeps the channel as it was
+		if spatialIndex and nodeCount > 2:
+			lazyns.Require ("spectrum")
+			ns.core.Config.SetDefault ("ns3::SpectrumChannel::MaxLossDb",
+									   ns.core.DoubleValue (spatial.LogDistanceLoss (interferenceRange)))
+			receivers = sum (len (index.Neighbours (n, interferenceRange)) for n in range (nodeCount))
+		else:
+			receivers = nodeCount * (nodeCount - 1)
+		print ("Receivers per frame: %.1f" % (receivers / float (nodeCount)))
 		lrWpanHelper = ns.lr_wpan.LrWpanHelper()
 		# Add and install the LrWpanNetDevice for each node
 		# lrWpanHelper.EnableLogComponents();
@@ -77,7 +168,7 @@ def main(argv):
 
 		# Install 6LowPan Layer
 		print ("Install 6LowPAN.")
-		sixlowpan = ns3.SixLowPanHelper()
+		sixlowpan = ns.sixlowpan.SixLowPanHelper()
 		six1 = sixlowpan.Install (devContainer)
 
 		print ("Assign addresses.")
@@ -87,34 +178,66 @@ def main(argv):
 
 		print ("Create Applications.")
 
-		# Create a Ping6 application to send ICMPv6 echo request from node zero to
-		#   all-nodes (ff02::1).
+		# Create Ping6 applications to send ICMPv6 echo requests from node zero
+		#   to node one (in the scaled mode from every pinging node to its
+		#   nearest neighbour in radio range, the start times staggered over
+		#   one interval).
 		#
-		packetSize =10
-		maxPacketCount = 5
-		interPacketInterval = ns.core.TimeValue(ns.core.Seconds (1.))
+		packetSize = int(cmd.PacketSize)
+		maxPacketCount = int(cmd.MaxPackets)
+		interval = float(cmd.Interval)
+		interPacketInterval = ns.core.TimeValue(ns.core.Seconds (interval))
 		ping6 = ns.internet_apps.Ping6Helper ()
-		ping6.SetLocal (i.GetAddress (0, 1))
-		ping6.SetRemote (i.GetAddress (1, 1))
 		#ping6.SetRemote (ns.network.Ipv6Address.GetAllNodesMulticast ());
 
 		ping6.SetAttribute ("MaxPackets", ns.core.UintegerValue (maxPacketCount))
 		ping6.SetAttribute ("Interval", ns.core.TimeValue (interPacketInterval))
 		ping6.SetAttribute ("PacketSize", ns.core.UintegerValue (packetSize))
 
-		apps = ping6.Install(ns.network.NodeContainer(nodes.Get(0)))
-
-		apps.Start (ns.core.Seconds (2.0))
-		apps.Stop (ns.core.Seconds (10.0))
-
-		ascii = ns.network.AsciiTraceHelper() 
-		lrWpanHelper.EnableAsciiAll (ascii.CreateFileStream ("ping6wsn.tr"))
-		lrWpanHelper.EnablePcapAll ("ping6wsn", True)
+		pairs = []
+		for source in sorted (set (k * nodeCount // pairCount for k in range (min (pairCount, nodeCount)))):
+			sx, sy = positions[source]
+			neighbours = index.Neighbours (source, radioRange)
+			if neighbours:
+				nearest = min (neighbours, key=lambda n: (positions[n][0] - sx) ** 2 + (positions[n][1] - sy) ** 2)
+				pairs.append ((source, nearest))
+		print ("%d ping pairs." % len (pairs))
+
+		pingStats = []
+		for k, (source, destination) in enumerate (pairs):
+			ping6.SetLocal (i.GetAddress (source, 1))
+			ping6.SetRemote (i.GetAddress (destination, 1))
+			apps = ping6.Install(ns.network.NodeContainer(nodes.Get(source)))
+			start = 2.0 + k * interval / len (pairs)
+			apps.Start (ns.core.Seconds (start))
+			apps.Stop (ns.core.Seconds (pingstats.StopTime (start, 10.0, maxPacketCount, interval)))
+			if str(cmd.PingStats):
+				pingStats.append (pingstats.PingStats (nodes.Get(source), maxPacketCount))
+		if len (pingStats) == 1:
+			pingStats[0].ReportAtDestroy (str(cmd.PingStats))
+		elif pingStats:
+			pingstats.ReportAllAtDestroy (pingStats, str(cmd.PingStats))
+
+		tracePolicy.EnableAscii (lrWpanHelper, "ping6wsn.tr")
+		tracePolicy.EnablePcap (lrWpanHelper, "ping6wsn", True)
+
+		lowpan = None
+		if str(cmd.LowPanStats):
+			writer = RecordWriter (str(cmd.LowPanStats))
+			lowpan = lowpanstats.LowPanStats (nodes, writer, float(cmd.LowPanInterval))
+			lowpan.Start ()
 
 		print ("Run Simulation.")
-		ns.core.Simulator.Run ()
+		profiler.Run ()
+		rows = []
+		if lowpan is not None:
+			# Flush the last, partial interval
+			lowpan.Sample ()
+			writer.Close ()
+			rows.append (lowpan.Summary ())
 		ns.core.Simulator.Destroy ()
 		print ("Done.")
+		return rows
 
 if __name__ == '__main__':
     import sys
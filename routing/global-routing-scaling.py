@@ -0,0 +1,197 @@
+#
+# simple-global-routing on generated topologies
+#
+# The traffic of simple-global-routing.py (constant-rate OnOff/UDP flows
+# into PacketSinks, global routing) on a grid, a k-ary fat-tree or a
+# connected random graph of point-to-point links built by common.topology:
+#
+#   python routing/global-routing-scaling.py --Topology=grid --Rows=30 --Cols=30
+#   python routing/global-routing-scaling.py --Topology=fattree --K=8
+#   python routing/global-routing-scaling.py --Topology=random --Nodes=2000 --Degree=4
+#
+# The wall-clock time and peak RSS after building the topology, after
+# Ipv4GlobalRoutingHelper.PopulateRoutingTables () and after
+# Simulator.Run () are printed and, with --Report=<file>, written as JSON;
+# benchmarks/global-routing-scaling.py runs it over growing sizes.
+#
+# --LinkEvents=time:up|down:link,... or --RandomLinkEvents=N (N random links
+# going down and back up) add link failures; --Routing=incremental handles
+# them with common.incroute instead of full global route recomputation, and
+# benchmarks/incremental-routing.py compares the two.
+
+import json
+import os
+import random
+import resource
+import sys
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from common import lazyns
+ns = lazyns.Import ("core", "network", "applications", "internet", "point_to_point")
+
+from common import incroute
+from common import nscache
+from common import profiling
+from common import scheduler
+from common import topology
+from common.cmdline import GetBool
+
+
+def MaxRssKiB ():
+		return resource.getrusage (resource.RUSAGE_SELF).ru_maxrss
+
+
+def MakeSpec (kind, rows, cols, k, nodes, degree, seed, linkType):
+		if kind == "grid":
+				return topology.GridSpec (rows, cols, linkType)
+		if kind == "fattree":
+				return topology.FatTreeSpec (k, linkType)
+		if kind == "random":
+				return topology.RandomSpec (nodes, degree, linkType, seed)
+		raise ValueError ("Topology must be grid, fattree or random, not %r" % kind)
+
+
+def main (argv):
+		cmd = ns.core.CommandLine ()
+		cmd.Topology = "grid"
+		cmd.Rows = 10
+		cmd.Cols = 10
+		cmd.K = 4
+		cmd.Nodes = 100
+		cmd.Degree = 4
+		cmd.Seed = 1
+		cmd.Flows = 10
+		cmd.LinkRate = "5Mbps"
+		cmd.LinkDelay = "2ms"
+		cmd.PacketSize = 210
+		cmd.DataRate = "448kb/s"
+		cmd.StopTime = 10.0
+		cmd.Verbose = True
+		cmd.Report = ""
+		cmd.Routing = "global"
+		cmd.LinkEvents = ""
+		cmd.RandomLinkEvents = 0
+		cmd.AddValue ("Topology", "grid, fattree or random")
+		cmd.AddValue ("Rows", "Grid rows")
+		cmd.AddValue ("Cols", "Grid columns")
+		cmd.AddValue ("K", "Fat-tree arity (even)")
+		cmd.AddValue ("Nodes", "Random graph size")
+		cmd.AddValue ("Degree", "Random graph average degree")
+		cmd.AddValue ("Seed", "Seed of the random graph and of the flow endpoints")
+		cmd.AddValue ("Flows", "Number of OnOff flows between random hosts")
+		cmd.AddValue ("LinkRate", "Point-to-point link data rate")
+		cmd.AddValue ("LinkDelay", "Point-to-point link delay")
+		cmd.AddValue ("PacketSize", "OnOff packet size in bytes")
+		cmd.AddValue ("DataRate", "OnOff data rate")
+		cmd.AddValue ("StopTime", "Simulation stop time in seconds")
+		cmd.AddValue ("Verbose", "Print the progress and the report")
+		cmd.AddValue ("Report", "Write the timing report to this JSON file")
+		cmd.AddValue ("Routing", "global (full recomputation on link events) or incremental")
+		cmd.AddValue ("LinkEvents", "Comma-separated time:up|down:link events")
+		cmd.AddValue ("RandomLinkEvents", "Take this many random links down and back up between 2 s and StopTime")
+		profiling.AddCommandLineOptions (cmd)
+		scheduler.AddCommandLineOptions (cmd)
+		cmd.Parse (argv)
+		profiler = profiling.Profiler.FromCommandLine (cmd)
+		scheduler.Apply (cmd, argv)
+		kind = str(cmd.Topology)
+		seed = int(cmd.Seed)
+		flowCount = int(cmd.Flows)
+		packetSize = int(cmd.PacketSize)
+		dataRate = str(cmd.DataRate)
+		stopTime = float(cmd.StopTime)
+		verbose = GetBool(cmd.Verbose)
+		routingMode = str(cmd.Routing)
+		linkEvents = incroute.ParseLinkEvents (str(cmd.LinkEvents))
+		randomLinkEvents = int(cmd.RandomLinkEvents)
+		linkType = {"device": {"DataRate": str(cmd.LinkRate)}, "channel": {"Delay": str(cmd.LinkDelay)}}
+
+		report = {"topology": kind}
+		spec = MakeSpec (kind, int(cmd.Rows), int(cmd.Cols), int(cmd.K), int(cmd.Nodes), int(cmd.Degree),
+						 seed, linkType)
+
+		if verbose:
+				print ("Create topology.")
+		start = time.perf_counter ()
+		topo = topology.Build (spec)
+		report["nodes"] = len (topo.names)
+		report["links"] = len (topo.links)
+		report["build"] = time.perf_counter () - start
+		report["buildMaxRssKiB"] = MaxRssKiB ()
+
+		eventRng = random.Random (seed + 1)
+		for i in range (randomLinkEvents):
+				down = eventRng.uniform (2.0, stopTime)
+				up = eventRng.uniform (down, stopTime)
+				link = eventRng.randrange (len (topo.links))
+				linkEvents.extend ([(down, False, link), (up, True, link)])
+		linkEvents.sort ()
+
+		if verbose:
+				print ("Populate routing tables.")
+		start = time.perf_counter ()
+		if routingMode == "incremental":
+				routing = incroute.IncrementalRouting (topo)
+		elif routingMode == "global":
+				routing = incroute.GlobalRouting (topo)
+		else:
+				raise ValueError ("Routing must be global or incremental, not %r" % routingMode)
+		routing.Populate ()
+		incroute.ScheduleLinkEvents (linkEvents, routing)
+		report["routing"] = routingMode
+		report["populate"] = time.perf_counter () - start
+		report["populateMaxRssKiB"] = MaxRssKiB ()
+
+		#
+		# Flows between random pairs of hosts, like the n0 -> n3 and n3 -> n1
+		# flows of simple-global-routing
+		#
+		if verbose:
+				print ("Create Applications.")
+		port = 9
+		rng = random.Random (seed)
+		hosts = spec["hosts"]
+		onoff = ns.applications.OnOffHelper ("ns3::UdpSocketFactory", ns.network.Address ())
+		onoff.SetConstantRate (nscache.DataRate (dataRate), packetSize)
+		sink = ns.applications.PacketSinkHelper ("ns3::UdpSocketFactory",
+												ns.network.InetSocketAddress (ns.network.Ipv4Address.GetAny (), port))
+		sinkNodes = set ()
+		for i in range (flowCount):
+				source, destination = rng.sample (hosts, 2)
+				link, position = topo.LinksOf (destination)[0]
+				onoff.SetAttribute ("Remote",
+									ns.network.AddressValue(ns.network.InetSocketAddress (link.interfaces.GetAddress (position), port)))
+				apps = onoff.Install (topo.Node (source))
+				apps.Start (nscache.Time (1.0 + 0.001 * i))
+				apps.Stop (nscache.Time (stopTime))
+				if destination not in sinkNodes:
+						sinkNodes.add (destination)
+						apps = sink.Install (topo.Node (destination))
+						apps.Start (nscache.Time (1.0))
+						apps.Stop (nscache.Time (stopTime))
+		report["flows"] = flowCount
+		report["nscache"] = nscache.Stats ()
+
+		if verbose:
+				print ("Run Simulation.")
+		start = time.perf_counter ()
+		ns.core.Simulator.Stop (ns.core.Seconds (stopTime))
+		profiler.Run ()
+		report["run"] = time.perf_counter () - start
+		report["runMaxRssKiB"] = MaxRssKiB ()
+		report["linkEvents"] = routing.stats["events"]
+		report["linkEventSeconds"] = routing.stats["seconds"]
+		ns.core.Simulator.Destroy ()
+
+		if verbose:
+				for key, value in report.items ():
+						print ("%-18s %s" % (key, "%.3f" % value if isinstance (value, float) else value))
+		if str(cmd.Report):
+				with open (str(cmd.Report), "w") as f:
+						json.dump (report, f, indent=2)
+		return report
+
+if __name__ == '__main__':
+    import sys
+    main (sys.argv)
@@ -0,0 +1,159 @@
+#
+# simple-global-routing partitioned over MPI ranks
+#
+# The constant-rate OnOff/UDP flows of simple-global-routing.py on a
+# Rows x Cols grid of point-to-point links (common.topology.GridSpec), run
+# with ns-3's distributed simulator:
+#
+#   mpirun -np 4 python routing/simple-global-routing-mpi.py --Rows=32 --Cols=32 --Flows=200
+#   python routing/simple-global-routing-mpi.py --Distributed=0 --Rows=32 --Cols=32 --Flows=200
+#
+# The grid is cut into bands of rows, one per rank; the point-to-point
+# links between two bands become remote channels whose delay (LinkDelay)
+# is the lookahead of the conservative synchronization.  Every rank builds
+# the whole topology and global routes, but only installs and runs the
+# applications of its own nodes.  Flows use their own sink port, so the
+# bytes received per flow can be compared between runs.
+#
+# Each rank writes <Results>.<rank>.json with its wall-clock times and the
+# bytes received by its sinks; with --Distributed=0 the same scenario runs
+# sequentially (default simulator, no MPI) and writes <Results>.0.json.
+# benchmarks/mpi-scaling.py checks that the flows receive the same bytes
+# with any number of ranks and reports the speedup.
+
+import json
+import os
+import random
+import sys
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from common import lazyns
+ns = lazyns.Import ("core", "network", "applications", "internet", "point_to_point")
+
+from common import nscache
+from common import topology
+from common.cmdline import GetBool
+
+
+# Rank of every node of a rows x cols grid split into bands of rows.
+def RowBands (rows, cols, systemCount):
+		return [min (systemCount - 1, (node // cols) * systemCount // rows) for node in range (rows * cols)]
+
+
+def main (argv):
+		cmd = ns.core.CommandLine ()
+		cmd.Rows = 8
+		cmd.Cols = 8
+		cmd.Flows = 20
+		cmd.Seed = 1
+		cmd.LinkRate = "5Mbps"
+		cmd.LinkDelay = "2ms"
+		cmd.PacketSize = 210
+		cmd.DataRate = "448kb/s"
+		cmd.StopTime = 10.0
+		cmd.Distributed = True
+		cmd.NullMessage = False
+		cmd.Results = "simple-global-routing-mpi"
+		cmd.Verbose = True
+		cmd.AddValue ("Rows", "Grid rows (split into one band of rows per rank)")
+		cmd.AddValue ("Cols", "Grid columns")
+		cmd.AddValue ("Flows", "Number of OnOff flows between random nodes")
+		cmd.AddValue ("Seed", "Seed of the flow endpoints")
+		cmd.AddValue ("LinkRate", "Point-to-point link data rate")
+		cmd.AddValue ("LinkDelay", "Point-to-point link delay (the lookahead between ranks)")
+		cmd.AddValue ("PacketSize", "OnOff packet size in bytes")
+		cmd.AddValue ("DataRate", "OnOff data rate")
+		cmd.AddValue ("StopTime", "Simulation stop time in seconds")
+		cmd.AddValue ("Distributed", "Use the MPI distributed simulator (0: sequential reference run)")
+		cmd.AddValue ("NullMessage", "Use the null-message instead of the granted-time-window synchronization")
+		cmd.AddValue ("Results", "Per-rank results are written to <Results>.<rank>.json")
+		cmd.AddValue ("Verbose", "Print progress on rank 0")
+		cmd.Parse (argv)
+		rows = int(cmd.Rows)
+		cols = int(cmd.Cols)
+		flowCount = int(cmd.Flows)
+		stopTime = float(cmd.StopTime)
+		distributed = GetBool(cmd.Distributed)
+		verbose = GetBool(cmd.Verbose)
+
+		start = time.perf_counter ()
+		systemId = 0
+		systemCount = 1
+		if distributed:
+				implementation = "ns3::NullMessageSimulatorImpl" if GetBool(cmd.NullMessage) else "ns3::DistributedSimulatorImpl"
+				lazyns.Require ("mpi")
+				ns.core.GlobalValue.Bind ("SimulatorImplementationType", ns.core.StringValue (implementation))
+				ns.mpi.MpiInterface.Enable (argv)
+				systemId = ns.mpi.MpiInterface.GetSystemId ()
+				systemCount = ns.mpi.MpiInterface.GetSize ()
+		verbose = verbose and systemId == 0
+
+		if verbose:
+				print ("Create topology on %d rank(s)." % systemCount)
+		linkType = {"device": {"DataRate": str(cmd.LinkRate)}, "channel": {"Delay": str(cmd.LinkDelay)}}
+		spec = topology.GridSpec (rows, cols, linkType)
+		spec["systemIds"] = RowBands (rows, cols, systemCount)
+		topo = topology.Build (spec)
+		ns.internet.Ipv4GlobalRoutingHelper.PopulateRoutingTables ()
+		setup = time.perf_counter () - start
+
+		#
+		# Flows between random pairs of nodes, each into its own sink port;
+		# a rank only installs the applications of its nodes
+		#
+		if verbose:
+				print ("Create Applications.")
+		rng = random.Random (int(cmd.Seed))
+		onoff = ns.applications.OnOffHelper ("ns3::UdpSocketFactory", ns.network.Address ())
+		onoff.SetConstantRate (nscache.DataRate (str(cmd.DataRate)), int(cmd.PacketSize))
+		sinks = {}
+		for i in range (flowCount):
+				source, destination = rng.sample (spec["hosts"], 2)
+				port = 10000 + i
+				if spec["systemIds"][source] == systemId:
+						link, position = topo.LinksOf (destination)[0]
+						onoff.SetAttribute ("Remote",
+											ns.network.AddressValue(ns.network.InetSocketAddress (link.interfaces.GetAddress (position), port)))
+						apps = onoff.Install (topo.Node (source))
+						apps.Start (nscache.Time (1.0 + 0.001 * i))
+						apps.Stop (nscache.Time (stopTime))
+				if spec["systemIds"][destination] == systemId:
+						sink = ns.applications.PacketSinkHelper ("ns3::UdpSocketFactory",
+																 ns.network.InetSocketAddress (ns.network.Ipv4Address.GetAny (), port))
+						apps = sink.Install (topo.Node (destination))
+						apps.Start (nscache.Time (1.0))
+						apps.Stop (nscache.Time (stopTime))
+						sinks[i] = apps.Get (0)
+
+		if verbose:
+				print ("Run Simulation.")
+		runStart = time.perf_counter ()
+		ns.core.Simulator.Stop (ns.core.Seconds (stopTime))
+		ns.core.Simulator.Run ()
+		run = time.perf_counter () - runStart
+
+		result = {
+				"rank": systemId,
+				"ranks": systemCount,
+				"distributed": distributed,
+				"nodes": rows * cols,
+				"localNodes": spec["systemIds"].count (systemId),
+				"flows": flowCount,
+				"setup": setup,
+				"run": run,
+				"rxBytes": dict ((str (i), sink.GetTotalRx ()) for i, sink in sinks.items ()),
+		}
+		ns.core.Simulator.Destroy ()
+		if distributed:
+				ns.mpi.MpiInterface.Disable ()
+		result["wall"] = time.perf_counter () - start
+		with open ("%s.%d.json" % (str(cmd.Results), systemId), "w") as f:
+				json.dump (result, f, indent=2)
+		if verbose:
+				print ("Done: setup %.3f s, run %.3f s." % (setup, run))
+		return result
+
+if __name__ == '__main__':
+    import sys
+    main (sys.argv)
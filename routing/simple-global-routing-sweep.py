@@ -0,0 +1,49 @@
+#
+# Parameter sweep over simple-global-routing.py
+#
+# Every grid point runs simple-global-routing.py in its own worker process
+# (ns-3's Simulator is global to a process) with FlowMonitor enabled and
+# tracing off, and the per-flow FlowMonitor statistics of all points
+# are collected into one CSV table.
+#
+#   python routing/simple-global-routing-sweep.py \
+#       --grid LinkRate=5Mbps,10Mbps --grid BottleneckDelay=10ms,50ms \
+#       --grid PacketSize=210,1024 --grid DataRate=448kb/s,1Mb/s \
+#       --jobs 8 --runs 3 --output sweep.csv
+#
+# Any option of simple-global-routing.py can be used as a grid axis.
+
+import argparse
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from common import sweep
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "simple-global-routing.py")
+
+
+def main(argv):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--grid", action="append", default=[], metavar="NAME=V1,V2,...",
+                        help="one axis of the parameter grid (repeatable)")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--runs", type=int, default=1, help="replicates per grid point")
+    parser.add_argument("--first-run", type=int, default=1, help="RngRun number of the first run")
+    parser.add_argument("--output", default="-", help="CSV file for the results ('-' for stdout)")
+    options = parser.parse_args(argv[1:])
+
+    points = sweep.ExpandGrid([sweep.ParseAxis(axis) for axis in options.grid])
+    results = sweep.RunSweep(SCRIPT, points, jobs=options.jobs, runs=options.runs,
+                             firstRun=options.first_run,
+                             extraArgs=["--EnableMonitor=1", "--TraceMode=off"])
+
+    if options.output == "-":
+        sweep.WriteTable(results, sys.stdout)
+    else:
+        with open(options.output, "w", newline="") as f:
+            sweep.WriteTable(results, f)
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -16,13 +16,41 @@
 #   (i.e., DataRate of 448,000 bps)
 # - DropTail queues 
 # - Tracing of queues and packet receptions to file "simple-global-routing.tr"
+#
+# Link rates/delays, the OnOff packet size and rate and the RngRun number
+# can be set from the command line; with --EnableMonitor=1 main () returns
+# the FlowMonitor statistics, which is what simple-global-routing-sweep.py
+# collects for every point of a parameter grid.
+#
+# --FlowmonInterval=<s> streams per-interval FlowMonitor deltas as
+# newline-delimited JSON to "simple-global-routing.flowmon.ndjson" while the
+# simulation runs; --FlowmonXml=0 skips the end-of-run XML document.
+#
+# --LinkEvents=2.0:down:2,4.0:up:2 takes links (0: n0-n2, 1: n1-n2,
+# 2: n3-n2) down and up during the run.  With --Routing=global every event
+# recomputes all routing tables; --Routing=incremental uses static routes
+# from common.incroute, updated only where the event changes a path.
+#
+# --Traffic=<file.csv> runs the flows of a traffic matrix (one
+# source,destination,protocol,rate,start,stop[,packetSize,port] row per
+# flow, see common.traffic) instead of the three flows above.
+
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
 
-import ns.core
-import ns.network
-import ns.applications
-import ns.internet
-import ns.flow_monitor
-import ns.point_to_point
+from common import lazyns
+ns = lazyns.Import ("core", "network", "applications", "internet", "flow_monitor", "point_to_point")
+
+from common import incroute
+from common import profiling
+from common import scheduler
+from common import topology
+from common import tracing
+from common import traffic
+from common.cmdline import GetBool
+from common.flowmon import CollectFlowStats, FlowStatsStreamer
+from common.records import RecordWriter
 
 
 def main (argv):
@@ -30,10 +58,6 @@ def main (argv):
 		# Users may find it convenient to turn on explicit debugging
 		# for selected modules; the below lines suggest how to do this
 		
-		# Set up some default values for the simulation.  Use the
-		ns.core.Config.SetDefault("ns3::OnOffApplication::PacketSize", ns.core.UintegerValue (210))
-		ns.core.Config.SetDefault("ns3::OnOffApplication::DataRate", ns.core.StringValue ("448kb/s"))
-
 		#
 		# DefaultValue::Bind ("DropTailQueue::m_maxPackets", 30);
 
@@ -41,120 +65,155 @@ def main (argv):
 		# DefaultValue::Bind ()s at run-time, via command-line arguments
 		#
 		cmd = ns.core.CommandLine ()
-		cmd.enableFlowMonitor = False
+		cmd.EnableMonitor = False
+		cmd.LinkRate = "5Mbps"
+		cmd.LinkDelay = "2ms"
+		cmd.BottleneckRate = "1500kbps"
+		cmd.BottleneckDelay = "10ms"
+		cmd.PacketSize = 210
+		cmd.DataRate = "448kb/s"
+		cmd.RunNumber = 1
+		cmd.FlowmonInterval = 0.0
+		cmd.FlowmonXml = True
+		cmd.FlowmonHistograms = False
+		cmd.FlowmonProbes = False
+		cmd.Routing = "global"
+		cmd.LinkEvents = ""
+		cmd.Traffic = ""
 		cmd.AddValue ("EnableMonitor", "Enable Flow Monitor")
+		cmd.AddValue ("LinkRate", "Data rate of the n0-n2 and n1-n2 links")
+		cmd.AddValue ("LinkDelay", "Delay of the n0-n2 and n1-n2 links")
+		cmd.AddValue ("BottleneckRate", "Data rate of the n2-n3 link")
+		cmd.AddValue ("BottleneckDelay", "Delay of the n2-n3 link")
+		cmd.AddValue ("PacketSize", "OnOffApplication packet size in bytes")
+		cmd.AddValue ("DataRate", "OnOffApplication data rate")
+		cmd.AddValue ("RunNumber", "RngRun number of this run")
+		cmd.AddValue ("FlowmonInterval", "Stream FlowMonitor deltas every this many seconds (0: off)")
+		cmd.AddValue ("FlowmonXml", "Write the FlowMonitor XML document at the end of the run")
+		cmd.AddValue ("FlowmonHistograms", "Include histograms in the FlowMonitor output")
+		cmd.AddValue ("FlowmonProbes", "Include probe statistics in the FlowMonitor XML document")
+		cmd.AddValue ("Routing", "global (full recomputation on link events) or incremental")
+		cmd.AddValue ("LinkEvents", "Comma-separated time:up|down:link events")
+		cmd.AddValue ("Traffic", "CSV traffic matrix to run instead of the flows above")
+		tracing.AddCommandLineOptions (cmd)
+		profiling.AddCommandLineOptions (cmd)
+		scheduler.AddCommandLineOptions (cmd)
 		cmd.Parse (argv)
-		enableFlowMonitor = bool(cmd.enableFlowMonitor)
-
-		#Here, we will explicitly create four nodes.  In more sophisticated
-		# topologies, we could configure a node factory.
-
-		print ("Create nodes.")
-		c = ns.network.NodeContainer ()
-		c.Create (4)
-		n0n2 = ns.network.NodeContainer ()
-		n0n2.Add(c.Get(0))
-		n0n2.Add(c.Get(2))
-		n1n2 = ns.network.NodeContainer ()
-		n1n2.Add(c.Get(1))
-		n1n2.Add(c.Get(2))
-		n3n2 = ns.network.NodeContainer ()
-		n3n2.Add(c.Get(3))
-		n3n2.Add(c.Get(2))
-
-		internet = ns.internet.InternetStackHelper ()
-		internet.Install (c)
+		enableFlowMonitor = GetBool(cmd.EnableMonitor)
+		linkRate = str(cmd.LinkRate)
+		linkDelay = str(cmd.LinkDelay)
+		bottleneckRate = str(cmd.BottleneckRate)
+		bottleneckDelay = str(cmd.BottleneckDelay)
+		packetSize = int(cmd.PacketSize)
+		dataRate = str(cmd.DataRate)
+		tracePolicy = tracing.TracePolicy.FromCommandLine (cmd)
+		profiler = profiling.Profiler.FromCommandLine (cmd)
+		scheduler.Apply (cmd, argv)
+		flowmonInterval = float(cmd.FlowmonInterval)
+		flowmonXml = GetBool(cmd.FlowmonXml)
+		flowmonHistograms = GetBool(cmd.FlowmonHistograms)
+		flowmonProbes = GetBool(cmd.FlowmonProbes)
+		routingMode = str(cmd.Routing)
+		linkEvents = incroute.ParseLinkEvents (str(cmd.LinkEvents))
+		trafficFile = str(cmd.Traffic)
+
+		ns.core.SeedManager.SetRun (int(cmd.RunNumber))
+
+		# Set up some default values for the simulation.
+		lazyns.Require ("applications")
+		ns.core.Config.SetDefault("ns3::OnOffApplication::PacketSize", ns.core.UintegerValue (packetSize))
+		ns.core.Config.SetDefault("ns3::OnOffApplication::DataRate", ns.core.StringValue (dataRate))
 
 		#
-		# We create the channels first without any IP addressing information
+		# The four nodes, the point-to-point links and their subnets
+		# (10.1.1.0/24, 10.1.2.0/24 and 10.1.3.0/24 in link order).
 		#
-		print ("Create channels.")
-		p2p =ns.point_to_point.PointToPointHelper ()
-		p2p.SetDeviceAttribute ("DataRate", ns.core.StringValue ("5Mbps"))
-		p2p.SetChannelAttribute ("Delay", ns.core.StringValue ("2ms"))
-		d0d2 = p2p.Install (n0n2)
-		d1d2 = p2p.Install (n1n2)
-		p2p.SetDeviceAttribute ("DataRate", ns.core.StringValue ("1500kbps"))
-		p2p.SetChannelAttribute ("Delay", ns.core.StringValue ("10ms"))
-		d3d2 = p2p.Install (n3n2)
+		print ("Create nodes, channels and IP addresses.")
+		topo = topology.Build ({
+				"nodes": 4,
+				"linkTypes": {
+						"access": {"helper": "p2p", "device": {"DataRate": linkRate}, "channel": {"Delay": linkDelay}},
+						"bottleneck": {"helper": "p2p", "device": {"DataRate": bottleneckRate},
+									   "channel": {"Delay": bottleneckDelay}},
+				},
+				"ipv4": "10.1.1.0/24",
+				"links": [("access", (0, 2)), ("access", (1, 2)), ("bottleneck", (3, 2))],
+		})
+		# Either helper traces all point-to-point devices
+		p2p = topo.helpers["access"]
 
-		#
-		# Later, we add IP addresses.
-		#
-		print ("Assign IP Addresses.")
-		ipv4 = ns.internet.Ipv4AddressHelper ()
-		ipv4.SetBase (ns.network.Ipv4Address ("10.1.1.0"), ns.network.Ipv4Mask ("255.255.255.0"))
-		i0i2 = ipv4.Assign (d0d2)
-		ipv4.SetBase (ns.network.Ipv4Address ("10.1.2.0"), ns.network.Ipv4Mask ("255.255.255.0"))
-		i1i2 = ipv4.Assign (d1d2)
-		ipv4.SetBase (ns.network.Ipv4Address ("10.1.3.0"), ns.network.Ipv4Mask ("255.255.255.0"))
-		i3i2 = ipv4.Assign (d3d2)
-		
 		#
 		# Create router nodes, initialize routing database and set up the routing
 		# tables in the nodes.
 		#
-		ns.internet.Ipv4GlobalRoutingHelper.PopulateRoutingTables()
+		if routingMode == "incremental":
+				routing = incroute.IncrementalRouting (topo)
+		elif routingMode == "global":
+				routing = incroute.GlobalRouting (topo)
+		else:
+				raise ValueError ("Routing must be global or incremental, not %r" % routingMode)
+		routing.Populate ()
+		incroute.ScheduleLinkEvents (linkEvents, routing)
 
 		#
-		# Create the OnOff application to send UDP datagrams of size
-		# 210 bytes at a rate of 448 Kb/s
+		# The flows of the header as a traffic matrix: OnOff applications
+		# sending UDP datagrams of size 210 bytes at a rate of 448 Kb/s
+		# (PacketSize and DataRate by default) from n0 to n3 and, starting at
+		# time 1.1 seconds, from n3 to n1, and a BulkSend FTP/TCP transfer
+		# from n0 to n3.  Each destination gets a packet sink on the discard
+		# port (RFC 863).  --Traffic=<csv> replaces them (see common.traffic).
 		#
 		print ("Create Applications.")
-		port = 9  # Discard port (RFC 863)
-
-		onoff = ns.applications.OnOffHelper ("ns3::UdpSocketFactory",
-											ns.network.InetSocketAddress (i3i2.GetAddress (0), port))
-		onoff.SetConstantRate (ns.network.DataRate("448kb/s"))
-		apps = onoff.Install (c.Get (0))
-		apps.Start (ns.core.Seconds (1.0))
-		apps.Stop (ns.core.Seconds (10.0))
-		# 
-		# Create a packet sink to receive these packets
-		# 
-		sink = ns.applications.PacketSinkHelper ("ns3::UdpSocketFactory",
-												ns.network.InetSocketAddress (ns.network.Ipv4Address.GetAny (), port))
-		apps = sink.Install (c.Get (3))
-		apps.Start (ns.core.Seconds (1.0))
-		apps.Stop (ns.core.Seconds (10.0))
-
-		#
-		# Create a similar flow from n3 to n1, starting at time 1.1 seconds
-		#  
-		onoff.SetAttribute ("Remote",
-							ns.network.AddressValue(ns.network.InetSocketAddress (i1i2.GetAddress (0), port)))
-		apps = onoff.Install (c.Get (3))
-		apps.Start (ns.core.Seconds (1.1))
-		apps.Stop (ns.core.Seconds (10.0))
-
-		#
-		# Create a packet sink to receive these packets
-		#
-		apps = sink.Install (c.Get (1))
-		apps.Start(ns.core.Seconds (1.1))
-		apps.Stop (ns.core.Seconds (10.0))
-
-		ascii = ns.network.AsciiTraceHelper ()
-		p2p.EnableAsciiAll (ascii.CreateFileStream ("simple-global-routing.tr"))
-		p2p.EnablePcapAll ("simple-global-routing")
+		if trafficFile:
+				matrix = traffic.LoadCsv (trafficFile)
+		else:
+				matrix = [
+						(0, 3, "udp", dataRate, 1.0, 10.0, packetSize),
+						(3, 1, "udp", dataRate, 1.1, 10.0, packetSize),
+						(0, 3, "tcp", "", 1.2, 1.35, 512),
+				]
+		traffic.Install (topo, matrix)
+
+		tracePolicy.EnableAscii (p2p, "simple-global-routing.tr")
+		tracePolicy.EnablePcap (p2p, "simple-global-routing")
 
 		#
 		#Flow Monitor
 		#
-		flowmonHelper = ns.flow_monitor.FlowMonitorHelper ()
-		if enableFlowMonitor:
+		# Only built when used, so runs without it never load ns.flow_monitor
+		flowmonHelper = None
+		if enableFlowMonitor or flowmonInterval > 0:
+				flowmonHelper = ns.flow_monitor.FlowMonitorHelper ()
 				flowmonHelper.InstallAll()
 
+		streamer = None
+		if flowmonInterval > 0:
+			writer = RecordWriter ("simple-global-routing.flowmon.ndjson")
+			streamer = FlowStatsStreamer (flowmonHelper, writer, ns.core.Seconds (flowmonInterval), flowmonHistograms)
+			streamer.Start ()
+
 		print ("Run Simulation.")
 		ns.core.Simulator.Stop (ns.core.Seconds (11))
-		ns.core.Simulator.Run ()
+		profiler.Run ()
 		print ("Done.")
+		if linkEvents:
+				print ("%s routing: %d link events, %.6f s updating routes" %
+					   (routingMode, routing.stats["events"], routing.stats["seconds"]))
+
 
+		if streamer is not None:
+			# Flush the last, partial interval
+			streamer.Sample ()
+			writer.Close ()
 
+		flows = []
 		if enableFlowMonitor :
-			flowmonHelper.SerializeToXmlFile ("simple-global-routing.flowmon", False, False)
+			flows = CollectFlowStats (flowmonHelper)
+			if flowmonXml:
+				flowmonHelper.SerializeToXmlFile ("simple-global-routing.flowmon", flowmonHistograms, flowmonProbes)
 		
 		ns.core.Simulator.Destroy ()
+		return flows
 
 if __name__ == '__main__':
     import sys
@@ -7,34 +7,33 @@
 #             LAN
 #
 # UDP flows from n0 to n1
+#
+# With --SendMode=bulk the whole send schedule is handed to ns-3's native
+# UdpClient application instead of calling SendPacket once per packet;
+# --SendTimes=<file> sends at the listed times (seconds, one per line).
+#
+# Received packets are counted per TOS/TTL value and summarized when the
+# simulation is destroyed; --RecvPrintEvery=N also prints every N-th packet.
 
-import ns3
-import ns.core
-import ns.csma
-import ns.internet
-import ns.network
-
-
-def ReceivePacket (socket):
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
 
-	print ("Received one packet!")
-	packet = socket.Recv()
-	tosTag = ns3.SocketIpTosTag()
+from common import lazyns
+ns = lazyns.Import ("core", "csma", "internet", "network")
 
-	if packet.RemovePacketTag(tosTag):
-		print (" TOS = ", tosTag.GetTos ())
-	
-	ttlTag = ns3.SocketIpTtlTag()
-	
-	if packet.RemovePacketTag(ttlTag):
-		print (" TTL = ", ttlTag.GetTtl ())
+from common import bulksend, tracing
+from common import profiling
+from common import scheduler
+from common.recvstats import PacketTagCollector
+from common.cmdline import GetBool
 
 
-def SendPacket (args, socket, pktSize, pktCount, pktInterval):
+def SendPacket (socket, pktSize, pktCount, pktInterval):
   	
 	if pktCount > 0 :
 		socket.Send(ns.network.Packet(pktSize))
-		ns.core.Simulator.Schedule(pktInterval, SendPacket, args, socket, pktSize, pktCount -1 , pktInterval)
+		ns.core.Simulator.Schedule(pktInterval, SendPacket, socket, pktSize, pktCount -1 , pktInterval)
 				
 	else :
 		socket.Close ()		
@@ -49,32 +48,52 @@ def main(argv):
 #
 	cmd = ns.core.CommandLine()
 
-	cmd.packetSize = 1024 
-	cmd.packetCount = 10
-	cmd.packetInterval = 1.0
+	cmd.PacketSize = 1024 
+	cmd.PacketCount = 10
+	cmd.Interval = 1.0
+	cmd.SendMode = "packet"
+	cmd.SendTimes = ""
+	cmd.RecvPrintEvery = 0
 
 # Socket options for IPv4, currently TOS, TTL, RECVTOS, and RECVTTL
-	cmd.ipTos = 0
-	cmd.ipRecvTos = True 
-	cmd.ipTtl = 0
-	cmd.ipRecvTtl = True 
+	cmd.IP_TOS = 0
+	cmd.IP_RECVTOS = True 
+	cmd.IP_TTL = 0
+	cmd.IP_RECVTTL = True 
 
 	cmd.AddValue ("PacketSize", "Packet size in bytes")
 	cmd.AddValue ("PacketCount", "Number of packets to send")
 	cmd.AddValue ("Interval", "Interval between packets")
+	cmd.AddValue ("SendMode", "packet: one Python call per packet, bulk: native UdpClient schedule")
+	cmd.AddValue ("SendTimes", "File with explicit send times in seconds (implies bulk mode)")
+	cmd.AddValue ("RecvPrintEvery", "Print every N-th received packet (0: summary only)")
 	cmd.AddValue ("IP_TOS", "IP_TOS")
 	cmd.AddValue ("IP_RECVTOS", "IP_RECVTOS")
 	cmd.AddValue ("IP_TTL", "IP_TTL")
 	cmd.AddValue ("IP_RECVTTL", "IP_RECVTTL")
+	tracing.AddCommandLineOptions (cmd)
+	profiling.AddCommandLineOptions (cmd)
+	scheduler.AddCommandLineOptions (cmd)
 	cmd.Parse(argv)
 
-	packetSize = int(cmd.packetSize) 
-	packetCount = int(cmd.packetCount)
-	packetInterval = float(cmd.packetInterval)
-	ipTos = int(cmd.ipTos)
-	ipRecvTos = bool(cmd.ipRecvTos) 
-	ipTtl = int(cmd.ipTtl)
-	ipRecvTtl = bool(cmd.ipRecvTtl) 
+	packetSize = int(cmd.PacketSize) 
+	packetCount = int(cmd.PacketCount)
+	packetInterval = float(cmd.Interval)
+	sendTimes = str(cmd.SendTimes)
+	bulk = str(cmd.SendMode) == "bulk" or sendTimes != ""
+	recvPrintEvery = int(cmd.RecvPrintEvery)
+	ipTos = int(cmd.IP_TOS)
+	ipRecvTos = GetBool(cmd.IP_RECVTOS) 
+	ipTtl = int(cmd.IP_TTL)
+	ipRecvTtl = GetBool(cmd.IP_RECVTTL) 
+	tracePolicy = tracing.TracePolicy.FromCommandLine (cmd)
+	profiler = profiling.Profiler.FromCommandLine (cmd)
+	scheduler.Apply (cmd, argv)
+
+	# UdpClient uses its own socket and IPv4 has no node-wide TOS default
+	if bulk and ipTos > 0:
+		print ("IP_TOS is only applied by the per-packet sender, using SendMode=packet.")
+		bulk = False
 
 	print ("Create nodes.")
 	n = ns.network.NodeContainer()
@@ -98,16 +117,19 @@ def main(argv):
 
 	print ("Create sockets.")
 	# Receiver socket on n1
-	tid = ns3.TypeId.LookupByName("ns3::UdpSocketFactory")
-	recvSink = ns3.Socket.CreateSocket(n.Get(1), tid)
-	local= ns3.InetSocketAddress(ns3.Ipv4Address.GetAny(), 4477)
+	tid = ns.core.TypeId.LookupByName("ns3::UdpSocketFactory")
+	recvSink = ns.network.Socket.CreateSocket(n.Get(1), tid)
+	local= ns.network.InetSocketAddress(ns.network.Ipv4Address.GetAny(), 4477)
 	recvSink.SetIpRecvTos(ipRecvTos)
 	recvSink.SetIpRecvTtl(ipRecvTtl)
 	recvSink.Bind(local)
-	recvSink.SetRecvCallback (ReceivePacket)
+	receiver = PacketTagCollector ([("TOS", ns.network.SocketIpTosTag(), "GetTos"),
+	                                ("TTL", ns.network.SocketIpTtlTag(), "GetTtl")], recvPrintEvery)
+	recvSink.SetRecvCallback (profiler.Wrap ("ReceivePacket", receiver.Receive))
+	receiver.ReportAtDestroy ()
 	
 	# Sender socket on n0
-	source = ns3.Socket.CreateSocket(n.Get(0), tid)
+	source = ns.network.Socket.CreateSocket(n.Get(0), tid)
 	remote = ns.network.InetSocketAddress(i.GetAddress(1), 4477)
 
 	# Set socket options, it is also possible to set the options after the socket has been created/connected.
@@ -118,16 +140,28 @@ def main(argv):
 		source.SetIpTtl (ipTtl)
 	source.Connect (remote)
 
-	ascii = ns.network.AsciiTraceHelper ()
-	csma.EnableAsciiAll(ascii.CreateFileStream("socket-options-ipv4.tr"))
-	csma.EnablePcapAll ("socket-options-ipv4", False)
+	tracePolicy.EnableAscii (csma, "socket-options-ipv4.tr")
+	tracePolicy.EnablePcap (csma, "socket-options-ipv4", False)
 	
-	# Schedule SendPacket
 	interPacketInterval = ns.core.Seconds(packetInterval)
-	ns.core.Simulator.ScheduleWithContext (source.GetNode ().GetId (), ns.core.Seconds (1.0), SendPacket, source, packetSize, packetCount, interPacketInterval)
+	if bulk:
+		# The bulk sender's own socket picks up the TTL from the node default
+		if ipTtl > 0:
+			ipv4L3 = n.Get(0).GetObject(ns.internet.Ipv4L3Protocol.GetTypeId())
+			ipv4L3.SetAttribute ("DefaultTtl", ns.core.UintegerValue (ipTtl))
+		source.Close ()
+		if sendTimes:
+			bulksend.InstallScheduledSender (n.Get(0), i.GetAddress(1), 4477, packetSize, bulksend.LoadSendTimes (sendTimes))
+		else:
+			bulksend.InstallBulkSender (n.Get(0), i.GetAddress(1), 4477, packetSize, packetCount, interPacketInterval, ns.core.Seconds (1.0))
+	else:
+		# Schedule SendPacket
+		global SendPacket
+		SendPacket = profiler.Wrap ("SendPacket", SendPacket)
+		ns.core.Simulator.ScheduleWithContext (source.GetNode ().GetId (), ns.core.Seconds (1.0), SendPacket, source, packetSize, packetCount, interPacketInterval)
 
 	print ("Run Simulation.")
-	ns.core.Simulator.Run()
+	profiler.Run ()
 	ns.core.Simulator.Destroy()
 	print ("Done.")
 
@@ -7,29 +7,32 @@
 #             LAN
 #
 #- UDP flows from n0 to n1
+#
+# With --SendMode=bulk the whole send schedule is handed to ns-3's native
+# UdpClient application instead of calling SendPacket once per packet;
+# --SendTimes=<file> sends at the listed times (seconds, one per line).
+#
+# Received packets are counted per TCLASS/HOPLIMIT value and summarized when
+# the simulation is destroyed; --RecvPrintEvery=N also prints every N-th packet.
 
-import ns3
-import ns.core
-import ns.network
-import ns.csma
-import ns.internet
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
 
-def ReceivePacket(socket):
-	print ("Received one packet!")
-	packet=socket.Recv()
-	tclassTag = ns3.SocketIpv6TclassTag()
-	if packet.RemovePacketTag(tclassTag):
-		print (" TCLASS = ", tclassTag.GetTclass ())
+from common import lazyns
+ns = lazyns.Import ("core", "network", "csma", "internet")
 
-	hoplimitTag = ns3.SocketIpv6HopLimitTag()
-	if packet.RemovePacketTag(hoplimitTag):
-		print (" HOPLIMIT = ", hoplimitTag.GetHopLimit ())
+from common import bulksend, tracing
+from common import profiling
+from common import scheduler
+from common.recvstats import PacketTagCollector
+from common.cmdline import GetBool
 
-def SendPacket (args, socket, pktSize, pktCount, pktInterval):
+def SendPacket (socket, pktSize, pktCount, pktInterval):
 
     if pktCount > 0:
       	socket.Send ( ns.network.Packet(pktSize))
-      	ns.core.Simulator.Schedule (pktInterval, SendPacket, args, socket, pktSize, pktCount - 1, pktInterval)
+      	ns.core.Simulator.Schedule (pktInterval, SendPacket, socket, pktSize, pktCount - 1, pktInterval)
     
     else :
         socket.Close ()   	  
@@ -41,32 +44,47 @@ def main(argv):
     #
 	cmd = ns.core.CommandLine()
 
-	cmd.packetSize = 1024
-	cmd.packetCount = 10
-	cmd.packetInterval = 1.0
+	cmd.PacketSize = 1024
+	cmd.PacketCount = 10
+	cmd.Interval = 1.0
+	cmd.SendMode = "packet"
+	cmd.SendTimes = ""
+	cmd.RecvPrintEvery = 0
 
 	#Socket options for IPv6, currently TCLASS, HOPLIMIT, RECVTCLASS, and RECVHOPLIMIT		
-	cmd.ipv6Tclass = 0
-	cmd.ipv6RecvTclass = True
-	cmd.ipv6Hoplimit = 0
-	cmd.ipv6RecvHoplimit = True
+	cmd.IPV6_TCLASS = 0
+	cmd.IPV6_RECVTCLASS = True
+	cmd.IPV6_HOPLIMIT = 0
+	cmd.IPV6_RECVHOPLIMIT = True
 
 	cmd.AddValue ("PacketSize", "Packet size in bytes")
 	cmd.AddValue ("PacketCount", "Number of packets to send")
 	cmd.AddValue ("Interval", "Interval between packets")
+	cmd.AddValue ("SendMode", "packet: one Python call per packet, bulk: native UdpClient schedule")
+	cmd.AddValue ("SendTimes", "File with explicit send times in seconds (implies bulk mode)")
+	cmd.AddValue ("RecvPrintEvery", "Print every N-th received packet (0: summary only)")
 	cmd.AddValue ("IPV6_TCLASS", "IPV6_TCLASS")
 	cmd.AddValue ("IPV6_RECVTCLASS", "IPV6_RECVTCLASS")
 	cmd.AddValue ("IPV6_HOPLIMIT", "IPV6_HOPLIMIT")
 	cmd.AddValue ("IPV6_RECVHOPLIMIT", "IPV6_RECVHOPLIMIT") 
+	tracing.AddCommandLineOptions (cmd)
+	profiling.AddCommandLineOptions (cmd)
+	scheduler.AddCommandLineOptions (cmd)
 	cmd.Parse(argv)
 
-	packetSize = int(cmd.packetSize)
-	packetCount = int(cmd.packetCount)
-	packetInterval = float(cmd.packetInterval)
-	ipv6Tclass = int(cmd.ipv6Tclass)
-	ipv6RecvTclass = bool(cmd.ipv6RecvTclass)
-	ipv6Hoplimit = int(cmd.ipv6Hoplimit)
-	ipv6RecvHoplimit = bool(cmd.ipv6RecvHoplimit)
+	packetSize = int(cmd.PacketSize)
+	packetCount = int(cmd.PacketCount)
+	packetInterval = float(cmd.Interval)
+	sendTimes = str(cmd.SendTimes)
+	bulk = str(cmd.SendMode) == "bulk" or sendTimes != ""
+	recvPrintEvery = int(cmd.RecvPrintEvery)
+	ipv6Tclass = int(cmd.IPV6_TCLASS)
+	ipv6RecvTclass = GetBool(cmd.IPV6_RECVTCLASS)
+	ipv6Hoplimit = int(cmd.IPV6_HOPLIMIT)
+	ipv6RecvHoplimit = GetBool(cmd.IPV6_RECVHOPLIMIT)
+	tracePolicy = tracing.TracePolicy.FromCommandLine (cmd)
+	profiler = profiling.Profiler.FromCommandLine (cmd)
+	scheduler.Apply (cmd, argv)
 
 	print ("Create nodes.")
 	n = ns.network.NodeContainer()
@@ -90,17 +108,20 @@ def main(argv):
 
 	print ("Create sockets.")
 	#Receiver socket on n1
-	tid = ns3.TypeId.LookupByName ("ns3::UdpSocketFactory")
-	recvSink = ns3.Socket.CreateSocket (n.Get (1), tid)
-	local = ns3.Inet6SocketAddress (ns3.Ipv6Address.GetAny (), 4477)
+	tid = ns.core.TypeId.LookupByName ("ns3::UdpSocketFactory")
+	recvSink = ns.network.Socket.CreateSocket (n.Get (1), tid)
+	local = ns.network.Inet6SocketAddress (ns.network.Ipv6Address.GetAny (), 4477)
 	recvSink.SetIpv6RecvTclass (ipv6RecvTclass)
 	recvSink.SetIpv6RecvHopLimit (ipv6RecvHoplimit)
 	recvSink.Bind (local)
-	recvSink.SetRecvCallback (ReceivePacket)
+	receiver = PacketTagCollector ([("TCLASS", ns.network.SocketIpv6TclassTag (), "GetTclass"),
+	                                ("HOPLIMIT", ns.network.SocketIpv6HopLimitTag (), "GetHopLimit")], recvPrintEvery)
+	recvSink.SetRecvCallback (profiler.Wrap ("ReceivePacket", receiver.Receive))
+	receiver.ReportAtDestroy ()
 
 	#Sender socket on n0
-	source = ns3.Socket.CreateSocket (n.Get (0), tid)
-	remote = ns3.Inet6SocketAddress (i6.GetAddress (1, 1), 4477)
+	source = ns.network.Socket.CreateSocket (n.Get (0), tid)
+	remote = ns.network.Inet6SocketAddress (i6.GetAddress (1, 1), 4477)
 
 	#Set socket options, it is also possible to set the options after the socket has been created/connected.
 	if ipv6Tclass != 0:
@@ -111,16 +132,30 @@ def main(argv):
 
 	source.Connect (remote)
 
-	ascii = ns.network.AsciiTraceHelper()
-	csma.EnableAsciiAll (ascii.CreateFileStream("socket-options-ipv6-py.tr"));
-	csma.EnablePcapAll ("socket-options-ipv6", False)
+	tracePolicy.EnableAscii (csma, "socket-options-ipv6-py.tr")
+	tracePolicy.EnablePcap (csma, "socket-options-ipv6", False)
 
-	#Schedule SendPacket
 	interPacketInterval = ns.core.Seconds(packetInterval)
-	ns.core.Simulator.ScheduleWithContext (source.GetNode ().GetId (), ns.core.Seconds (1.0), SendPacket, source, packetSize, packetCount, interPacketInterval)
+	if bulk:
+		#The bulk sender's own socket picks up TCLASS and hop limit from the node defaults
+		ipv6L3 = n.Get (0).GetObject (ns.internet.Ipv6L3Protocol.GetTypeId ())
+		if ipv6Tclass != 0:
+			ipv6L3.SetAttribute ("DefaultTclass", ns.core.UintegerValue (ipv6Tclass))
+		if ipv6Hoplimit > 0:
+			ipv6L3.SetAttribute ("DefaultTtl", ns.core.UintegerValue (ipv6Hoplimit))
+		source.Close ()
+		if sendTimes:
+			bulksend.InstallScheduledSender (n.Get (0), i6.GetAddress (1, 1), 4477, packetSize, bulksend.LoadSendTimes (sendTimes))
+		else:
+			bulksend.InstallBulkSender (n.Get (0), i6.GetAddress (1, 1), 4477, packetSize, packetCount, interPacketInterval, ns.core.Seconds (1.0))
+	else:
+		#Schedule SendPacket
+		global SendPacket
+		SendPacket = profiler.Wrap ("SendPacket", SendPacket)
+		ns.core.Simulator.ScheduleWithContext (source.GetNode ().GetId (), ns.core.Seconds (1.0), SendPacket, source, packetSize, packetCount, interPacketInterval)
 
 	print ("Run Simulation.")
-	ns.core.Simulator.Run()
+	profiler.Run ()
 	ns.core.Simulator.Destroy()
 	print ("Done.")
 